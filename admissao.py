@@ -0,0 +1,189 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+# Controle de admissão do servidor: requisições simultâneas e fila de espera
+LIMITE = int(os.getenv("MCP_ADMISSAO_LIMITE", "64"))
+FILA = int(os.getenv("MCP_ADMISSAO_FILA", "256"))
+ESPERA = float(os.getenv("MCP_ADMISSAO_ESPERA", "10"))
+RETRY_AFTER = float(os.getenv("MCP_ADMISSAO_RETRY_AFTER", "1"))
+
+# Balde de tokens das chamadas à Wikipedia (0 desativa)
+UPSTREAM_TAXA = float(os.getenv("MCP_UPSTREAM_TAXA", "0"))
+UPSTREAM_RAJADA = float(os.getenv("MCP_UPSTREAM_RAJADA", "10"))
+UPSTREAM_ESPERA = float(os.getenv("MCP_UPSTREAM_ESPERA", "5"))
+
+
+class Sobrecarga(Exception):
+    """Requisição recusada por excesso de carga; o cliente deve tentar de novo após retry_after"""
+
+    def __init__(self, mensagem: str, retry_after: float = RETRY_AFTER):
+        super().__init__(mensagem)
+        self.retry_after = retry_after
+
+    @property
+    def cabecalho_retry_after(self) -> str:
+        """Valor do cabeçalho Retry-After (segundos inteiros)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class ControleAdmissao:
+    """Limita as requisições em execução; as excedentes esperam numa fila limitada.
+
+    Com a fila cheia, ou depois de `espera` segundos na fila, levanta Sobrecarga.
+    A fila é atendida em ordem: a vaga liberada por sair() passa direto para a mais
+    antiga da fila, e quem chega com gente na fila entra no fim dela.
+    limite <= 0 desativa o controle.
+    """
+
+    def __init__(self, limite: int = LIMITE, fila: int = FILA, espera: float = ESPERA):
+        self.limite = limite
+        self.fila = fila
+        self.espera = espera
+        self.em_execucao = 0
+        self.rejeitadas = 0
+        self._fila: "deque[threading.Event]" = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def aguardando(self) -> int:
+        return len(self._fila)
+
+    def entrar(self) -> None:
+        if self.limite <= 0:
+            return
+        with self._lock:
+            if self.em_execucao < self.limite and not self._fila:
+                self.em_execucao += 1
+                return
+            if len(self._fila) >= self.fila:
+                self.rejeitadas += 1
+                raise Sobrecarga("Servidor sobrecarregado: fila de espera cheia")
+            vez = threading.Event()
+            self._fila.append(vez)
+        admitida = vez.wait(self.espera)
+        with self._lock:
+            # A vaga pode ter chegado entre o fim da espera e o lock
+            if not admitida and not vez.is_set():
+                self._fila.remove(vez)
+                self.rejeitadas += 1
+                raise Sobrecarga("Servidor sobrecarregado: tempo de espera esgotado")
+
+    def sair(self) -> None:
+        if self.limite <= 0:
+            return
+        with self._lock:
+            if self._fila:
+                self._fila.popleft().set()
+            else:
+                self.em_execucao -= 1
+
+    def ocupado(self) -> bool:
+        """Há requisições na fila ou mais da metade das vagas em uso"""
+        return self.aguardando > 0 or (self.limite > 0 and self.em_execucao * 2 >= self.limite)
+
+
+class ControleAdmissaoAsync:
+    """Versão asyncio de ControleAdmissao: a espera não ocupa threads"""
+
+    def __init__(self, limite: int = LIMITE, fila: int = FILA, espera: float = ESPERA):
+        self.limite = limite
+        self.fila = fila
+        self.espera = espera
+        self.em_execucao = 0
+        self.rejeitadas = 0
+        self._fila: "deque[asyncio.Future]" = deque()
+
+    @property
+    def aguardando(self) -> int:
+        return len(self._fila)
+
+    async def entrar(self) -> None:
+        if self.limite <= 0:
+            return
+        if self.em_execucao < self.limite and not self._fila:
+            self.em_execucao += 1
+            return
+        if len(self._fila) >= self.fila:
+            self.rejeitadas += 1
+            raise Sobrecarga("Servidor sobrecarregado: fila de espera cheia")
+        vez = asyncio.get_running_loop().create_future()
+        self._fila.append(vez)
+        try:
+            await asyncio.wait_for(asyncio.shield(vez), self.espera)
+        except asyncio.TimeoutError:
+            if not vez.done():
+                self._fila.remove(vez)
+                self.rejeitadas += 1
+                raise Sobrecarga("Servidor sobrecarregado: tempo de espera esgotado")
+        except asyncio.CancelledError:
+            # Cancelada na fila: sai dela, ou devolve a vaga que acabou de receber
+            if vez.done():
+                self._liberar()
+            else:
+                self._fila.remove(vez)
+            raise
+
+    def _liberar(self) -> None:
+        if self._fila:
+            self._fila.popleft().set_result(None)
+        else:
+            self.em_execucao -= 1
+
+    async def sair(self) -> None:
+        if self.limite <= 0:
+            return
+        self._liberar()
+
+    def ocupado(self) -> bool:
+        """Há requisições na fila ou mais da metade das vagas em uso"""
+        return self.aguardando > 0 or (self.limite > 0 and self.em_execucao * 2 >= self.limite)
+
+
+class BaldeTokens:
+    """Balde de tokens: `taxa` chamadas por segundo em média, com rajadas de até `capacidade`"""
+
+    def __init__(self, taxa: float, capacidade: float):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = capacidade
+        self._atualizado = time.monotonic()
+        self._lock = threading.Lock()
+        self.esperas = 0
+        self.recusadas = 0
+
+    def _reservar(self) -> float:
+        """Retira um token e retorna quanto esperar por ele (0 se já havia)"""
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado) * self.taxa)
+            self._atualizado = agora
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.taxa
+
+    def _devolver(self) -> None:
+        with self._lock:
+            self._tokens += 1
+
+    def adquirir(self, espera_maxima: Optional[float] = None) -> None:
+        """Bloqueia até haver um token; levanta Sobrecarga se a espera passaria de espera_maxima"""
+        atraso = self._reservar()
+        if atraso <= 0:
+            return
+        if espera_maxima is not None and atraso > espera_maxima:
+            self._devolver()
+            self.recusadas += 1
+            raise Sobrecarga("Limite de chamadas à Wikipedia atingido", retry_after=atraso)
+        self.esperas += 1
+        time.sleep(atraso)
+
+
+def criar_balde_upstream_do_ambiente() -> Optional[BaldeTokens]:
+    """Balde das chamadas à Wikipedia a partir de MCP_UPSTREAM_*, ou None se desativado"""
+    if UPSTREAM_TAXA <= 0:
+        return None
+    return BaldeTokens(UPSTREAM_TAXA, max(1.0, UPSTREAM_RAJADA))
@@ -1,9 +1,18 @@
 import streamlit as st
-import wikipedia
 import os
-from openai import OpenAI
-import asyncio
-import aiohttp
+import time
+
+from aquecimento import AQUECIMENTO, AQUECIMENTO_LLM, Aquecedor, termos_configurados
+from cache_persistente import criar_cache_llm_do_ambiente, gerar_chave
+from configuracao import chave_openai, importar_sob_demanda, url_openai
+from contexto import montar_contexto
+from indice_local import IndiceLocal
+from metricas import duracao_cliente, medir
+from resolucao import ORIGEM_BUSCA, ORIGEM_DESAMBIGUACAO, ORIGEM_SUGESTAO, ResolvedorTitulos
+from sugestao import criar_indice_sugestao
+
+# O SDK da OpenAI só é carregado na primeira geração de resumo
+openai = importar_sob_demanda("openai")
 
 # Configuração da página
 st.set_page_config(
@@ -55,94 +64,187 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-def buscar_wikipedia(termo):
-    """Busca inteligente na Wikipedia"""
-    wikipedia.set_lang("pt")
+@st.cache_resource
+def obter_indice_local():
+    """Índice local opcional (MCP_INDICE_LOCAL), consultado antes da API"""
+    caminho = os.getenv("MCP_INDICE_LOCAL")
+    return IndiceLocal(caminho) if caminho else None
+
+@st.cache_resource
+def obter_sugestoes():
+    """Índice de títulos para corrigir erros de digitação e sugerir títulos parecidos"""
+    return criar_indice_sugestao("pt", obter_indice_local())
+
+@st.cache_resource
+def obter_resolvedor():
+    """Resolvedor de títulos com a tabela termo → título compartilhada entre sessões"""
+    return ResolvedorTitulos("pt", sugestoes=obter_sugestoes())
+
+def buscar_wikipedia(termo, completo=False):
+    """Busca inteligente na Wikipedia (com completo=True, o artigo inteiro)"""
+    sentencas = None if completo else 4
+    indice = obter_indice_local()
+    if indice is not None:
+        achado = indice.resumo(termo, "pt", sentencas=sentencas)
+        if achado is None:
+            # Busca textual no índice, equivalente à busca ampla da API
+            titulos = indice.buscar_titulos(termo, "pt", limite=1)
+            if titulos:
+                achado = indice.resumo(titulos[0], "pt", sentencas=sentencas)
+                if achado is not None:
+                    return f"**{achado[0]}** (encontrado via busca)\n\n{achado[1]}"
+        else:
+            titulo, resultado, desambiguacao = achado
+            if desambiguacao:
+                return f"**{titulo}** (termo relacionado)\n\n{resultado}"
+            return f"**{termo}**\n\n{resultado}"
     
+    # Consulta exata e, só se ela não bastar (ou demorar), a busca ampla
     try:
-        # Tentativa 1: busca direta
-        resultado = wikipedia.summary(termo, sentences=4)
-        return f"**{termo}**\n\n{resultado}"
-        
-    except wikipedia.exceptions.DisambiguationError as e:
-        # Se há ambiguidade, pega a primeira opção
-        primeiro_termo = e.options[0]
-        resultado = wikipedia.summary(primeiro_termo, sentences=4)
-        return f"**{primeiro_termo}** (termo relacionado)\n\n{resultado}"
-        
-    except wikipedia.exceptions.PageError:
-        # Busca mais ampla
-        try:
-            resultados_busca = wikipedia.search(termo, results=3)
-            if resultados_busca:
-                primeiro_resultado = resultados_busca[0]
-                resultado = wikipedia.summary(primeiro_resultado, sentences=4)
-                return f"**{primeiro_resultado}** (encontrado via busca)\n\n{resultado}"
-            else:
-                return f"❌ Nenhum resultado encontrado para '{termo}' na Wikipedia em português."
-        except Exception as e:
-            return f"❌ Erro ao buscar '{termo}': {str(e)}"
-            
+        resolucao = obter_resolvedor().resolver(termo, sentencas=sentencas)
     except Exception as e:
-        return f"❌ Erro geral: {str(e)}"
+        return f"❌ Erro ao buscar '{termo}': {str(e)}"
+    
+    if resolucao is None:
+        mensagem = f"❌ Nenhum resultado encontrado para '{termo}' na Wikipedia em português."
+        sugestoes = obter_sugestoes()
+        parecidos = [titulo for titulo, _ in sugestoes.sugerir(termo)] if sugestoes is not None else []
+        if parecidos:
+            mensagem += f"\n\nVocê quis dizer: {', '.join(parecidos)}?"
+        return mensagem
+    if resolucao["origem"] == ORIGEM_SUGESTAO:
+        return f"**{resolucao['titulo']}** (você quis dizer)\n\n{resolucao['texto']}"
+    if resolucao["origem"] == ORIGEM_DESAMBIGUACAO:
+        # Se há ambiguidade, usa a opção mais relevante
+        return f"**{resolucao['titulo']}** (termo relacionado)\n\n{resolucao['texto']}"
+    if resolucao["origem"] == ORIGEM_BUSCA:
+        return f"**{resolucao['titulo']}** (encontrado via busca)\n\n{resolucao['texto']}"
+    return f"**{termo}**\n\n{resolucao['texto']}"
 
-def gerar_resumo_ia(texto_wikipedia, termo_busca):
-    """Gera resumo usando OpenAI"""
+def obter_chave_openai():
+    """Busca a chave da OpenAI nos secrets, no ambiente ou no .env local"""
+    openai_key = None
+    
+    # 1. Primeiro tenta os secrets do Streamlit Cloud
     try:
-        # Tenta pegar a chave de diferentes fontes
-        openai_key = None
-        
-        # 1. Primeiro tenta os secrets do Streamlit Cloud
-        try:
-            openai_key = st.secrets["OPENAI_API_KEY"]
-        except:
-            pass
+        openai_key = st.secrets["OPENAI_API_KEY"]
+    except:
+        pass
+    
+    # 2. Se não encontrar, tenta a variável de ambiente ou o .env local (lido uma vez só)
+    if not openai_key:
+        openai_key = chave_openai()
+    
+    return openai_key
+
+@st.cache_resource
+def obter_cache_llm():
+    """Cache em disco dos resumos já gerados, compartilhado entre processos"""
+    return criar_cache_llm_do_ambiente()
+
+@st.cache_resource
+def obter_cliente_openai(openai_key):
+    """Cliente OpenAI reaproveitado entre execuções e sessões"""
+    return openai.OpenAI(api_key=openai_key, base_url=url_openai())
+
+def gerar_resumo_ia(texto_wikipedia, termo_busca, pergunta=None):
+    """Gera resumo usando OpenAI, entregando o texto conforme chega"""
+    gerou_texto = False
+    try:
+        openai_key = obter_chave_openai()
         
-        # 2. Se não encontrar, tenta variável de ambiente local
         if not openai_key:
-            openai_key = os.getenv("OPENAI_API_KEY")
+            yield f"⚠️ **Informações da Wikipedia:**\n\n{texto_wikipedia}\n\n*Nota: Configure OPENAI_API_KEY para resumo com IA*"
+            return
         
-        # 3. Se ainda não encontrar, tenta carregar do .env local
-        if not openai_key:
-            from dotenv import load_dotenv
-            load_dotenv()
-            openai_key = os.getenv("OPENAI_API_KEY")
+        client = obter_cliente_openai(openai_key)
         
-        if not openai_key:
-            return f"⚠️ **Informações da Wikipedia:**\n\n{texto_wikipedia}\n\n*Nota: Configure OPENAI_API_KEY para resumo com IA*"
+        modelo = "gpt-3.5-turbo"
+        parametros = {"max_tokens": 400, "temperature": 0.7}
+        # Artigos longos são reduzidos às passagens mais relevantes dentro do orçamento de tokens
+        with medir(duracao_cliente, etapa="contexto"):
+            contexto = montar_contexto(texto_wikipedia, pergunta or termo_busca)
+        if pergunta:
+            pedido = f"responda à pergunta \"{pergunta}\" com"
+        else:
+            pedido = "crie"
+        mensagens = [
+            {
+                "role": "system",
+                "content": """Você é um especialista em criar resumos educativos e informativos. 
+                Sua tarefa é explicar conceitos de forma clara, didática e interessante em português.
+                Mantenha o tom profissional mas acessível."""
+            },
+            {
+                "role": "user",
+                "content": f"""Com base nas informações da Wikipedia sobre '{termo_busca}', 
+                {pedido} um resumo claro e informativo que:
+                - Explique o conceito principal
+                - Destaque pontos mais interessantes
+                - Use linguagem acessível
+                - Tenha entre 150-300 palavras
+                
+                Informações da Wikipedia:
+                {contexto}"""
+            }
+        ]
         
-        client = OpenAI(api_key=openai_key)
+        # Resumo já gerado antes para o mesmo texto: não chama a OpenAI
+        cache_llm = obter_cache_llm()
+        chave = gerar_chave(modelo, mensagens, parametros)
+        resumo = None
+        if cache_llm is not None:
+            with medir(duracao_cliente, etapa="llm_cache"):
+                resumo = cache_llm.obter(chave)
+        if resumo is not None:
+            yield f"🤖 **Resumo Inteligente:**\n\n{resumo}"
+            return
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """Você é um especialista em criar resumos educativos e informativos. 
-                    Sua tarefa é explicar conceitos de forma clara, didática e interessante em português.
-                    Mantenha o tom profissional mas acessível."""
-                },
-                {
-                    "role": "user",
-                    "content": f"""Com base nas informações da Wikipedia sobre '{termo_busca}', 
-                    crie um resumo claro e informativo que:
-                    - Explique o conceito principal
-                    - Destaque pontos mais interessantes
-                    - Use linguagem acessível
-                    - Tenha entre 150-300 palavras
-                    
-                    Informações da Wikipedia:
-                    {texto_wikipedia}"""
-                }
-            ],
-            max_tokens=400,
-            temperature=0.7
+        inicio = time.perf_counter()
+        stream = client.chat.completions.create(
+            model=modelo,
+            messages=mensagens,
+            stream=True,
+            **parametros
         )
         
-        return f"🤖 **Resumo Inteligente:**\n\n{response.choices[0].message.content}"
+        partes = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                if not gerou_texto:
+                    gerou_texto = True
+                    duracao_cliente.observar(time.perf_counter() - inicio, etapa="llm_primeiro_token")
+                    yield "🤖 **Resumo Inteligente:**\n\n"
+                partes.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        duracao_cliente.observar(time.perf_counter() - inicio, etapa="llm_total")
+        
+        if cache_llm is not None and partes:
+            cache_llm.guardar(chave, "".join(partes))
         
     except Exception as e:
-        return f"**Informações da Wikipedia:**\n\n{texto_wikipedia}\n\n*Erro na IA: {str(e)}*"
+        if gerou_texto:
+            yield f"\n\n*Erro na IA: {str(e)}*"
+        else:
+            yield f"**Informações da Wikipedia:**\n\n{texto_wikipedia}\n\n*Erro na IA: {str(e)}*"
+
+@st.cache_resource
+def iniciar_aquecimento():
+    """Aquece, uma vez por processo, a tabela de títulos dos exemplos e termos configurados
+    e, com MCP_AQUECIMENTO_LLM=1, também os resumos da IA"""
+    if not AQUECIMENTO:
+        return None
+    
+    def aquecer(termo):
+        resultado = buscar_wikipedia(termo)
+        if AQUECIMENTO_LLM and "❌" not in resultado:
+            # Consome o gerador inteiro: o resumo completo fica no cache em disco
+            for _ in gerar_resumo_ia(resultado, termo):
+                pass
+    
+    return Aquecedor(aquecer, termos_configurados).iniciar()
+
+iniciar_aquecimento()
 
 # Interface principal
 with st.container():
@@ -153,6 +255,13 @@ with st.container():
         help="Digite qualquer tema e descubra informações interessantes!"
     )
     
+    with st.expander("⚙️ Opções avançadas"):
+        artigo_completo = st.checkbox(
+            "📖 Usar o artigo completo",
+            help="Envia à IA as partes do artigo mais relevantes para a pergunta, e não só a introdução",
+        )
+        pergunta = st.text_input("❓ Pergunta (opcional):", placeholder="Ex: Quando foi criado?")
+    
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         buscar_btn = st.button("🚀 Buscar", type="primary", use_container_width=True)
@@ -161,17 +270,22 @@ with st.container():
 if buscar_btn and termo_busca:
     with st.spinner("🔍 Buscando na Wikipedia..."):
         # Busca na Wikipedia
-        resultado_wikipedia = buscar_wikipedia(termo_busca)
+        resultado_wikipedia = buscar_wikipedia(termo_busca, completo=artigo_completo)
     
     if "❌" not in resultado_wikipedia:
         with st.spinner("🤖 Gerando resumo inteligente..."):
             # Gera resumo com IA
-            resultado_final = gerar_resumo_ia(resultado_wikipedia, termo_busca)
+            partes = gerar_resumo_ia(resultado_wikipedia, termo_busca, pergunta or None)
+            resultado_final = next(partes, "")
         
-        # Mostra resultado
+        # Mostra resultado, acrescentando os tokens conforme chegam
         st.markdown('<div class="result-container">', unsafe_allow_html=True)
         st.success("✅ Resultado encontrado!")
-        st.markdown(resultado_final)
+        area_resultado = st.empty()
+        for parte in partes:
+            resultado_final += parte
+            area_resultado.markdown(resultado_final + "▌")
+        area_resultado.markdown(resultado_final)
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Informações adicionais
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Exemplos da barra lateral do app.py, aquecidos quando nenhuma lista é configurada
+TERMOS_PADRAO = ("Python", "Maradona", "Inteligência Artificial")
+
+AQUECIMENTO = os.getenv("MCP_AQUECIMENTO", "1") != "0"
+AQUECIMENTO_LLM = os.getenv("MCP_AQUECIMENTO_LLM", "0") == "1"
+INTERVALO = float(os.getenv("MCP_AQUECIMENTO_INTERVALO", "900"))
+PARALELISMO = int(os.getenv("MCP_AQUECIMENTO_PARALELISMO", "2"))
+TOP_N = int(os.getenv("MCP_AQUECIMENTO_TOP_N", "20"))
+
+
+def termos_configurados() -> List[str]:
+    """Termos de MCP_AQUECIMENTO_TERMOS (separados por vírgula) ou de
+    MCP_AQUECIMENTO_ARQUIVO (um por linha); sem nenhum dos dois, os exemplos do app"""
+    termos = [t.strip() for t in os.getenv("MCP_AQUECIMENTO_TERMOS", "").split(",") if t.strip()]
+    arquivo = os.getenv("MCP_AQUECIMENTO_ARQUIVO")
+    if arquivo:
+        with open(arquivo, encoding="utf-8") as f:
+            termos.extend(linha.strip() for linha in f if linha.strip())
+    return termos or list(TERMOS_PADRAO)
+
+
+class FrequenciaBuscas:
+    """Conta as buscas recentes para aquecer as mais pedidas.
+
+    Cada chave (ex.: idioma + termo normalizado) guarda o último valor registrado
+    (ex.: o termo como foi digitado). Ao passar de `max_termos`, os contadores são
+    divididos por dois e os que chegam a zero saem, e termos antigos perdem peso.
+    """
+
+    def __init__(self, max_termos: int = 10000):
+        self.max_termos = max_termos
+        self._contagem: "Counter[Hashable]" = Counter()
+        self._valores: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, chave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._contagem[chave] += 1
+            self._valores[chave] = valor
+            if len(self._contagem) > self.max_termos:
+                self._contagem = Counter({c: n // 2 for c, n in self._contagem.items() if n > 1})
+                self._valores = {c: self._valores[c] for c in self._contagem}
+
+    def mais_frequentes(self, n: int) -> List[Any]:
+        with self._lock:
+            return [self._valores[chave] for chave, _ in self._contagem.most_common(n)]
+
+
+class Aquecedor:
+    """Aquece caches em segundo plano: na partida e depois a cada `intervalo` segundos.
+
+    Usa no máximo `paralelismo` threads e interrompe a rodada enquanto `ocupado()`
+    indicar tráfego real; os termos que ficaram para trás entram na próxima rodada.
+    """
+
+    def __init__(
+        self,
+        aquecer: Callable[[Any], Any],
+        termos: Callable[[], List[Any]],
+        intervalo: float = INTERVALO,
+        paralelismo: int = PARALELISMO,
+        ocupado: Optional[Callable[[], bool]] = None,
+    ):
+        self.aquecer = aquecer
+        self.termos = termos
+        self.intervalo = intervalo
+        self.paralelismo = paralelismo
+        self.ocupado = ocupado or (lambda: False)
+        self.aquecidos = 0
+        self.falhas = 0
+        self.adiados = 0
+        self.ultima_rodada: Optional[float] = None
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _aquecer_termo(self, termo: Any) -> None:
+        if self._parar.is_set() or self.ocupado():
+            self.adiados += 1
+            return
+        try:
+            self.aquecer(termo)
+            self.aquecidos += 1
+        except Exception:
+            self.falhas += 1
+
+    def executar_rodada(self) -> None:
+        # Sem duplicatas, preservando a ordem de prioridade
+        termos = list(dict.fromkeys(self.termos()))
+        with ThreadPoolExecutor(max_workers=max(1, self.paralelismo), thread_name_prefix="aquecimento") as executor:
+            list(executor.map(self._aquecer_termo, termos))
+        self.ultima_rodada = time.time()
+
+    def _rodar(self) -> None:
+        while not self._parar.is_set():
+            self.executar_rodada()
+            if self.intervalo <= 0 or self._parar.wait(self.intervalo):
+                return
+
+    def iniciar(self) -> "Aquecedor":
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._rodar, name="aquecimento", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._parar.set()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "aquecidos": self.aquecidos,
+            "falhas": self.falhas,
+            "adiados": self.adiados,
+            "ultima_rodada": self.ultima_rodada,
+        }
@@ -0,0 +1,470 @@
+"""Gerador de carga do servidor MCP: vazão, p50/p95/p99 e tempo por etapa, com os
+resultados salvos em JSON para comparar execuções e apontar regressões.
+
+Uso:
+    python stubs_locais.py &
+    MCP_WIKIPEDIA_API_URL=http://127.0.0.1:8030/w/api.php gunicorn -c gunicorn.conf.py servidor:app &
+    python benchmark.py ferramenta --concorrencia 32 --duracao 30 --nome base
+    OPENAI_BASE_URL=http://127.0.0.1:8020/v1 OPENAI_API_KEY=stub python benchmark.py pipeline --concorrencia 8
+    python benchmark.py comparar benchmarks/base.json benchmarks/nova.json
+    MCP_WIKIPEDIA_API_URL=http://127.0.0.1:8030/w/api.php python benchmark.py resolucao --esperas 0 0.3
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+import cliente
+from cliente import ClienteMCP, criar_conector, separar_url, testar_servidor
+from metricas import registro
+from resolucao import ESPERA_BUSCA, ResolvedorTitulos
+from stubs_locais import ARTIGOS_FIXOS, titulo_sintetico
+
+PASTA_RESULTADOS = os.getenv("MCP_BENCHMARK_PASTA", "benchmarks")
+
+# Histogramas de onde sai o tempo por etapa
+HISTOGRAMA_SERVIDOR = "mcp_etapa_duracao_segundos"
+HISTOGRAMA_CLIENTE = "mcp_cliente_duracao_segundos"
+
+# Métricas comparadas entre execuções: (caminho no resultado, maior é melhor)
+METRICAS_COMPARADAS = (
+    (("vazao",), True),
+    (("latencia", "p50"), False),
+    (("latencia", "p95"), False),
+    (("latencia", "p99"), False),
+    (("primeiro_evento", "p50"), False),
+    (("primeiro_evento", "p95"), False),
+    (("taxa_erros",), False),
+)
+
+_LINHA_METRICA = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+_ROTULO = re.compile(r'(\w+)="([^"]*)"')
+
+
+def percentil(valores: Sequence[float], p: float) -> Optional[float]:
+    """Percentil p (0-100) pelo posto mais próximo, ou None sem valores"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, int(round(len(ordenados) * p / 100)) - 1))]
+
+
+def resumir_latencias(valores: Sequence[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentil(valores, 50),
+        "p95": percentil(valores, 95),
+        "p99": percentil(valores, 99),
+        "media": sum(valores) / len(valores) if valores else None,
+        "max": max(valores) if valores else None,
+    }
+
+
+# Etapas: deltas dos histogramas no formato do Prometheus
+
+def ler_histograma(texto: str, nome: str) -> Dict[str, Dict[str, Any]]:
+    """Séries do histograma por etapa: buckets acumulados, soma e contagem"""
+    etapas: Dict[str, Dict[str, Any]] = {}
+    for linha in texto.splitlines():
+        achado = _LINHA_METRICA.match(linha)
+        if not achado or not achado.group(1).startswith(nome):
+            continue
+        sufixo = achado.group(1)[len(nome):]
+        rotulos = dict(_ROTULO.findall(achado.group(2)))
+        serie = etapas.setdefault(rotulos.get("etapa", ""), {"buckets": {}, "soma": 0.0, "contagem": 0.0})
+        valor = float(achado.group(3))
+        if sufixo == "_bucket":
+            serie["buckets"][float(rotulos["le"])] = valor
+        elif sufixo == "_sum":
+            serie["soma"] = valor
+        elif sufixo == "_count":
+            serie["contagem"] = valor
+    return etapas
+
+
+def _percentil_buckets(buckets: List[Tuple[float, float]], contagem: float, p: float) -> Optional[float]:
+    """Percentil aproximado por interpolação linear dentro do bucket"""
+    alvo = contagem * p / 100
+    anterior_limite, anterior_acumulado = 0.0, 0.0
+    for limite, acumulado in buckets:
+        if acumulado >= alvo:
+            if limite == float("inf"):
+                return anterior_limite
+            fracao = (alvo - anterior_acumulado) / (acumulado - anterior_acumulado) if acumulado > anterior_acumulado else 0
+            return anterior_limite + (limite - anterior_limite) * fracao
+        anterior_limite, anterior_acumulado = limite, acumulado
+    return None
+
+
+def diferenca_etapas(antes: Dict[str, Dict[str, Any]], depois: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Chamadas, média e p50/p95 aproximados de cada etapa entre dois momentos"""
+    resultado = {}
+    for etapa, serie in sorted(depois.items()):
+        anterior = antes.get(etapa, {"buckets": {}, "soma": 0.0, "contagem": 0.0})
+        contagem = serie["contagem"] - anterior["contagem"]
+        if contagem <= 0:
+            continue
+        buckets = [
+            (limite, acumulado - anterior["buckets"].get(limite, 0.0))
+            for limite, acumulado in sorted(serie["buckets"].items())
+        ]
+        resultado[etapa] = {
+            "chamadas": int(contagem),
+            "media": (serie["soma"] - anterior["soma"]) / contagem,
+            "p50": _percentil_buckets(buckets, contagem, 50),
+            "p95": _percentil_buckets(buckets, contagem, 95),
+        }
+    return resultado
+
+
+async def ler_metricas_servidor(sessao: aiohttp.ClientSession, url: str) -> str:
+    """Texto de GET /metrics, ou vazio se o servidor não expõe métricas"""
+    try:
+        async with sessao.get(f"{url}/metrics") as resposta:
+            return await resposta.text() if resposta.status == 200 else ""
+    except aiohttp.ClientError:
+        return ""
+
+
+# Termos das buscas
+
+def carregar_termos(args) -> Tuple[List[str], List[float]]:
+    """Termos e pesos: do arquivo (um por linha) ou os artigos dos stubs, com
+    popularidade de Zipf (expoente 0 = uniforme) para exercitar os caches"""
+    if args.termos:
+        with open(args.termos, encoding="utf-8") as f:
+            termos = [linha.strip() for linha in f if linha.strip()]
+    else:
+        termos = list(ARTIGOS_FIXOS) + [titulo_sintetico(n) for n in range(args.vocabulario)]
+    pesos = [1 / (posicao + 1) ** args.zipf for posicao in range(len(termos))]
+    return termos, pesos
+
+
+# Execução
+
+class Amostras:
+    """Resultados das requisições feitas depois do aquecimento"""
+
+    def __init__(self):
+        self.latencias: List[float] = []
+        self.primeiro_evento: List[float] = []
+        self.erros: "Counter[str]" = Counter()
+
+    @property
+    def total(self) -> int:
+        return len(self.latencias) + sum(self.erros.values())
+
+
+async def _uma_requisicao(args, cli: ClienteMCP, termo: str, amostras: Amostras, medir: bool) -> None:
+    argumentos: Dict[str, Any] = {"busca": termo}
+    if args.completo:
+        argumentos["completo"] = True
+    inicio = time.perf_counter()
+    primeiro: Optional[float] = None
+    erro: Optional[str] = None
+
+    if args.modo == "pipeline":
+        resposta = await testar_servidor(cli, termo, args.pergunta, args.completo)
+        if resposta.startswith("Erro"):
+            erro = resposta
+        elif "*Nota:" in resposta:
+            erro = "Erro na IA"
+    elif args.stream:
+        async for evento in cli.chamar_ferramenta_stream("buscar_wikipedia", argumentos):
+            if primeiro is None:
+                primeiro = time.perf_counter() - inicio
+            if evento.get("tipo") == "erro":
+                erro = evento.get("mensagem") or "erro"
+    else:
+        resposta = await cli.chamar_ferramenta("buscar_wikipedia", argumentos)
+        if resposta.startswith("Erro"):
+            erro = resposta
+
+    if not medir:
+        return
+    if erro is not None:
+        # Agrupa pelo começo da mensagem, sem o termo
+        amostras.erros[erro.split(":")[0][:60]] += 1
+        return
+    amostras.latencias.append(time.perf_counter() - inicio)
+    if primeiro is not None:
+        amostras.primeiro_evento.append(primeiro)
+
+
+async def gerar_carga(args, cli: ClienteMCP, termos: List[str], pesos: List[float], inicio_medicao: float) -> Amostras:
+    """Laço fechado: `concorrencia` usuários, cada um faz a próxima requisição quando a
+    anterior termina, até a duração ou o número de requisições se esgotar"""
+    amostras = Amostras()
+    fim = inicio_medicao + args.duracao
+    restantes = [args.requisicoes] if args.requisicoes else None
+    sorteio = random.Random(args.semente)
+
+    async def usuario():
+        while True:
+            agora = time.perf_counter()
+            if restantes is not None:
+                if restantes[0] <= 0:
+                    return
+                if agora >= inicio_medicao:
+                    restantes[0] -= 1
+            elif agora >= fim:
+                return
+            termo = sorteio.choices(termos, pesos)[0]
+            await _uma_requisicao(args, cli, termo, amostras, medir=agora >= inicio_medicao)
+
+    await asyncio.gather(*(usuario() for _ in range(args.concorrencia)))
+    return amostras
+
+
+async def executar(args) -> Dict[str, Any]:
+    termos, pesos = carregar_termos(args)
+    if args.sem_cache_llm:
+        cliente.usar_cache_llm = False
+    cli = ClienteMCP(base_url=args.url, limite_conexoes=args.concorrencia)
+    await cli.abrir()
+    try:
+        url_http, _ = separar_url(args.url)
+        async with aiohttp.ClientSession(connector=criar_conector(args.url)) as sessao:
+            inicio_medicao = time.perf_counter() + args.aquecimento
+            carga = asyncio.ensure_future(gerar_carga(args, cli, termos, pesos, inicio_medicao))
+            # As etapas contam a partir do fim do aquecimento
+            await asyncio.sleep(args.aquecimento)
+            servidor_antes = ler_histograma(await ler_metricas_servidor(sessao, url_http), HISTOGRAMA_SERVIDOR)
+            cliente_antes = ler_histograma(registro.renderizar(), HISTOGRAMA_CLIENTE)
+            amostras = await carga
+            duracao = time.perf_counter() - inicio_medicao
+            servidor_depois = ler_histograma(await ler_metricas_servidor(sessao, url_http), HISTOGRAMA_SERVIDOR)
+            cliente_depois = ler_histograma(registro.renderizar(), HISTOGRAMA_CLIENTE)
+    finally:
+        await cli.fechar()
+
+    return {
+        "requisicoes": amostras.total,
+        "sucessos": len(amostras.latencias),
+        "erros": dict(amostras.erros),
+        "taxa_erros": sum(amostras.erros.values()) / amostras.total if amostras.total else 0.0,
+        "duracao": duracao,
+        "vazao": len(amostras.latencias) / duracao if duracao > 0 else 0.0,
+        "latencia": resumir_latencias(amostras.latencias),
+        "primeiro_evento": resumir_latencias(amostras.primeiro_evento),
+        "etapas_servidor": diferenca_etapas(servidor_antes, servidor_depois),
+        "etapas_cliente": diferenca_etapas(cliente_antes, cliente_depois),
+    }
+
+
+# Resolução de títulos, sem o servidor: quanto a busca adiada custa em latência e em
+# chamadas à Wikipedia, para escolher MCP_RESOLUCAO_ESPERA_BUSCA
+
+def termos_resolucao(args) -> List[Tuple[str, str]]:
+    """Pares (tipo, termo), todos diferentes, para que nenhum já esteja na tabela de títulos"""
+    sorteio = random.Random(args.semente)
+    termos = []
+    for n in range(args.requisicoes):
+        titulo = titulo_sintetico(n)
+        # Em minúsculas a consulta exata não acha a página, e a resolução cai na busca textual
+        termos.append(("busca", titulo.lower()) if sorteio.random() < args.fracao_busca else ("exato", titulo))
+    return termos
+
+
+def medir_resolucao(args, espera: float) -> Dict[str, Any]:
+    contador = itertools.count()
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_maxsize=args.concorrencia)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+
+    def contar(resposta, *args, **kwargs) -> None:
+        # Um hook que retorna algo substitui a resposta
+        next(contador)
+
+    sessao.hooks["response"].append(contar)
+    resolvedor = ResolvedorTitulos(args.idioma, sessao=sessao, espera_busca=espera)
+    latencias: Dict[str, List[float]] = defaultdict(list)
+
+    def resolver(item: Tuple[str, str]) -> None:
+        tipo, termo = item
+        inicio = time.perf_counter()
+        resolvedor.resolver(termo)
+        latencias[tipo].append(time.perf_counter() - inicio)
+
+    termos = termos_resolucao(args)
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        list(executor.map(resolver, termos))
+    return {
+        "espera": espera,
+        "chamadas_por_termo": next(contador) / len(termos) if termos else 0.0,
+        "latencia": {tipo: resumir_latencias(valores) for tipo, valores in sorted(latencias.items())},
+    }
+
+
+def executar_resolucao(args) -> int:
+    print(f"🚀 resolucao: {args.requisicoes} termos ({args.fracao_busca:.0%} pela busca textual),"
+          f" {args.concorrencia} threads")
+    for espera in args.esperas:
+        resultado = medir_resolucao(args, espera)
+        print(f"📊 espera {espera:g}s: {resultado['chamadas_por_termo']:.2f} chamadas por termo")
+        for tipo, latencia in resultado["latencia"].items():
+            print(f"   {tipo:<6} p50 {_ms(latencia['p50'])} | p95 {_ms(latencia['p95'])} | máx {_ms(latencia['max'])}")
+    return 0
+
+
+# Relatório e comparação
+
+def _ms(valor: Optional[float]) -> str:
+    return "-" if valor is None else f"{valor * 1000:.1f} ms"
+
+
+def imprimir_resultado(resultado: Dict[str, Any]) -> None:
+    print(f"📊 {resultado['sucessos']}/{resultado['requisicoes']} requisições em {resultado['duracao']:.1f}s"
+          f" → {resultado['vazao']:.1f} req/s, {resultado['taxa_erros']:.1%} de erros")
+    latencia = resultado["latencia"]
+    print(f"   latência: p50 {_ms(latencia['p50'])} | p95 {_ms(latencia['p95'])} | p99 {_ms(latencia['p99'])}"
+          f" | máx {_ms(latencia['max'])}")
+    if resultado["primeiro_evento"]["p50"] is not None:
+        primeiro = resultado["primeiro_evento"]
+        print(f"   primeiro evento: p50 {_ms(primeiro['p50'])} | p95 {_ms(primeiro['p95'])}")
+    for erro, quantidade in resultado["erros"].items():
+        print(f"   ❌ {quantidade}× {erro}")
+    for lado in ("servidor", "cliente"):
+        etapas = resultado[f"etapas_{lado}"]
+        if etapas:
+            print(f"   etapas do {lado}:")
+        for etapa, dados in etapas.items():
+            print(f"     {etapa:<28} {dados['chamadas']:>7}× média {_ms(dados['media'])}"
+                  f" | p50 ~{_ms(dados['p50'])} | p95 ~{_ms(dados['p95'])}")
+
+
+def _valor(resultado: Dict[str, Any], caminho: Tuple[str, ...]) -> Optional[float]:
+    for chave in caminho:
+        resultado = resultado.get(chave) if isinstance(resultado, dict) else None
+    return resultado
+
+
+def comparar(base: Dict[str, Any], atual: Dict[str, Any], tolerancia: float) -> List[str]:
+    """Imprime as variações entre duas execuções e retorna as métricas que pioraram
+    além da tolerância (fração, ex.: 0.1 = 10%)"""
+    regressoes = []
+    print(f"🔎 {base.get('nome')} ({base.get('commit') or '?'}) → {atual.get('nome')} ({atual.get('commit') or '?'})")
+    for caminho, maior_melhor in METRICAS_COMPARADAS:
+        antes = _valor(base["resultado"], caminho)
+        depois = _valor(atual["resultado"], caminho)
+        if antes is None or depois is None:
+            continue
+        variacao = (depois - antes) / antes if antes else (0.0 if depois == antes else float("inf"))
+        piorou = -variacao > tolerancia if maior_melhor else variacao > tolerancia
+        nome = ".".join(caminho)
+        print(f"   {'⚠️ ' if piorou else '  '}{nome:<22} {antes:>12.4f} → {depois:>12.4f} ({variacao:+.1%})")
+        if piorou:
+            regressoes.append(nome)
+    return regressoes
+
+
+def commit_atual() -> Optional[str]:
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return saida.stdout.strip() or None
+
+
+def salvar(execucao: Dict[str, Any], pasta: str) -> str:
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f"{execucao['nome']}.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(execucao, f, ensure_ascii=False, indent=2)
+    return caminho
+
+
+def carregar_resultado(caminho: str) -> Dict[str, Any]:
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do servidor MCP")
+    subparsers = parser.add_subparsers(dest="modo", required=True)
+
+    for modo, ajuda in (
+        ("ferramenta", "POST /tools/buscar_wikipedia"),
+        ("pipeline", "busca + resumo da IA (testar_servidor)"),
+    ):
+        sub = subparsers.add_parser(modo, help=ajuda)
+        sub.add_argument("--url", default=os.getenv("MCP_BENCHMARK_URL", "http://localhost:8000"))
+        sub.add_argument("--concorrencia", type=int, default=16, help="usuários simultâneos")
+        sub.add_argument("--duracao", type=float, default=30.0, help="segundos medidos")
+        sub.add_argument("--requisicoes", type=int, default=0, help="total de requisições (no lugar da duração)")
+        sub.add_argument("--aquecimento", type=float, default=0.0, help="segundos iniciais fora da medição")
+        sub.add_argument("--termos", help="arquivo com um termo por linha (padrão: artigos dos stubs)")
+        sub.add_argument("--vocabulario", type=int, default=1000, help="artigos sintéticos sorteados")
+        sub.add_argument("--zipf", type=float, default=1.0, help="expoente da popularidade (0 = uniforme)")
+        sub.add_argument("--semente", type=int, default=0)
+        sub.add_argument("--completo", action="store_true", help="artigo completo em vez da introdução")
+        sub.add_argument("--nome", help="nome do resultado (padrão: modo + data)")
+        sub.add_argument("--pasta", default=PASTA_RESULTADOS)
+        sub.add_argument("--comparar", help="resultado salvo para comparar ao final")
+        sub.add_argument("--tolerancia", type=float, default=0.1, help="piora aceita na comparação (fração)")
+        if modo == "ferramenta":
+            sub.add_argument("--stream", action="store_true", help="respostas NDJSON (mede o primeiro evento)")
+        else:
+            sub.add_argument("--pergunta", help="pergunta enviada à IA junto com a busca")
+            sub.add_argument("--sem-cache-llm", action="store_true", help="ignora o cache em disco da IA")
+
+    resolucao = subparsers.add_parser("resolucao", help="ResolvedorTitulos contra MCP_WIKIPEDIA_API_URL, sem o servidor")
+    resolucao.add_argument("--esperas", type=float, nargs="+", default=[0.0, ESPERA_BUSCA],
+                           help="valores de MCP_RESOLUCAO_ESPERA_BUSCA comparados")
+    resolucao.add_argument("--concorrencia", type=int, default=16, help="resoluções simultâneas")
+    resolucao.add_argument("--requisicoes", type=int, default=400, help="termos resolvidos por espera")
+    resolucao.add_argument("--fracao-busca", type=float, default=0.2, help="fração de termos que não são títulos")
+    resolucao.add_argument("--idioma", default="pt")
+    resolucao.add_argument("--semente", type=int, default=0)
+
+    comparacao = subparsers.add_parser("comparar", help="compara dois resultados salvos")
+    comparacao.add_argument("base")
+    comparacao.add_argument("atual")
+    comparacao.add_argument("--tolerancia", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if args.modo == "comparar":
+        return 1 if comparar(carregar_resultado(args.base), carregar_resultado(args.atual), args.tolerancia) else 0
+    if args.modo == "resolucao":
+        return executar_resolucao(args)
+
+    args.stream = getattr(args, "stream", False)
+    args.pergunta = getattr(args, "pergunta", None)
+    args.sem_cache_llm = getattr(args, "sem_cache_llm", False)
+    args.nome = args.nome or f"{args.modo}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+    print(f"🚀 {args.modo}: {args.concorrencia} usuários contra {args.url}")
+    resultado = asyncio.run(executar(args))
+    imprimir_resultado(resultado)
+    configuracao = {k: v for k, v in vars(args).items() if k not in ("comparar", "pasta")}
+    execucao = {
+        "nome": args.nome,
+        "modo": args.modo,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "configuracao": configuracao,
+        "resultado": resultado,
+    }
+    print(f"💾 {salvar(execucao, args.pasta)}")
+
+    if args.comparar:
+        return 1 if comparar(carregar_resultado(args.comparar), execucao, args.tolerancia) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import os
+import threading
+
+from aquecimento import AQUECIMENTO, TOP_N, Aquecedor, FrequenciaBuscas, termos_configurados
+from cache import (
+    TIPO_DESAMBIGUACAO,
+    TIPO_NAO_ENCONTRADO,
+    TIPO_OK,
+    criar_cache_do_ambiente,
+    normalizar_termo,
+)
+from coalescencia import ChamadaUnica
+from indice_local import IndiceLocal
+from metricas import duracao_etapa, medir, registro
+from resolucao import ResolvedorTitulos, tipo_cache
+from sugestao import criar_indice_sugestao
+
+IDIOMA = "pt"
+SENTENCAS = 3
+
+# Idiomas aceitos no parâmetro lang
+IDIOMAS = tuple(i.strip() for i in os.getenv("MCP_IDIOMAS", "pt,en,es").split(",") if i.strip())
+
+# Cache de resumos compartilhado por todas as requisições do processo
+cache_resumos = criar_cache_do_ambiente()
+
+# Buscas idênticas simultâneas compartilham uma única chamada à Wikipedia
+buscas_em_andamento = ChamadaUnica()
+
+# Índice local opcional (indice_local.py), consultado antes da API da Wikipedia
+INDICE_LOCAL = os.getenv("MCP_INDICE_LOCAL")
+FALLBACK_API = os.getenv("MCP_FALLBACK_API", "1") != "0"
+indice_local = IndiceLocal(INDICE_LOCAL) if INDICE_LOCAL else None
+
+# Métricas do cache e das buscas em andamento, lidas no momento da coleta
+registro.medidor("mcp_cache_itens", "Itens no cache de resumos", lambda: len(cache_resumos))
+registro.contador("mcp_cache_acertos_total", "Acertos acumulados do cache de resumos", lambda: cache_resumos.acertos)
+registro.contador("mcp_cache_falhas_total", "Falhas acumuladas do cache de resumos", lambda: cache_resumos.falhas)
+registro.contador("mcp_cache_remocoes_total", "Remoções por LRU no cache de resumos", lambda: cache_resumos.remocoes)
+registro.medidor(
+    "mcp_buscas_upstream_em_andamento",
+    "Buscas distintas aguardando a Wikipedia",
+    buscas_em_andamento.em_andamento,
+)
+
+# Um índice de sugestões por idioma, com os títulos da lista configurada e do índice local
+_sugestoes = {}
+_lock_sugestoes = threading.Lock()
+
+def obter_sugestoes(idioma=IDIOMA):
+    """Índice de títulos do idioma para corrigir erros de digitação, ou None se desativado"""
+    if idioma not in _sugestoes:
+        with _lock_sugestoes:
+            if idioma not in _sugestoes:
+                _sugestoes[idioma] = criar_indice_sugestao(idioma, indice_local)
+    return _sugestoes[idioma]
+
+# Um resolvedor por idioma, cada um com sua sessão HTTP (pool keep-alive) e tabela de títulos
+_resolvedores = {}
+_lock_resolvedores = threading.Lock()
+
+def obter_resolvedor(idioma=IDIOMA):
+    """Resolve termo → título canônico + resumo em uma única ida à API do idioma"""
+    resolvedor = _resolvedores.get(idioma)
+    if resolvedor is None:
+        with _lock_resolvedores:
+            resolvedor = _resolvedores.get(idioma)
+            if resolvedor is None:
+                resolvedor = _resolvedores[idioma] = ResolvedorTitulos(idioma, sugestoes=obter_sugestoes(idioma))
+    return resolvedor
+
+def validar_idioma(idioma):
+    if idioma not in IDIOMAS:
+        raise ValueError(f'Idioma não suportado: {idioma}. Use um de: {", ".join(IDIOMAS)}')
+    return idioma
+
+def chave_cache(busca, idioma=IDIOMA, sentencas=SENTENCAS):
+    return (idioma, normalizar_termo(busca), sentencas)
+
+def consultar_cache(busca, idioma=IDIOMA, sentencas=SENTENCAS):
+    """Retorna {'titulo', 'texto', 'origem'} do cache ou None, sem nenhuma chamada de rede"""
+    chave = chave_cache(busca, idioma, sentencas)
+    # Toda busca do tráfego real passa por aqui: conta para o aquecimento
+    frequencia_buscas.registrar(chave[:2], (idioma, busca))
+    item = cache_resumos.obter(chave)
+    return item[1] if item is not None else None
+
+def buscar_resumo(busca, idioma=IDIOMA, sentencas=SENTENCAS):
+    """Busca o texto do resumo na Wikipedia, consultando antes o cache"""
+    return buscar_detalhes(busca, idioma, sentencas)["texto"]
+
+def buscar_detalhes(busca, idioma=IDIOMA, sentencas=SENTENCAS):
+    """Busca o resumo com título e origem, consultando antes o cache"""
+    detalhes = consultar_cache(busca, idioma, sentencas)
+    if detalhes is not None:
+        return detalhes
+    return atualizar_resumo(busca, idioma, sentencas)
+
+def atualizar_resumo(busca, idioma=IDIOMA, sentencas=SENTENCAS):
+    """Busca o resumo direto na Wikipedia e guarda o resultado no cache"""
+    return buscas_em_andamento.executar(
+        chave_cache(busca, idioma, sentencas),
+        lambda: _buscar_na_wikipedia(busca, idioma, sentencas),
+    )
+
+def titulo_conhecido(busca, idioma=IDIOMA):
+    """Título canônico já resolvido para o termo, sem chamada de rede, ou None"""
+    return obter_resolvedor(idioma).titulo_conhecido(busca)
+
+# Buscas recentes por idioma e termo, usadas para escolher o que aquecer
+frequencia_buscas = FrequenciaBuscas()
+
+def termos_para_aquecer():
+    """Pares (idioma, termo): os configurados, no idioma padrão, e as buscas mais frequentes"""
+    termos = {}
+    for idioma, termo in [(IDIOMA, t) for t in termos_configurados()] + frequencia_buscas.mais_frequentes(TOP_N):
+        termos.setdefault((idioma, normalizar_termo(termo)), (idioma, termo))
+    return list(termos.values())
+
+def criar_aquecedor(ocupado=None):
+    """Aquecedor do cache de resumos (atualiza os termos mesmo que já estejam no cache),
+    ou None com MCP_AQUECIMENTO=0"""
+    if not AQUECIMENTO:
+        return None
+    return Aquecedor(lambda item: atualizar_resumo(item[1], item[0]), termos_para_aquecer, ocupado=ocupado)
+
+# Origens dos resumos que não passam pelo resolvedor
+ORIGEM_INDICE_LOCAL = "indice_local"
+ORIGEM_NAO_ENCONTRADO = "nao_encontrado"
+
+def _buscar_no_indice_local(busca, idioma, sentencas):
+    """Backend local: retorna (detalhes, tipo) ou None se o termo não está no índice"""
+    if sentencas is None and FALLBACK_API:
+        # O índice só guarda a introdução: o artigo completo vem da API, para não
+        # servir (e guardar no cache como completo) apenas o primeiro parágrafo
+        return None
+    with medir(duracao_etapa, etapa="indice_local"):
+        achado = indice_local.resumo(busca, idioma, sentencas)
+        sugestoes = obter_sugestoes(idioma)
+        if achado is None and sugestoes is not None and not FALLBACK_API:
+            # Sem a API, que confere se o termo não é outro título, tenta o mais parecido do índice
+            corrigido = sugestoes.corrigir(busca)
+            if corrigido is not None:
+                achado = indice_local.resumo(corrigido, idioma, sentencas)
+                if achado is not None:
+                    achado = (achado[0], achado[1], True)
+    if achado is None:
+        return None
+    titulo, texto, desambiguacao = achado
+    detalhes = {"titulo": titulo, "texto": texto, "origem": ORIGEM_INDICE_LOCAL}
+    return detalhes, TIPO_DESAMBIGUACAO if desambiguacao else TIPO_OK
+
+def _buscar_na_api(busca, idioma, sentencas):
+    """Backend remoto: retorna (detalhes, tipo) ou None se nada foi encontrado"""
+    resolucao = obter_resolvedor(idioma).resolver(busca, sentencas)
+    if resolucao is None:
+        return None
+    return resolucao, tipo_cache(resolucao["origem"])
+
+# Backends consultados em ordem até o primeiro que encontrar o termo
+backends = []
+if indice_local is not None:
+    backends.append(_buscar_no_indice_local)
+if indice_local is None or FALLBACK_API:
+    backends.append(_buscar_na_api)
+
+def mensagem_nao_encontrado(busca, idioma=IDIOMA):
+    """Mensagem de termo não encontrado, com os títulos conhecidos mais parecidos"""
+    mensagem = f'Não foi encontrada informação sobre "{busca}" na Wikipedia.'
+    sugestoes = obter_sugestoes(idioma)
+    parecidos = [titulo for titulo, _ in sugestoes.sugerir(busca)] if sugestoes is not None else []
+    if parecidos:
+        mensagem += f' Você quis dizer: {", ".join(parecidos)}?'
+    return mensagem
+
+def _buscar_na_wikipedia(busca, idioma, sentencas):
+    for backend in backends:
+        achado = backend(busca, idioma, sentencas)
+        if achado is not None:
+            detalhes, tipo = achado
+            break
+    else:
+        detalhes = {
+            "titulo": None,
+            "texto": mensagem_nao_encontrado(busca, idioma),
+            "origem": ORIGEM_NAO_ENCONTRADO,
+        }
+        tipo = TIPO_NAO_ENCONTRADO
+    
+    cache_resumos.guardar(chave_cache(busca, idioma, sentencas), detalhes, tipo)
+    return detalhes
+
+# Limites do endpoint em lote
+MAX_ITENS_LOTE = int(os.getenv("MCP_MAX_ITENS_LOTE", "100"))
+MAX_PARALELISMO_LOTE = int(os.getenv("MCP_MAX_PARALELISMO_LOTE", "8"))
+
+def validar_lote(data):
+    """Valida o corpo do lote e retorna (buscas, paralelismo, idioma) ou levanta ValueError"""
+    buscas = data.get('buscas')
+    if not isinstance(buscas, list) or not buscas:
+        raise ValueError('Parâmetro buscas deve ser uma lista não vazia')
+    if len(buscas) > MAX_ITENS_LOTE:
+        raise ValueError(f'Máximo de {MAX_ITENS_LOTE} buscas por lote')
+    
+    paralelismo = data.get('paralelismo', MAX_PARALELISMO_LOTE)
+    if not isinstance(paralelismo, int) or paralelismo < 1:
+        raise ValueError('Parâmetro paralelismo deve ser um inteiro positivo')
+    
+    idioma = validar_idioma(data.get('lang', IDIOMA))
+    return buscas, min(paralelismo, MAX_PARALELISMO_LOTE), idioma
+
+def buscar_item_lote(busca, idioma=IDIOMA, funcao=buscar_resumo):
+    """Busca um termo do lote, convertendo falhas em erro por item"""
+    if not isinstance(busca, str) or not busca.strip():
+        return {'busca': busca, 'error': 'Busca vazia ou inválida'}
+    try:
+        return {'busca': busca, 'content': funcao(busca, idioma)}
+    except Exception as e:
+        return {'busca': busca, 'error': f'Erro ao buscar: {str(e)}'}
@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+from cache_persistente import CacheSQLite, gerar_chave
+
+# Tipos de entrada, cada um com seu próprio TTL
+TIPO_OK = "ok"
+TIPO_DESAMBIGUACAO = "desambiguacao"
+TIPO_NAO_ENCONTRADO = "nao_encontrado"
+
+# Versão do formato dos valores no cache compartilhado, parte da chave no SQLite: um
+# arquivo de uma versão anterior (2: {titulo, texto, origem}; 1: só o texto) é ignorado
+# em vez de lido no formato errado
+VERSAO_FORMATO = 2
+
+
+def normalizar_termo(termo: str) -> str:
+    """Normaliza o termo de busca para uso como chave de cache"""
+    return " ".join(termo.split()).casefold()
+
+
+class CacheResumos:
+    """Cache LRU em memória com limite de tamanho e TTL por tipo de entrada"""
+
+    def __init__(
+        self,
+        max_itens: int = 1024,
+        ttl: float = 3600.0,
+        ttl_desambiguacao: float = 600.0,
+        ttl_nao_encontrado: float = 120.0,
+    ):
+        self.max_itens = max_itens
+        self.ttls = {
+            TIPO_OK: ttl,
+            TIPO_DESAMBIGUACAO: ttl_desambiguacao,
+            TIPO_NAO_ENCONTRADO: ttl_nao_encontrado,
+        }
+        self._itens: "OrderedDict[Hashable, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.expiracoes = 0
+
+    def obter(self, chave: Hashable) -> Optional[Tuple[str, Any]]:
+        """Retorna (tipo, valor) ou None se a chave não está no cache ou expirou"""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+            expira_em, tipo, valor = item
+            if expira_em <= agora:
+                del self._itens[chave]
+                self.expiracoes += 1
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return tipo, valor
+
+    def guardar(self, chave: Hashable, valor: Any, tipo: str = TIPO_OK, ttl: Optional[float] = None) -> None:
+        """Guarda um valor usando o TTL correspondente ao tipo, ou `ttl` se for menor"""
+        ttl = self.ttls[tipo] if ttl is None else min(ttl, self.ttls[tipo])
+        if ttl <= 0 or self.max_itens <= 0:
+            return
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + ttl, tipo, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.remocoes += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "remocoes": self.remocoes,
+                "expiracoes": self.expiracoes,
+            }
+
+
+class CacheEmCamadas:
+    """Cache local (LRU em memória) na frente de um cache SQLite compartilhado entre processos.
+
+    Cada worker lê primeiro a própria memória; numa falha consulta o SQLite, que
+    recebe tudo o que qualquer worker buscou.
+    """
+
+    def __init__(self, local: CacheResumos, compartilhado: CacheSQLite):
+        self.local = local
+        self.compartilhado = compartilhado
+        self.acertos_compartilhado = 0
+        self._lock = threading.Lock()
+
+    # Contadores das duas camadas somados, usados nas métricas
+    max_itens = property(lambda self: self.local.max_itens)
+    acertos = property(lambda self: self.local.acertos + self.acertos_compartilhado)
+    falhas = property(lambda self: self.local.falhas - self.acertos_compartilhado)
+    remocoes = property(lambda self: self.local.remocoes)
+
+    def obter(self, chave: Hashable) -> Optional[Tuple[str, Any]]:
+        item = self.local.obter(chave)
+        if item is not None:
+            return item
+        item = self.compartilhado.obter_com_validade(gerar_chave(VERSAO_FORMATO, *chave))
+        if item is None:
+            return None
+        dados, restante = item
+        tipo, valor = json.loads(dados)
+        with self._lock:
+            self.acertos_compartilhado += 1
+        # A cópia local expira junto com a do SQLite, não um TTL inteiro depois
+        self.local.guardar(chave, valor, tipo, restante)
+        return tipo, valor
+
+    def guardar(self, chave: Hashable, valor: Any, tipo: str = TIPO_OK) -> None:
+        self.local.guardar(chave, valor, tipo)
+        ttl = self.local.ttls[tipo]
+        if ttl > 0:
+            self.compartilhado.guardar(gerar_chave(VERSAO_FORMATO, *chave), json.dumps([tipo, valor], ensure_ascii=False), ttl)
+
+    def limpar(self) -> None:
+        self.local.limpar()
+        self.compartilhado.limpar()
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    def estatisticas(self) -> Dict[str, int]:
+        estatisticas = self.local.estatisticas()
+        estatisticas["acertos_compartilhado"] = self.acertos_compartilhado
+        estatisticas["itens_compartilhado"] = len(self.compartilhado)
+        return estatisticas
+
+
+def criar_cache_do_ambiente() -> Union[CacheResumos, CacheEmCamadas]:
+    """Cria o cache a partir das variáveis de ambiente MCP_CACHE_*.
+
+    Com MCP_CACHE_COMPARTILHADO (caminho de um arquivo SQLite), os workers de
+    um deploy com vários processos compartilham o mesmo cache.
+    """
+    local = CacheResumos(
+        max_itens=int(os.getenv("MCP_CACHE_MAX_ITENS", "1024")),
+        ttl=float(os.getenv("MCP_CACHE_TTL", "3600")),
+        ttl_desambiguacao=float(os.getenv("MCP_CACHE_TTL_DESAMBIGUACAO", "600")),
+        ttl_nao_encontrado=float(os.getenv("MCP_CACHE_TTL_NAO_ENCONTRADO", "120")),
+    )
+    caminho = os.getenv("MCP_CACHE_COMPARTILHADO")
+    if not caminho:
+        return local
+    compartilhado = CacheSQLite(caminho, max_itens=int(os.getenv("MCP_CACHE_COMPARTILHADO_MAX_ITENS", "100000")))
+    return CacheEmCamadas(local, compartilhado)
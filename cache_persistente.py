@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Segundos entre atualizações do horário de acesso de uma mesma entrada
+INTERVALO_ACESSO = 60.0
+# A limpeza por tamanho roda a cada N escritas, não em todas
+INTERVALO_LIMPEZA = 64
+
+
+def gerar_chave(*partes: Any) -> str:
+    """Gera uma chave estável (sha256) a partir de valores serializáveis em JSON"""
+    dados = json.dumps(partes, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(dados.encode("utf-8")).hexdigest()
+
+
+class ConexoesPorThread:
+    """Uma conexão SQLite por thread e por processo (conexões não sobrevivem a um fork)"""
+
+    def __init__(self, caminho: str, pragmas: Tuple[str, ...] = ()):
+        self.caminho = caminho
+        self.pragmas = pragmas
+        self._local = threading.local()
+
+    def obter(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=5.0, isolation_level=None)
+            for pragma in self.pragmas:
+                conexao.execute(f"PRAGMA {pragma}")
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+
+class CacheSQLite:
+    """Cache chave/valor em SQLite, compartilhado entre processos e reinicializações"""
+
+    def __init__(self, caminho: str, max_itens: int = 10000, ttl: Optional[float] = None):
+        self.caminho = caminho
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._conexoes = ConexoesPorThread(caminho, ("journal_mode=WAL", "synchronous=NORMAL"))
+        self.acertos = 0
+        self.falhas = 0
+        self._escritas = 0
+
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        conexao = self._conexao()
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " chave TEXT PRIMARY KEY,"
+            " valor TEXT NOT NULL,"
+            " expira REAL,"
+            " acesso REAL NOT NULL)"
+        )
+        conexao.execute("CREATE INDEX IF NOT EXISTS idx_cache_acesso ON cache (acesso)")
+
+    def _conexao(self) -> sqlite3.Connection:
+        return self._conexoes.obter()
+
+    def obter(self, chave: str) -> Optional[str]:
+        item = self.obter_com_validade(chave)
+        return item[0] if item is not None else None
+
+    def obter_com_validade(self, chave: str) -> Optional[Tuple[str, Optional[float]]]:
+        """Retorna (valor, segundos até expirar ou None se não expira) ou None"""
+        agora = time.time()
+        conexao = self._conexao()
+        linha = conexao.execute(
+            "SELECT valor, acesso, expira FROM cache WHERE chave = ? AND (expira IS NULL OR expira > ?)",
+            (chave, agora),
+        ).fetchone()
+        if linha is None:
+            self.falhas += 1
+            return None
+        # Atualiza o horário de acesso no máximo uma vez por intervalo, para não
+        # transformar cada leitura numa escrita disputada entre os processos
+        if agora - linha[1] > INTERVALO_ACESSO:
+            conexao.execute("UPDATE cache SET acesso = ? WHERE chave = ?", (agora, chave))
+        self.acertos += 1
+        return linha[0], (linha[2] - agora if linha[2] is not None else None)
+
+    def guardar(self, chave: str, valor: str, ttl: Optional[float] = None) -> None:
+        agora = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expira = agora + ttl if ttl else None
+        conexao = self._conexao()
+        conexao.execute(
+            "INSERT OR REPLACE INTO cache (chave, valor, expira, acesso) VALUES (?, ?, ?, ?)",
+            (chave, valor, expira, agora),
+        )
+        self._escritas += 1
+        if self._escritas % INTERVALO_LIMPEZA == 0:
+            self.remover_excedentes()
+
+    def remover_excedentes(self) -> None:
+        """Remove as entradas expiradas e, acima do limite, as menos acessadas"""
+        agora = time.time()
+        conexao = self._conexao()
+        conexao.execute("DELETE FROM cache WHERE expira IS NOT NULL AND expira <= ?", (agora,))
+        conexao.execute(
+            "DELETE FROM cache WHERE chave IN ("
+            " SELECT chave FROM cache ORDER BY acesso DESC LIMIT -1 OFFSET ?)",
+            (self.max_itens,),
+        )
+
+    def limpar(self) -> None:
+        self._conexao().execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        return self._conexao().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {
+            "itens": len(self),
+            "max_itens": self.max_itens,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+        }
+
+
+def criar_cache_llm_do_ambiente() -> Optional[CacheSQLite]:
+    """Cria o cache de resumos da IA a partir das variáveis MCP_CACHE_LLM_*"""
+    caminho = os.getenv("MCP_CACHE_LLM_ARQUIVO", ".cache/resumos_llm.sqlite3")
+    if not caminho:
+        return None
+    ttl = float(os.getenv("MCP_CACHE_LLM_TTL", "0"))
+    return CacheSQLite(
+        caminho,
+        max_itens=int(os.getenv("MCP_CACHE_LLM_MAX_ITENS", "10000")),
+        ttl=ttl or None,
+    )
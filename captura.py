@@ -0,0 +1,123 @@
+import glob
+import os
+import random
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from log_amostrado import EscritorAssincrono
+from metricas import coletar_etapas
+
+# Captura do tráfego real para o replay.py (desativada por padrão)
+CAPTURA = os.getenv("MCP_CAPTURA", "0") == "1"
+PASTA = os.getenv("MCP_CAPTURA_PASTA", "capturas")
+MAX_BYTES = int(float(os.getenv("MCP_CAPTURA_MAX_MB", "64")) * 1024 * 1024)
+MAX_ARQUIVOS = int(os.getenv("MCP_CAPTURA_ARQUIVOS", "20"))
+AMOSTRAGEM = float(os.getenv("MCP_CAPTURA_AMOSTRAGEM", "1"))
+CAPACIDADE = int(os.getenv("MCP_CAPTURA_CAPACIDADE", "10000"))
+
+PREFIXO_ARQUIVO = "captura-"
+
+# Cabeçalhos que mudam a resposta (formato e compressão), reenviados pelo replay.py
+CABECALHOS_CAPTURADOS = ("Accept", "Accept-Encoding")
+
+
+class EscritorRotativo(EscritorAssincrono):
+    """EscritorAssincrono que grava em `pasta/captura-<data>-<pid>-<n>.jsonl`, abre um
+    arquivo novo a cada `max_bytes` e apaga os mais antigos além de `max_arquivos`"""
+
+    def __init__(self, pasta: str, max_bytes: int = MAX_BYTES, max_arquivos: int = MAX_ARQUIVOS, capacidade: int = CAPACIDADE):
+        os.makedirs(pasta, exist_ok=True)
+        self.pasta = pasta
+        self.max_bytes = max_bytes
+        self.max_arquivos = max_arquivos
+        self.caminho: Optional[str] = None
+        self._arquivo = None
+        self._tamanho = 0
+        self._sequencia = 0
+        super().__init__(capacidade=capacidade)
+
+    def _rotacionar(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.close()
+        self._sequencia += 1
+        nome = f"{PREFIXO_ARQUIVO}{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequencia:04d}.jsonl"
+        self.caminho = os.path.join(self.pasta, nome)
+        self._arquivo = open(self.caminho, "ab")
+        self._tamanho = 0
+        # Vale para os arquivos de todos os workers que gravam na mesma pasta
+        arquivos = sorted(glob.glob(os.path.join(self.pasta, f"{PREFIXO_ARQUIVO}*.jsonl")), key=os.path.getmtime)
+        for antigo in arquivos[:-self.max_arquivos] if self.max_arquivos > 0 else []:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+
+    def _gravar(self, linha: str) -> None:
+        dados = linha.encode("utf-8")
+        if self._arquivo is None or self._tamanho + len(dados) > self.max_bytes:
+            self._rotacionar()
+        self._arquivo.write(dados)
+        self._tamanho += len(dados)
+
+    def _descarregar(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.flush()
+
+    def fechar(self, timeout: float = 5.0) -> None:
+        super().fechar(timeout)
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+class Captura:
+    """Registra as requisições amostradas: rota, argumentos, status, duração, tempo por
+    etapa e, nas buscas, o título resolvido e se veio do cache"""
+
+    def __init__(self, escritor: EscritorAssincrono, amostragem: float = AMOSTRAGEM):
+        self.escritor = escritor
+        self.amostragem = amostragem
+
+    def iniciar(self, cabecalhos: Optional[Mapping[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Chamado no início de toda requisição: retorna a anotação da requisição
+        amostrada, ou None, e liga (ou desliga) a soma dos tempos por etapa"""
+        if self.amostragem <= 0 or (self.amostragem < 1 and random.random() >= self.amostragem):
+            coletar_etapas(False)
+            return None
+        anotacao = {"ts": time.time(), "inicio": time.perf_counter(), "etapas": coletar_etapas()}
+        if cabecalhos is not None:
+            anotacao["cabecalhos"] = {
+                nome: cabecalhos[nome] for nome in CABECALHOS_CAPTURADOS if cabecalhos.get(nome)
+            }
+        return anotacao
+
+    def concluir(self, anotacao: Dict[str, Any], rota: str, argumentos: Any, status: Optional[int]) -> None:
+        registro = {
+            "ts": round(anotacao["ts"], 6),
+            "rota": rota,
+            "ferramenta": rota.rsplit("/", 1)[-1],
+            "argumentos": argumentos,
+            "status": status,
+            "duracao_ms": round((time.perf_counter() - anotacao["inicio"]) * 1000, 3),
+            "etapas_ms": {etapa: round(s * 1000, 3) for etapa, s in anotacao["etapas"].items()},
+        }
+        for campo in ("cabecalhos", "titulo", "origem", "cache"):
+            if campo in anotacao:
+                registro[campo] = anotacao[campo]
+        self.escritor.escrever(registro)
+
+
+def anotar_busca(anotacao: Optional[Dict[str, Any]], detalhes: Dict[str, Any], em_cache: bool) -> None:
+    """Guarda na anotação da requisição (se amostrada) o resultado da busca"""
+    if anotacao is None:
+        return
+    anotacao["titulo"] = detalhes.get("titulo")
+    anotacao["origem"] = detalhes.get("origem")
+    anotacao["cache"] = "acerto" if em_cache else "falha"
+
+
+def criar_captura_do_ambiente() -> Optional[Captura]:
+    """Captura a partir das variáveis MCP_CAPTURA_*, ou None se desativada"""
+    if not CAPTURA:
+        return None
+    return Captura(EscritorRotativo(PASTA))
@@ -1,26 +1,195 @@
 import asyncio
+import itertools
 import json
-from typing import Any, Dict
-import aiohttp
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
+import threading
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
-# Carrega variáveis de ambiente
-load_dotenv()
+from cache_persistente import CacheSQLite, criar_cache_llm_do_ambiente, gerar_chave
+from compressao import CLIENTE_COMPRESSAO, CLIENTE_MSGPACK, cabecalhos_cliente, decodificar
+from configuracao import carregar_env, chave_openai, importar_sob_demanda, url_openai
+from contexto import montar_contexto
+from metricas import duracao_cliente, medir
+from resiliencia import (
+    DISJUNTOR_FALHAS,
+    DISJUNTOR_RECUPERACAO,
+    HEDGE,
+    HEDGE_PERCENTIL,
+    RETRY_AFTER_MAXIMO,
+    STATUS_REPETIVEIS,
+    TENTATIVAS,
+    TIMEOUT_CONEXAO,
+    TIMEOUT_LEITURA,
+    CircuitoAberto,
+    Disjuntor,
+    JanelaLatencias,
+    RespostaRepetivel,
+    atraso_backoff,
+    eventos_resiliencia,
+    ler_retry_after,
+    primeira_que_responder,
+)
+from streaming import CONTENT_TYPE_NDJSON, evento_erro
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Carrega o .env antes das leituras de MCP_* feitas na importação (MCP_SERVIDOR_URL,
+# MCP_CACHE_LLM_*); o python-dotenv só é importado se houver um .env
+carregar_env()
+
+# aiohttp e openai só são carregados no primeiro uso (MCP_IMPORTACAO_PREGUICOSA)
+aiohttp = importar_sob_demanda("aiohttp")
+openai = importar_sob_demanda("openai")
+
+# Servidor do cliente_mcp: http://host:porta ou, com o servidor no mesmo host,
+# unix:///caminho/do.sock (MCP_SOCKET_UNIX no servidor), sem a pilha TCP
+SERVIDOR_URL = os.getenv("MCP_SERVIDOR_URL", "http://localhost:8000")
+PREFIXO_UNIX = "unix://"
+
+def separar_url(url: str) -> Tuple[str, Optional[str]]:
+    """URL HTTP das requisições e caminho do socket Unix, se houver:
+    unix:///tmp/mcp.sock vira ("http://localhost", "/tmp/mcp.sock")"""
+    if url.startswith(PREFIXO_UNIX):
+        return "http://localhost", url[len(PREFIXO_UNIX):]
+    return url, None
+
+def criar_conector(url: str, limite: int = 100, keepalive: float = 30.0) -> "aiohttp.BaseConnector":
+    """Pool de conexões keep-alive por TCP ou, para unix://, pelo socket Unix"""
+    _, socket_unix = separar_url(url)
+    if socket_unix:
+        return aiohttp.UnixConnector(path=socket_unix, limit=limite, keepalive_timeout=keepalive)
+    return aiohttp.TCPConnector(limit=limite, keepalive_timeout=keepalive)
+
+# Ferramentas só de leitura: podem ser repetidas e duplicadas (hedge) sem efeito colateral
+FERRAMENTAS_IDEMPOTENTES = frozenset({"buscar_wikipedia", "buscar_wikipedia_lote"})
+
+# Métodos JSON-RPC que não alteram nada no servidor
+_METODOS_RPC_IDEMPOTENTES = frozenset({"initialize", "ping", "tools/list"})
 
 class ClienteMCP:
-    def __init__(self, base_url: str = "http://localhost:8000"):
-        self.base_url = base_url
+    def __init__(
+        self,
+        base_url: str = SERVIDOR_URL,
+        limite_conexoes: int = 100,
+        keepalive: float = 30.0,
+        timeout_conexao: float = TIMEOUT_CONEXAO,
+        timeout_leitura: float = TIMEOUT_LEITURA,
+        tentativas: int = TENTATIVAS,
+        hedge: bool = HEDGE,
+        compressao: bool = CLIENTE_COMPRESSAO,
+        msgpack: bool = CLIENTE_MSGPACK,
+    ):
+        # Com unix://, as URLs continuam HTTP e só o conector muda
+        self.url_servidor = base_url
+        self.base_url, self.socket_unix = separar_url(base_url)
+        self.limite_conexoes = limite_conexoes
+        self.keepalive = keepalive
+        self.timeout_conexao = timeout_conexao
+        self.timeout_leitura = timeout_leitura
+        self.tentativas = tentativas
+        self.hedge = hedge
+        # Respostas comprimidas (zstd/gzip) e em MessagePack, se o servidor aceitar
+        self.cabecalhos = cabecalhos_cliente(compressao, msgpack)
+        self.latencias = JanelaLatencias()
+        self.disjuntor = Disjuntor(DISJUNTOR_FALHAS, DISJUNTOR_RECUPERACAO)
         self.session = None
+        self._persistente = False
+        self._usos = 0
+        self._ids_rpc = itertools.count(1)
+    
+    async def abrir(self):
+        """Abre uma sessão persistente, reaproveitada até chamar fechar()"""
+        self._persistente = True
+        self._criar_sessao()
+        return self
+    
+    async def fechar(self):
+        self._persistente = False
+        if self.session:
+            await self.session.close()
+            self.session = None
+    
+    def _criar_sessao(self):
+        if self.session is None or self.session.closed:
+            # Pool de conexões keep-alive reaproveitado entre as chamadas
+            connector = criar_conector(self.url_servidor, self.limite_conexoes, self.keepalive)
+            # Prazo para conectar e para cada leitura, em vez de esperar o TCP desistir
+            timeout = aiohttp.ClientTimeout(sock_connect=self.timeout_conexao, sock_read=self.timeout_leitura)
+            # A descompressão fica com compressao.decodificar, que também conhece o zstd
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=timeout, headers=self.cabecalhos, auto_decompress=False
+            )
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self._criar_sessao()
+        self._usos += 1
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        self._usos -= 1
+        # Sessões persistentes e ainda em uso por outro contexto não são fechadas
+        if self.session and not self._persistente and self._usos == 0:
             await self.session.close()
+            self.session = None
+    
+    async def _post(self, url: str, payload: Any) -> Tuple[int, Any]:
+        """Uma tentativa de POST; respostas de falha temporária viram RespostaRepetivel"""
+        async with self.session.post(url, json=payload) as response:
+            if response.status in STATUS_REPETIVEIS:
+                raise RespostaRepetivel(response.status, ler_retry_after(response.headers.get("Retry-After")))
+            corpo = await self._ler_corpo(response) if response.status == 200 else None
+            return response.status, corpo
+    
+    @staticmethod
+    async def _ler_corpo(response) -> Any:
+        return decodificar(await response.read(), response.content_type, response.headers.get("Content-Encoding"))
+    
+    async def _enviar(self, url: str, payload: Any, idempotente: bool) -> Tuple[int, Any]:
+        """POST protegido pelo disjuntor; chamadas idempotentes ganham novas tentativas
+        com backoff e, se habilitado, hedge após o p95 das latências recentes"""
+        tentativas = max(1, self.tentativas) if idempotente else 1
+        for tentativa in range(tentativas):
+            if not self.disjuntor.permitir():
+                eventos_resiliencia.incrementar(evento="circuito_aberto")
+                raise CircuitoAberto("servidor indisponível (circuito aberto)")
+            atraso_hedge = self.latencias.percentil(HEDGE_PERCENTIL) if idempotente and self.hedge else None
+            inicio = time.perf_counter()
+            try:
+                resultado = await primeira_que_responder(lambda: self._post(url, payload), atraso_hedge)
+            except (aiohttp.ClientError, asyncio.TimeoutError, RespostaRepetivel) as e:
+                self.disjuntor.registrar_falha()
+                # O Retry-After do servidor prevalece sobre o backoff; se for longo demais, desiste
+                espera = atraso_backoff(tentativa)
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None:
+                    espera = max(espera, retry_after)
+                if tentativa == tentativas - 1 or (retry_after or 0) > RETRY_AFTER_MAXIMO:
+                    raise
+                eventos_resiliencia.incrementar(evento="repeticao")
+                await asyncio.sleep(espera)
+                continue
+            self._registrar_status(resultado[0], time.perf_counter() - inicio)
+            return resultado
+    
+    def _registrar_status(self, status: int, duracao: Optional[float] = None) -> None:
+        """Qualquer 5xx (e o 429) é falha para o disjuntor, mesmo sem nova tentativa;
+        só as respostas 2xx entram na janela de latências usada pelo hedge"""
+        if status >= 500 or status in STATUS_REPETIVEIS:
+            self.disjuntor.registrar_falha()
+            return
+        self.disjuntor.registrar_sucesso()
+        if 200 <= status < 300 and duracao is not None:
+            self.latencias.registrar(duracao)
+    
+    @staticmethod
+    def _descrever_erro(erro: Exception) -> str:
+        if isinstance(erro, RespostaRepetivel):
+            return f"Erro na requisição: {erro.status}"
+        if isinstance(erro, asyncio.TimeoutError):
+            return "Erro ao conectar com o servidor: tempo esgotado"
+        return f"Erro ao conectar com o servidor: {str(erro)}"
     
     async def chamar_ferramenta(self, nome_ferramenta: str, argumentos: Dict[str, Any]) -> str:
         """Chama uma ferramenta no servidor MCP"""
@@ -30,56 +199,300 @@ class ClienteMCP:
         url = f"{self.base_url}/tools/{nome_ferramenta}"
         
         try:
-            async with self.session.post(url, json=argumentos) as response:
-                if response.status == 200:
-                    resultado = await response.json()
-                    return resultado.get('content', '')
-                else:
-                    return f"Erro na requisição: {response.status}"
+            with medir(duracao_cliente, etapa="ferramenta"):
+                status, resultado = await self._enviar(url, argumentos, nome_ferramenta in FERRAMENTAS_IDEMPOTENTES)
+        except Exception as e:
+            return self._descrever_erro(e)
+        if status == 200:
+            return resultado.get('content', '')
+        return f"Erro na requisição: {status}"
+    
+    async def chamar_ferramenta_stream(
+        self, nome_ferramenta: str, argumentos: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Chama uma ferramenta no modo streaming, entregando os eventos NDJSON conforme chegam:
+        o título resolvido, os trechos do conteúdo e por fim os metadados (ou um evento de erro)"""
+        if not self.session:
+            raise RuntimeError("Cliente não inicializado. Use async with.")
+        
+        url = f"{self.base_url}/tools/{nome_ferramenta}"
+        if not self.disjuntor.permitir():
+            eventos_resiliencia.incrementar(evento="circuito_aberto")
+            yield evento_erro(self._descrever_erro(CircuitoAberto("servidor indisponível (circuito aberto)")))
+            return
+        
+        # Sem novas tentativas: parte da resposta pode já ter sido entregue
+        inicio = time.perf_counter()
+        try:
+            async with self.session.post(
+                url, json={**argumentos, "stream": True},
+                headers={"Accept": CONTENT_TYPE_NDJSON, "Accept-Encoding": "identity"},
+            ) as response:
+                if response.status != 200:
+                    self._registrar_status(response.status)
+                    yield evento_erro(f"Erro na requisição: {response.status}")
+                    return
+                if response.content_type != CONTENT_TYPE_NDJSON:
+                    # Servidor sem modo streaming: a resposta inteira vira um único trecho
+                    resultado = await self._ler_corpo(response)
+                    yield {"tipo": "conteudo", "texto": resultado.get('content', '')}
+                    yield {"tipo": "fim"}
+                    return
+                primeiro = True
+                async for linha in response.content:
+                    if not linha.strip():
+                        continue
+                    if primeiro:
+                        duracao_cliente.observar(time.perf_counter() - inicio, etapa="ferramenta_primeiro_evento")
+                        primeiro = False
+                    yield json.loads(linha)
+            self.disjuntor.registrar_sucesso()
+            duracao_cliente.observar(time.perf_counter() - inicio, etapa="ferramenta_stream")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.disjuntor.registrar_falha()
+            yield evento_erro(self._descrever_erro(e))
+        except Exception as e:
+            yield evento_erro(self._descrever_erro(e))
+    
+    async def buscar_wikipedia_lote(
+        self, buscas: List[str], paralelismo: Optional[int] = None, lang: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Busca vários termos em uma única requisição ao servidor MCP"""
+        if not self.session:
+            raise RuntimeError("Cliente não inicializado. Use async with.")
+        
+        url = f"{self.base_url}/tools/buscar_wikipedia_lote"
+        argumentos: Dict[str, Any] = {"buscas": list(buscas)}
+        if paralelismo is not None:
+            argumentos["paralelismo"] = paralelismo
+        if lang is not None:
+            argumentos["lang"] = lang
+        
+        try:
+            with medir(duracao_cliente, etapa="ferramenta_lote"):
+                status, resultado = await self._enviar(url, argumentos, idempotente=True)
+            if status == 200:
+                return resultado.get('resultados', [])
+            erro = f"Erro na requisição: {status}"
+        except Exception as e:
+            erro = self._descrever_erro(e)
+        return [{"busca": busca, "error": erro} for busca in buscas]
+
+    async def rpc(self, payload: Any) -> Any:
+        """Envia uma mensagem ou um lote JSON-RPC 2.0 para /mcp numa única requisição HTTP"""
+        if not self.session:
+            raise RuntimeError("Cliente não inicializado. Use async with.")
+        
+        with medir(duracao_cliente, etapa="rpc"):
+            status, resposta = await self._enviar(f"{self.base_url}/mcp", payload, self._rpc_idempotente(payload))
+        if status == 202:
+            return None
+        if status != 200:
+            raise RuntimeError(f"Erro na requisição: {status}")
+        return resposta
+    
+    @staticmethod
+    def _rpc_idempotente(payload: Any) -> bool:
+        """Lotes só com consultas e chamadas a ferramentas idempotentes podem ser repetidos"""
+        mensagens = payload if isinstance(payload, list) else [payload]
+        for mensagem in mensagens:
+            if not isinstance(mensagem, dict):
+                return False
+            metodo = mensagem.get("method")
+            if metodo == "tools/call":
+                # "params": null (ou ausente) não pode derrubar a chamada antes de ela sair
+                params = mensagem.get("params") or {}
+                if not isinstance(params, dict) or params.get("name") not in FERRAMENTAS_IDEMPOTENTES:
+                    return False
+            elif metodo not in _METODOS_RPC_IDEMPOTENTES:
+                return False
+        return True
+    
+    async def listar_ferramentas(self) -> List[Dict[str, Any]]:
+        resposta = await self.rpc({"jsonrpc": "2.0", "id": next(self._ids_rpc), "method": "tools/list"})
+        return resposta.get("result", {}).get("tools", [])
+    
+    async def chamar_ferramentas(self, chamadas: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Chama várias ferramentas num único lote JSON-RPC; o servidor as executa em paralelo"""
+        mensagens = [
+            {
+                "jsonrpc": "2.0",
+                "id": next(self._ids_rpc),
+                "method": "tools/call",
+                "params": {"name": nome, "arguments": argumentos},
+            }
+            for nome, argumentos in chamadas
+        ]
+        try:
+            respostas = await self.rpc(mensagens)
+        except RuntimeError as e:
+            return [str(e)] * len(chamadas)
         except Exception as e:
-            return f"Erro ao conectar com o servidor: {str(e)}"
+            return [self._descrever_erro(e)] * len(chamadas)
+        
+        if not isinstance(respostas, list):
+            respostas = [respostas]
+        por_id = {resposta.get("id"): resposta for resposta in respostas}
+        resultados = []
+        for mensagem in mensagens:
+            resposta = por_id.get(mensagem["id"], {})
+            if "result" in resposta:
+                resultados.append("".join(c.get("text", "") for c in resposta["result"].get("content", [])))
+            else:
+                erro = resposta.get("error", {}).get("message", "sem resposta")
+                resultados.append(f"Erro na requisição: {erro}")
+        return resultados
 
 # Instância global do cliente
 cliente_mcp = ClienteMCP()
 
-async def testar_servidor(cliente: ClienteMCP, busca: str) -> str:
-    """Testa o servidor buscando informações e gerando resposta com IA"""
+MODELO_OPENAI = "gpt-3.5-turbo"
+PARAMETROS_OPENAI = {"max_tokens": 500, "temperature": 0.7}
+
+# Cache em disco dos resumos já gerados, compartilhado entre processos; criado no
+# primeiro uso, para que importar o módulo não crie o .cache/resumos_llm.sqlite3
+usar_cache_llm = True
+_cache_llm: Optional[CacheSQLite] = None
+_lock_cache_llm = threading.Lock()
+
+def obter_cache_llm() -> Optional[CacheSQLite]:
+    """Retorna o cache de resumos da IA, criando-o na primeira chamada, ou None se desativado"""
+    global _cache_llm
+    if not usar_cache_llm:
+        return None
+    if _cache_llm is None:
+        with _lock_cache_llm:
+            if _cache_llm is None:
+                _cache_llm = criar_cache_llm_do_ambiente()
+    return _cache_llm
+
+# Cliente OpenAI assíncrono reaproveitado enquanto o event loop for o mesmo
+_cliente_openai = None
+_loop_cliente_openai = None
+# Fechamentos de clientes antigos em andamento (referência para a tarefa não ser coletada)
+_fechamentos_openai: Set["asyncio.Future[None]"] = set()
+
+async def _fechar_cliente_openai(cliente: "AsyncOpenAI") -> None:
+    try:
+        await cliente.close()
+    except Exception:
+        # Conexões presas a um loop já encerrado: não há mais o que liberar
+        pass
+
+def _descartar_cliente_openai(cliente: "AsyncOpenAI", loop_antigo: asyncio.AbstractEventLoop) -> None:
+    """Fecha o cliente de outro event loop: nele, se ainda estiver rodando (outra thread),
+    senão no loop atual"""
+    if loop_antigo.is_running() and not loop_antigo.is_closed():
+        fechamento = asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(_fechar_cliente_openai(cliente), loop_antigo)
+        )
+    else:
+        fechamento = asyncio.ensure_future(_fechar_cliente_openai(cliente))
+    _fechamentos_openai.add(fechamento)
+    fechamento.add_done_callback(_fechamentos_openai.discard)
+
+def obter_cliente_openai() -> "AsyncOpenAI":
+    """Retorna o cliente OpenAI do event loop atual, criando-o na primeira chamada"""
+    global _cliente_openai, _loop_cliente_openai
+    loop = asyncio.get_running_loop()
+    if _cliente_openai is None or _loop_cliente_openai is not loop:
+        if _cliente_openai is not None:
+            _descartar_cliente_openai(_cliente_openai, _loop_cliente_openai)
+        _cliente_openai = openai.AsyncOpenAI(api_key=chave_openai(), base_url=url_openai())
+        _loop_cliente_openai = loop
+    return _cliente_openai
+
+def montar_mensagens(busca: str, resultado_busca: str, pergunta: Optional[str] = None) -> List[Dict[str, str]]:
+    if pergunta:
+        pedido = f"Com base nas informações da Wikipedia abaixo sobre '{busca}', responda de forma clara e informativa: {pergunta}"
+    else:
+        pedido = f"Com base nas informações da Wikipedia abaixo sobre '{busca}', forneça um resumo claro e informativo:"
+    return [
+        {
+            "role": "system",
+            "content": "Você é um assistente útil que explica conceitos de forma clara e didática em português."
+        },
+        {
+            "role": "user",
+            "content": f"{pedido}\n\n{resultado_busca}"
+        }
+    ]
+
+async def gerar_resumo_stream(busca: str, resultado_busca: str, pergunta: Optional[str] = None) -> AsyncIterator[str]:
+    """Gera o resumo com OpenAI, entregando os tokens conforme chegam"""
+    # Só as passagens mais relevantes para a pergunta, dentro do orçamento de tokens
+    with medir(duracao_cliente, etapa="contexto"):
+        contexto = montar_contexto(resultado_busca, pergunta or busca)
+    mensagens = montar_mensagens(busca, contexto, pergunta)
+    chave = gerar_chave(MODELO_OPENAI, mensagens, PARAMETROS_OPENAI)
+    cache_llm = obter_cache_llm()
+    if cache_llm is not None:
+        with medir(duracao_cliente, etapa="llm_cache"):
+            resumo = await asyncio.to_thread(cache_llm.obter, chave)
+        if resumo is not None:
+            yield resumo
+            return
+    
+    inicio = time.perf_counter()
+    stream = await obter_cliente_openai().chat.completions.create(
+        model=MODELO_OPENAI,
+        messages=mensagens,
+        stream=True,
+        **PARAMETROS_OPENAI
+    )
+    partes = []
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            if not partes:
+                duracao_cliente.observar(time.perf_counter() - inicio, etapa="llm_primeiro_token")
+            partes.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+    duracao_cliente.observar(time.perf_counter() - inicio, etapa="llm_total")
+    
+    # Só guarda respostas completas
+    if cache_llm is not None and partes:
+        await asyncio.to_thread(cache_llm.guardar, chave, "".join(partes))
+
+async def testar_servidor_stream(
+    cliente: ClienteMCP, busca: str, pergunta: Optional[str] = None, completo: bool = False
+) -> AsyncIterator[str]:
+    """Busca informações e gera a resposta com IA, entregando o texto em partes.
+
+    Com completo=True o servidor devolve o artigo inteiro, reduzido às passagens
+    mais relevantes para a pergunta antes de ir ao modelo.
+    """
+    argumentos: Dict[str, Any] = {"busca": busca}
+    if completo:
+        argumentos["completo"] = True
     
     async with cliente:
         # Busca informações na Wikipedia via servidor MCP
-        resultado_busca = await cliente.chamar_ferramenta(
-            "buscar_wikipedia", 
-            {"busca": busca}
-        )
-        
-        # Se houve erro na busca, retorna o erro
-        if resultado_busca.startswith("Erro"):
-            return resultado_busca
-        
-        # Usa OpenAI para gerar uma resposta mais elaborada
-        try:
-            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente útil que explica conceitos de forma clara e didática em português."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Com base nas informações da Wikipedia abaixo sobre '{busca}', forneça um resumo claro e informativo:\n\n{resultado_busca}"
-                    }
-                ],
-                max_tokens=500,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
+        resultado_busca = await cliente.chamar_ferramenta("buscar_wikipedia", argumentos)
+    
+    # Se houve erro na busca, retorna o erro
+    if resultado_busca.startswith("Erro"):
+        yield resultado_busca
+        return
+    
+    # Usa OpenAI para gerar uma resposta mais elaborada
+    gerou_texto = False
+    try:
+        async for parte in gerar_resumo_stream(busca, resultado_busca, pergunta):
+            gerou_texto = True
+            yield parte
+    except Exception as e:
+        if gerou_texto:
+            yield f"\n\n*Nota: A geração do resumo com IA foi interrompida: {str(e)}*"
+        else:
             # Se falhar com OpenAI, retorna apenas o resultado da Wikipedia
-            return f"**Informações da Wikipedia:**\n\n{resultado_busca}\n\n*Nota: Não foi possível gerar resumo com IA: {str(e)}*"
+            yield f"**Informações da Wikipedia:**\n\n{resultado_busca}\n\n*Nota: Não foi possível gerar resumo com IA: {str(e)}*"
+
+async def testar_servidor(
+    cliente: ClienteMCP, busca: str, pergunta: Optional[str] = None, completo: bool = False
+) -> str:
+    """Testa o servidor buscando informações e gerando resposta com IA"""
+    partes = [parte async for parte in testar_servidor_stream(cliente, busca, pergunta, completo)]
+    return "".join(partes)
 
 if __name__ == "__main__":
     # Teste básico
@@ -1,33 +1,25 @@
 import asyncio
 import json
+from functools import lru_cache
 from typing import Any, Dict
-import aiohttp
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
 
-import asyncio
-import json
-from typing import Any, Dict
-import aiohttp
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from configuracao import chave_openai, importar_sob_demanda
+from configuracao import carregar_env as carregar_arquivo_env
 
-# Carrega variáveis de ambiente de forma mais robusta
+aiohttp = importar_sob_demanda("aiohttp")
+openai = importar_sob_demanda("openai")
+
+# Carrega variáveis de ambiente de forma mais robusta, na primeira chamada ao servidor
+@lru_cache(maxsize=None)
 def carregar_env():
-    # Tenta carregar do diretório atual
-    if os.path.exists('.env'):
-        load_dotenv('.env')
-        print("✅ Arquivo .env carregado do diretório atual")
-    elif os.path.exists('/home/paribe/mcp_app/.env'):
-        load_dotenv('/home/paribe/mcp_app/.env')
-        print("✅ Arquivo .env carregado do caminho completo")
+    caminho = carregar_arquivo_env()
+    if caminho:
+        print(f"✅ Arquivo .env carregado de {caminho}")
     else:
         print("⚠️ Arquivo .env não encontrado")
     
     # Verifica se a chave foi carregada
-    api_key = os.getenv('OPENAI_API_KEY')
+    api_key = chave_openai()
     if api_key:
         print(f"🔑 Chave OpenAI carregada: {api_key[:10]}...")
     else:
@@ -35,9 +27,6 @@ def carregar_env():
     
     return api_key
 
-# Carrega as variáveis de ambiente
-API_KEY = carregar_env()
-
 class ClienteMCP:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
@@ -102,13 +91,13 @@ async def testar_servidor(cliente: ClienteMCP, busca: str) -> str:
         
         # Usa OpenAI para gerar uma resposta mais elaborada
         try:
-            # Usa a chave carregada globalmente
-            if not API_KEY:
+            api_key = carregar_env()
+            if not api_key:
                 print("⚠️ Chave OpenAI não disponível, retornando só Wikipedia")
                 return f"**Informações da Wikipedia:**\n\n{resultado_busca}"
             
             print("🤖 Gerando resposta com OpenAI...")
-            client = OpenAI(api_key=API_KEY)
+            client = openai.OpenAI(api_key=api_key)
             response = client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Chamada:
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class ChamadaUnica:
+    """Agrupa chamadas concorrentes com a mesma chave em uma única execução (threads)"""
+
+    def __init__(self):
+        self._chamadas: Dict[Hashable, _Chamada] = {}
+        self._lock = threading.Lock()
+        self.execucoes = 0
+        self.compartilhadas = 0
+
+    def executar(self, chave: Hashable, funcao: Callable[[], Any]) -> Any:
+        with self._lock:
+            chamada = self._chamadas.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = self._chamadas[chave] = _Chamada()
+                self.execucoes += 1
+            else:
+                self.compartilhadas += 1
+
+        if not lider:
+            # Espera a chamada em andamento e compartilha o resultado dela
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = funcao()
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._chamadas[chave]
+            chamada.evento.set()
+
+    def em_andamento(self) -> int:
+        return len(self._chamadas)
+
+
+class ChamadaUnicaAsync:
+    """Versão asyncio de ChamadaUnica: os chamadores aguardam a mesma tarefa"""
+
+    def __init__(self):
+        self._tarefas: Dict[Hashable, asyncio.Future] = {}
+        self.execucoes = 0
+        self.compartilhadas = 0
+
+    async def executar(self, chave: Hashable, funcao: Callable[[], Awaitable[Any]]) -> Any:
+        tarefa = self._tarefas.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(funcao())
+            self._tarefas[chave] = tarefa
+            self.execucoes += 1
+
+            def remover(_tarefa, chave=chave):
+                if self._tarefas.get(chave) is _tarefa:
+                    del self._tarefas[chave]
+
+            tarefa.add_done_callback(remover)
+        else:
+            self.compartilhadas += 1
+
+        # shield: o cancelamento de um chamador não cancela a busca dos outros
+        return await asyncio.shield(tarefa)
+
+    def em_andamento(self) -> int:
+        return len(self._tarefas)
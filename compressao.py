@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from metricas import duracao_etapa, medir, registro
+
+try:
+    import msgpack
+except ImportError:  # formato binário opcional: pip install msgpack
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # compressão zstd opcional: pip install zstandard
+    zstandard = None
+
+# Negociação do formato das respostas de /tools/* (Accept e Accept-Encoding)
+COMPRESSAO = os.getenv("MCP_COMPRESSAO", "1") == "1"
+LIMIAR = int(os.getenv("MCP_COMPRESSAO_LIMIAR", "1024"))
+NIVEL_GZIP = int(os.getenv("MCP_COMPRESSAO_NIVEL_GZIP", "6"))
+NIVEL_ZSTD = int(os.getenv("MCP_COMPRESSAO_NIVEL_ZSTD", "3"))
+
+# Do lado do cliente: o que o ClienteMCP pede ao servidor
+CLIENTE_COMPRESSAO = os.getenv("MCP_CLIENTE_COMPRESSAO", "1") == "1"
+CLIENTE_MSGPACK = os.getenv("MCP_CLIENTE_MSGPACK", "1") == "1"
+
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_MSGPACK = "application/msgpack"
+_TIPOS_MSGPACK = (CONTENT_TYPE_MSGPACK, "application/x-msgpack")
+
+# Em ordem de preferência do servidor, quando o cliente aceita as duas igualmente
+CODIFICACOES = tuple(c for c, disponivel in (("zstd", zstandard is not None), ("gzip", True)) if disponivel)
+
+bytes_respostas = registro.contador(
+    "mcp_resposta_bytes_total", "Bytes das respostas de /tools/* antes (original) e depois (enviado) da compressão"
+)
+
+_local = threading.local()
+
+
+def _compressor_zstd():
+    # Os contextos do zstandard não podem ser usados por duas threads ao mesmo tempo
+    compressor = getattr(_local, "zstd", None)
+    if compressor is None:
+        compressor = _local.zstd = zstandard.ZstdCompressor(level=NIVEL_ZSTD)
+    return compressor
+
+
+def serializar(objeto: Any, content_type: str = CONTENT_TYPE_JSON) -> bytes:
+    if content_type in _TIPOS_MSGPACK:
+        return msgpack.packb(objeto, use_bin_type=True)
+    return json.dumps(objeto, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def desserializar(corpo: bytes, content_type: str = CONTENT_TYPE_JSON) -> Any:
+    if content_type in _TIPOS_MSGPACK:
+        if msgpack is None:
+            raise ValueError("resposta em MessagePack, mas o pacote msgpack não está instalado")
+        return msgpack.unpackb(corpo, raw=False)
+    return json.loads(corpo)
+
+
+def comprimir(dados: bytes, codificacao: str) -> bytes:
+    if codificacao == "zstd":
+        return _compressor_zstd().compress(dados)
+    if codificacao == "gzip":
+        return gzip.compress(dados, compresslevel=NIVEL_GZIP)
+    raise ValueError(f"codificação não suportada: {codificacao}")
+
+
+def descomprimir(dados: bytes, codificacao: Optional[str]) -> bytes:
+    if not codificacao or codificacao == "identity":
+        return dados
+    if codificacao == "gzip":
+        return gzip.decompress(dados)
+    if codificacao == "zstd" and zstandard is not None:
+        # decompressobj aceita quadros sem o tamanho original no cabeçalho
+        return zstandard.ZstdDecompressor().decompressobj().decompress(dados)
+    raise ValueError(f"codificação não suportada: {codificacao}")
+
+
+def decodificar(corpo: bytes, content_type: str, content_encoding: Optional[str] = None) -> Any:
+    """Corpo de uma resposta de /tools/* como objeto Python, qualquer que seja o formato negociado"""
+    return desserializar(descomprimir(corpo, content_encoding), content_type)
+
+
+def codificar_resposta(objeto: Any, aceitos, codificacoes_aceitas) -> Tuple[bytes, str, Dict[str, str]]:
+    """Serializa e comprime uma resposta conforme os cabeçalhos da requisição.
+
+    `aceitos` e `codificacoes_aceitas` são o request.accept_mimetypes e o
+    request.accept_encodings do Flask/Quart. JSON continua sendo o padrão: o
+    MessagePack só é usado se o cliente o preferir. Retorna o corpo, o Content-Type e
+    os demais cabeçalhos.
+    """
+    content_type = CONTENT_TYPE_JSON
+    if msgpack is not None:
+        content_type = aceitos.best_match([CONTENT_TYPE_JSON, *_TIPOS_MSGPACK], default=CONTENT_TYPE_JSON)
+    with medir(duracao_etapa, etapa="serializacao"):
+        corpo = serializar(objeto, content_type)
+
+    formato = "msgpack" if content_type in _TIPOS_MSGPACK else "json"
+    cabecalhos = {"Vary": "Accept, Accept-Encoding"}
+    codificacao = codificacoes_aceitas.best_match(CODIFICACOES) if COMPRESSAO and len(corpo) >= LIMIAR else None
+    bytes_respostas.incrementar(len(corpo), formato=formato, codificacao=codificacao or "identity", medida="original")
+    if codificacao:
+        with medir(duracao_etapa, etapa="compressao"):
+            corpo = comprimir(corpo, codificacao)
+        cabecalhos["Content-Encoding"] = codificacao
+    bytes_respostas.incrementar(len(corpo), formato=formato, codificacao=codificacao or "identity", medida="enviado")
+    return corpo, content_type, cabecalhos
+
+
+def cabecalhos_cliente(compressao: bool = CLIENTE_COMPRESSAO, usar_msgpack: bool = CLIENTE_MSGPACK) -> Dict[str, str]:
+    """Accept e Accept-Encoding que o ClienteMCP envia, limitados ao que ele sabe decodificar"""
+    cabecalhos = {"Accept-Encoding": ", ".join(CODIFICACOES) if compressao else "identity"}
+    if usar_msgpack and msgpack is not None:
+        cabecalhos["Accept"] = f"{CONTENT_TYPE_MSGPACK}, {CONTENT_TYPE_JSON};q=0.9"
+    else:
+        cabecalhos["Accept"] = CONTENT_TYPE_JSON
+    return cabecalhos
@@ -0,0 +1,82 @@
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+from functools import lru_cache
+from typing import Optional
+
+# Adia as importações pesadas (openai, aiohttp) até o primeiro uso. Com 0 elas voltam a
+# acontecer na importação, como convém a um gunicorn com preload_app (MCP_PRELOAD=1)
+IMPORTACAO_PREGUICOSA = os.getenv("MCP_IMPORTACAO_PREGUICOSA", "1") == "1"
+
+# Caminhos procurados, em ordem, pelo arquivo .env
+ARQUIVOS_ENV = tuple(filter(None, (
+    os.getenv("MCP_ENV_ARQUIVO"),
+    ".env",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"),
+)))
+
+
+class _ModuloAdiado:
+    """Representa o módulo `nome` até o primeiro acesso a um atributo, que o importa.
+
+    No lugar do importlib.util.LazyLoader, que até o Python 3.12.3 não é seguro entre
+    threads: dois primeiros acessos simultâneos podiam ver o módulo pela metade.
+    """
+
+    def __init__(self, nome: str):
+        self._nome = nome
+        self._modulo = None
+        self._lock = threading.Lock()
+
+    def _carregar(self):
+        with self._lock:
+            if self._modulo is None:
+                self._modulo = importlib.import_module(self._nome)
+        return self._modulo
+
+    def __getattr__(self, atributo: str):
+        return getattr(self._modulo or self._carregar(), atributo)
+
+    def __repr__(self) -> str:
+        estado = "carregado" if self._modulo is not None else "adiado"
+        return f"<módulo {self._nome!r} ({estado})>"
+
+
+def importar_sob_demanda(nome: str):
+    """Retorna o módulo `nome`, que só é executado no primeiro acesso a um atributo.
+
+    Já importado (ou com MCP_IMPORTACAO_PREGUICOSA=0), é só um import_module comum.
+    """
+    if nome in sys.modules or not IMPORTACAO_PREGUICOSA:
+        return importlib.import_module(nome)
+    if importlib.util.find_spec(nome) is None:
+        raise ModuleNotFoundError(f"No module named {nome!r}", name=nome)
+    return _ModuloAdiado(nome)
+
+
+@lru_cache(maxsize=None)
+def carregar_env() -> Optional[str]:
+    """Carrega o primeiro .env encontrado, uma vez por processo, e retorna o caminho.
+
+    O python-dotenv só é importado se houver um .env; variáveis já definidas no
+    ambiente têm precedência sobre as do arquivo.
+    """
+    for caminho in ARQUIVOS_ENV:
+        if os.path.isfile(caminho):
+            from dotenv import load_dotenv
+            load_dotenv(caminho)
+            return caminho
+    return None
+
+
+def chave_openai() -> Optional[str]:
+    carregar_env()
+    return os.getenv("OPENAI_API_KEY")
+
+
+def url_openai() -> Optional[str]:
+    """OPENAI_BASE_URL permite apontar para um servidor local compatível"""
+    carregar_env()
+    return os.getenv("OPENAI_BASE_URL") or None
@@ -0,0 +1 @@
+# Deixa os módulos da raiz do projeto importáveis pelos testes em tests/
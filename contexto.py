@@ -0,0 +1,119 @@
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from indice_local import dividir_sentencas
+
+# Orçamento de tokens do texto da Wikipedia enviado ao modelo
+ORCAMENTO_TOKENS = int(os.getenv("MCP_CONTEXTO_TOKENS", "1500"))
+PALAVRAS_POR_PASSAGEM = int(os.getenv("MCP_CONTEXTO_PALAVRAS_PASSAGEM", "120"))
+
+# Parâmetros usuais do BM25
+K1 = 1.5
+B = 0.75
+
+_PADRAO_CABECALHO = re.compile(r"=+\s*(.*?)\s*=+")
+_PADRAO_PALAVRA = re.compile(r"\w+")
+
+# (seção, texto) de cada passagem, na ordem do artigo
+Passagem = Tuple[str, str]
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa barata do número de tokens (~4 caracteres por token)"""
+    return (len(texto) + 3) // 4
+
+
+def tokenizar(texto: str) -> List[str]:
+    return _PADRAO_PALAVRA.findall(texto.casefold())
+
+
+def dividir_passagens(texto: str, max_palavras: int = PALAVRAS_POR_PASSAGEM) -> List[Passagem]:
+    """Divide o artigo (texto puro do extracts) em passagens de até max_palavras, sem cortar sentenças"""
+    passagens: List[Passagem] = []
+    secao = ""
+    for paragrafo in texto.split("\n"):
+        paragrafo = paragrafo.strip()
+        if not paragrafo:
+            continue
+        cabecalho = _PADRAO_CABECALHO.fullmatch(paragrafo)
+        if cabecalho:
+            secao = cabecalho.group(1)
+            continue
+        atual: List[str] = []
+        palavras = 0
+        for sentenca in dividir_sentencas(paragrafo):
+            n = len(sentenca.split())
+            if atual and palavras + n > max_palavras:
+                passagens.append((secao, " ".join(atual)))
+                atual, palavras = [], 0
+            atual.append(sentenca)
+            palavras += n
+        if atual:
+            passagens.append((secao, " ".join(atual)))
+    return passagens
+
+
+def pontuar_bm25(passagens: Sequence[Passagem], consulta: str, k1: float = K1, b: float = B) -> np.ndarray:
+    """Pontuação BM25 de cada passagem (título da seção incluído) em relação à consulta"""
+    termos = np.array(sorted(set(tokenizar(consulta))))
+    if not passagens or not termos.size:
+        return np.zeros(len(passagens))
+
+    documentos = [tokenizar(f"{secao} {texto}") for secao, texto in passagens]
+    comprimentos = np.array([len(tokens) for tokens in documentos], dtype=np.float64)
+    tokens = np.array([token for tokens in documentos for token in tokens])
+    if not tokens.size:
+        return np.zeros(len(passagens))
+    documento_do_token = np.repeat(np.arange(len(documentos)), comprimentos.astype(np.int64))
+
+    # Frequência dos termos da consulta em cada passagem (matriz passagens × termos)
+    colunas = np.searchsorted(termos, tokens).clip(max=termos.size - 1)
+    eh_termo = termos[colunas] == tokens
+    frequencias = np.zeros((len(documentos), termos.size))
+    np.add.at(frequencias, (documento_do_token[eh_termo], colunas[eh_termo]), 1)
+
+    n = len(documentos)
+    presentes = (frequencias > 0).sum(axis=0)
+    idf = np.log1p((n - presentes + 0.5) / (presentes + 0.5))
+    normalizacao = k1 * (1 - b + b * comprimentos / max(comprimentos.mean(), 1.0))
+    return (idf * frequencias * (k1 + 1) / (frequencias + normalizacao[:, None])).sum(axis=1)
+
+
+def empacotar(
+    passagens: Sequence[Passagem], pontuacoes: np.ndarray, orcamento_tokens: int = ORCAMENTO_TOKENS
+) -> List[Passagem]:
+    """Escolhe as passagens mais bem pontuadas que cabem no orçamento, devolvidas na ordem do artigo"""
+    # Ordenação estável: sem termos em comum com a consulta, prevalece a ordem do artigo
+    ordem = np.argsort(-pontuacoes, kind="stable")
+    escolhidas = []
+    restante = orcamento_tokens
+    for i in ordem:
+        custo = estimar_tokens(passagens[i][1])
+        if custo <= restante:
+            escolhidas.append(i)
+            restante -= custo
+    return [passagens[i] for i in sorted(escolhidas)]
+
+
+def montar_contexto(texto: str, consulta: str, orcamento_tokens: Optional[int] = None) -> str:
+    """Reduz o texto às passagens mais relevantes para a consulta dentro do orçamento de tokens.
+
+    Textos que já cabem no orçamento (como os resumos curtos) voltam sem alteração.
+    """
+    orcamento_tokens = ORCAMENTO_TOKENS if orcamento_tokens is None else orcamento_tokens
+    if estimar_tokens(texto) <= orcamento_tokens:
+        return texto
+
+    passagens = dividir_passagens(texto)
+    escolhidas = empacotar(passagens, pontuar_bm25(passagens, consulta), orcamento_tokens)
+    partes = []
+    secao_anterior = ""
+    for secao, trecho in escolhidas:
+        if secao and secao != secao_anterior:
+            partes.append(f"== {secao} ==")
+        secao_anterior = secao
+        partes.append(trecho)
+    return "\n\n".join(partes)
@@ -0,0 +1,114 @@
+import inspect
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from busca_wikipedia import IDIOMA, IDIOMAS, SENTENCAS, buscar_item_lote, buscar_resumo, validar_idioma, validar_lote
+
+
+class Ferramenta:
+    def __init__(
+        self,
+        nome: str,
+        descricao: str,
+        esquema: Dict[str, Any],
+        funcao: Callable[..., Any],
+        validar: Optional[Callable[..., Dict[str, Any]]] = None,
+    ):
+        self.nome = nome
+        self.descricao = descricao
+        self.esquema = esquema
+        self.funcao = funcao
+        # Recebe os argumentos da chamada e devolve os normalizados, ou levanta ValueError
+        self.validar = validar
+
+    def descrever(self) -> Dict[str, Any]:
+        """Descrição no formato do tools/list do MCP"""
+        return {"name": self.nome, "description": self.descricao, "inputSchema": self.esquema}
+
+
+# Ferramentas expostas pelo servidor, por nome
+REGISTRO: Dict[str, Ferramenta] = {}
+
+def registrar(nome: str, descricao: str, esquema: Dict[str, Any], validar: Optional[Callable[..., Dict[str, Any]]] = None):
+    def decorador(funcao):
+        REGISTRO[nome] = Ferramenta(nome, descricao, esquema, funcao, validar)
+        return funcao
+    return decorador
+
+_ESQUEMA_LANG = {"type": "string", "enum": list(IDIOMAS), "default": IDIOMA}
+
+def _validar_busca(busca: Any, lang: Any = IDIOMA, completo: Any = False) -> Dict[str, Any]:
+    if not isinstance(busca, str) or not busca.strip():
+        raise ValueError('Parâmetro busca é obrigatório')
+    return {"busca": busca, "lang": validar_idioma(lang), "completo": bool(completo)}
+
+def _validar_lote(buscas: Any, paralelismo: Any = None, lang: Any = IDIOMA) -> Dict[str, Any]:
+    data: Dict[str, Any] = {"buscas": buscas, "lang": lang}
+    if paralelismo is not None:
+        data["paralelismo"] = paralelismo
+    buscas, paralelismo, lang = validar_lote(data)
+    return {"buscas": buscas, "paralelismo": paralelismo, "lang": lang}
+
+@registrar(
+    "buscar_wikipedia",
+    "Busca o resumo de um termo na Wikipedia (ou o artigo completo, com completo=true)",
+    {
+        "type": "object",
+        "properties": {
+            "busca": {"type": "string"},
+            "lang": _ESQUEMA_LANG,
+            "completo": {"type": "boolean", "default": False},
+        },
+        "required": ["busca"],
+    },
+    validar=_validar_busca,
+)
+def buscar_wikipedia(busca: str, lang: str = IDIOMA, completo: bool = False) -> str:
+    return buscar_resumo(busca, lang, None if completo else SENTENCAS)
+
+@registrar(
+    "buscar_wikipedia_lote",
+    "Busca os resumos de vários termos em paralelo",
+    {
+        "type": "object",
+        "properties": {
+            "buscas": {"type": "array", "items": {"type": "string"}},
+            "paralelismo": {"type": "integer", "minimum": 1},
+            "lang": _ESQUEMA_LANG,
+        },
+        "required": ["buscas"],
+    },
+    validar=_validar_lote,
+)
+def buscar_wikipedia_lote(buscas: List[str], paralelismo: Optional[int] = None, lang: str = IDIOMA) -> List[Dict[str, Any]]:
+    with ThreadPoolExecutor(max_workers=paralelismo) as executor:
+        return list(executor.map(partial(buscar_item_lote, idioma=lang), buscas))
+
+def listar() -> List[Dict[str, Any]]:
+    return [ferramenta.descrever() for ferramenta in REGISTRO.values()]
+
+def chamar(nome: str, argumentos: Dict[str, Any]) -> Dict[str, Any]:
+    """Executa a ferramenta e monta o resultado no formato do tools/call do MCP.
+
+    Levanta KeyError para ferramenta desconhecida e TypeError/ValueError para
+    argumentos inválidos, verificados antes da chamada; qualquer falha da própria
+    ferramenta (inclusive um ValueError da Wikipedia) vira um resultado com isError.
+    """
+    ferramenta = REGISTRO[nome]
+    inspect.signature(ferramenta.funcao).bind(**argumentos)
+    if ferramenta.validar is not None:
+        argumentos = ferramenta.validar(**argumentos)
+    try:
+        resultado = ferramenta.funcao(**argumentos)
+    except Exception as e:
+        return {"content": [{"type": "text", "text": f"Erro ao buscar: {str(e)}"}], "isError": True}
+
+    if isinstance(resultado, str):
+        return {"content": [{"type": "text", "text": resultado}], "isError": False}
+    return {
+        "content": [{"type": "text", "text": json.dumps(resultado, ensure_ascii=False)}],
+        "structuredContent": {"resultados": resultado},
+        "isError": False,
+    }
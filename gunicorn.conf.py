@@ -0,0 +1,63 @@
+"""Configuração do gunicorn para rodar o servidor com vários workers.
+
+Uso:
+    MCP_CACHE_COMPARTILHADO=/tmp/mcp_cache.sqlite3 gunicorn servidor:app
+    MCP_PRELOAD=1 gunicorn -c gunicorn.conf.py servidor:app   # importa uma vez, antes do fork
+    MCP_SOCKET_UNIX=/tmp/mcp.sock gunicorn -c gunicorn.conf.py servidor:app
+"""
+import multiprocessing
+import os
+import sys
+
+# Endereços separados por vírgula; MCP_SOCKET_UNIX também escuta num socket Unix, para
+# um cliente no mesmo host (ClienteMCP com unix:///caminho/do.sock)
+bind = [endereco for endereco in os.getenv("MCP_BIND", "0.0.0.0:8000").split(",") if endereco]
+if os.getenv("MCP_SOCKET_UNIX"):
+    bind.append(f"unix:{os.getenv('MCP_SOCKET_UNIX')}")
+
+# Um processo por núcleo; as threads de cada worker cobrem a espera pela Wikipedia
+workers = int(os.getenv("MCP_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.getenv("MCP_THREADS_POR_WORKER", "16"))
+keepalive = 30
+timeout = 60
+
+# Com preload, o master importa a aplicação uma vez e os workers nascem por fork já com
+# tudo carregado: nada de importações adiadas, que seriam refeitas em cada worker
+preload_app = os.getenv("MCP_PRELOAD", "0") == "1"
+if preload_app:
+    os.environ.setdefault("MCP_IMPORTACAO_PREGUICOSA", "0")
+
+# Sem cache compartilhado, cada worker começaria com o próprio cache frio
+if workers > 1 and not os.getenv("MCP_CACHE_COMPARTILHADO"):
+    print("⚠️ MCP_CACHE_COMPARTILHADO não definido: cada worker terá um cache próprio")
+
+
+def limites_admissao(threads, limite=None, fila=None):
+    """Vagas e fila da admissão (admissao.py, por worker) que cabem nas threads.
+
+    Cada requisição admitida ou na fila ocupa uma thread do gthread; o que passa disso
+    espera na fila interna do gunicorn, antes da admissão, e nunca recebe o 429. Por
+    isso sobra pelo menos uma thread para recusar: por padrão 3/4 executam e 1/8 esperam.
+    """
+    limite = threads * 3 // 4 if limite is None else limite
+    fila = threads // 8 if fila is None else fila
+    limite = max(1, min(limite, threads - 1))
+    fila = max(0, min(fila, threads - 1 - limite))
+    return limite, fila
+
+
+# Definidas aqui, antes de qualquer importação da aplicação (inclusive com preload)
+_pedidos = (os.getenv("MCP_ADMISSAO_LIMITE"), os.getenv("MCP_ADMISSAO_FILA"))
+_limite, _fila = limites_admissao(threads, *(int(v) if v else None for v in _pedidos))
+if any(v and int(v) != ajustado for v, ajustado in zip(_pedidos, (_limite, _fila))):
+    print(f"⚠️ admissão ajustada às {threads} threads por worker: limite {_limite}, fila {_fila}")
+os.environ["MCP_ADMISSAO_LIMITE"] = str(_limite)
+os.environ["MCP_ADMISSAO_FILA"] = str(_fila)
+
+
+def post_worker_init(worker):
+    """Inicia o aquecimento do cache em cada worker, depois do fork"""
+    servidor = sys.modules.get("servidor")
+    if servidor is not None:
+        servidor.iniciar_aquecimento()
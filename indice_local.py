@@ -0,0 +1,327 @@
+"""Índice local de artigos da Wikipedia, construído a partir de um dump XML.
+
+Uso:
+    python indice_local.py construir ptwiki-latest-pages-articles.xml.bz2 --idioma pt --banco indice.sqlite3
+"""
+import argparse
+import bz2
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cache import normalizar_termo
+from cache_persistente import ConexoesPorThread
+
+# Predefinições que marcam páginas de desambiguação em pt/en/es
+_PADRAO_DESAMBIGUACAO = re.compile(
+    r"\{\{\s*(desambigua|disambig|dab\b|desambiguación|hndis|geodis)",
+    re.IGNORECASE,
+)
+_PADRAO_SENTENCA = re.compile(r"(?<=[.!?])\s+(?=[\"'(«A-ZÀ-Ý0-9])")
+_PADRAO_LINK = re.compile(r"\[\[([^\[\]|]+)(?:\|([^\[\]]*))?\]\]")
+
+
+def dividir_sentencas(texto: str) -> List[str]:
+    return [s for s in _PADRAO_SENTENCA.split(texto.strip()) if s]
+
+
+def _remover_aninhados(texto: str, abre: str, fecha: str) -> str:
+    """Remove blocos aninhados como {{...}} e {|...|}"""
+    resultado = []
+    nivel = 0
+    i = 0
+    while i < len(texto):
+        if texto.startswith(abre, i):
+            nivel += 1
+            i += len(abre)
+        elif nivel and texto.startswith(fecha, i):
+            nivel -= 1
+            i += len(fecha)
+        else:
+            if not nivel:
+                resultado.append(texto[i])
+            i += 1
+    return "".join(resultado)
+
+
+def limpar_wikitexto(texto: str) -> str:
+    """Converte o wikitexto da introdução em texto simples (aproximado)"""
+    texto = re.sub(r"<!--.*?-->", "", texto, flags=re.DOTALL)
+    texto = re.sub(r"<ref[^>/]*/>", "", texto)
+    texto = re.sub(r"<ref[^>]*>.*?</ref>", "", texto, flags=re.DOTALL)
+    texto = _remover_aninhados(texto, "{{", "}}")
+    texto = _remover_aninhados(texto, "{|", "|}")
+    # Imagens e categorias: [[Ficheiro:...]], [[File:...]], [[Categoria:...]]
+    texto = re.sub(r"\[\[(?:[^\[\]]|\[\[[^\]]*\]\])*?\]\]", _substituir_link, texto)
+    texto = re.sub(r"\[https?://[^\s\]]+\s*([^\]]*)\]", r"\1", texto)
+    texto = re.sub(r"<[^>]+>", "", texto)
+    texto = re.sub(r"'{2,}", "", texto)
+    texto = re.sub(r"[ \t]+", " ", texto)
+    return "\n".join(linha.strip() for linha in texto.splitlines() if linha.strip())
+
+
+def _substituir_link(match: "re.Match") -> str:
+    conteudo = match.group(0)[2:-2]
+    alvo, _, rotulo = conteudo.partition("|")
+    if ":" in alvo and not alvo.startswith(":"):
+        return ""
+    return rotulo or alvo
+
+
+def extrair_introducao(wikitexto: str) -> str:
+    """Retorna o texto da introdução, antes da primeira seção"""
+    introducao = re.split(r"^==", wikitexto, maxsplit=1, flags=re.MULTILINE)[0]
+    return limpar_wikitexto(introducao)
+
+
+def extrair_opcoes_desambiguacao(wikitexto: str) -> List[str]:
+    opcoes = []
+    for linha in wikitexto.splitlines():
+        if linha.lstrip().startswith("*"):
+            link = _PADRAO_LINK.search(linha)
+            if link and ":" not in link.group(1):
+                opcoes.append(link.group(1).strip())
+    return opcoes
+
+
+class IndiceLocal:
+    """Consulta de resumos em um banco SQLite local (título → introdução)"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        # mmap deixa as páginas mais acessadas do banco no cache do sistema operacional
+        self._conexoes = ConexoesPorThread(caminho, ("journal_mode=WAL", "mmap_size=268435456"))
+        self._criar_tabelas()
+
+    def _conexao(self) -> sqlite3.Connection:
+        return self._conexoes.obter()
+
+    def _criar_tabelas(self):
+        self._conexao().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS artigos (
+                id INTEGER PRIMARY KEY,
+                idioma TEXT NOT NULL,
+                titulo TEXT NOT NULL,
+                titulo_norm TEXT NOT NULL,
+                texto TEXT NOT NULL,
+                UNIQUE (idioma, titulo_norm)
+            );
+            CREATE TABLE IF NOT EXISTS redirecionamentos (
+                idioma TEXT NOT NULL,
+                origem_norm TEXT NOT NULL,
+                destino TEXT NOT NULL,
+                PRIMARY KEY (idioma, origem_norm)
+            );
+            CREATE TABLE IF NOT EXISTS desambiguacoes (
+                idioma TEXT NOT NULL,
+                titulo_norm TEXT NOT NULL,
+                opcoes TEXT NOT NULL,
+                PRIMARY KEY (idioma, titulo_norm)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                chave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS artigos_fts USING fts5(titulo, texto);
+            """
+        )
+
+    # Consulta
+
+    def _artigo(self, idioma: str, titulo: str) -> Optional[Tuple[str, str]]:
+        conexao = self._conexao()
+        titulo_norm = normalizar_termo(titulo)
+        destino = conexao.execute(
+            "SELECT destino FROM redirecionamentos WHERE idioma = ? AND origem_norm = ?",
+            (idioma, titulo_norm),
+        ).fetchone()
+        if destino is not None:
+            titulo_norm = normalizar_termo(destino[0])
+        return conexao.execute(
+            "SELECT titulo, texto FROM artigos WHERE idioma = ? AND titulo_norm = ?",
+            (idioma, titulo_norm),
+        ).fetchone()
+
+    def _opcoes_desambiguacao(self, idioma: str, titulo: str) -> List[str]:
+        linha = self._conexao().execute(
+            "SELECT opcoes FROM desambiguacoes WHERE idioma = ? AND titulo_norm = ?",
+            (idioma, normalizar_termo(titulo)),
+        ).fetchone()
+        return json.loads(linha[0]) if linha else []
+
+    def resumo(
+        self, termo: str, idioma: str = "pt", sentencas: Optional[int] = 3
+    ) -> Optional[Tuple[str, str, bool]]:
+        """Retorna (título, resumo, veio_de_desambiguacao) ou None se o termo não está no índice.
+
+        O índice guarda só a introdução: com sentencas=None ela vem inteira.
+        """
+        artigo = self._artigo(idioma, termo)
+        desambiguacao = False
+        if artigo is None:
+            # Como a API, usa a primeira opção da desambiguação que existir no índice
+            for opcao in self._opcoes_desambiguacao(idioma, termo):
+                artigo = self._artigo(idioma, opcao)
+                if artigo is not None:
+                    desambiguacao = True
+                    break
+        if artigo is None:
+            return None
+        titulo, texto = artigo
+        return titulo, " ".join(dividir_sentencas(texto)[:sentencas]), desambiguacao
+
+    def buscar_titulos(self, termo: str, idioma: str = "pt", limite: int = 3) -> List[str]:
+        """Busca textual (FTS5) pelos títulos mais relevantes"""
+        palavras = re.findall(r"\w+", termo)
+        if not palavras:
+            return []
+        consulta = " ".join(f'"{p}"' for p in palavras)
+        linhas = self._conexao().execute(
+            "SELECT a.titulo FROM artigos_fts f JOIN artigos a ON a.id = f.rowid"
+            " WHERE artigos_fts MATCH ? AND a.idioma = ? ORDER BY bm25(artigos_fts, 10.0, 1.0) LIMIT ?",
+            (consulta, idioma, limite),
+        ).fetchall()
+        return [linha[0] for linha in linhas]
+
+    def titulos(self, idioma: str = "pt") -> Iterator[str]:
+        """Todos os títulos de artigos do idioma (para o índice de sugestões)"""
+        for linha in self._conexao().execute("SELECT titulo FROM artigos WHERE idioma = ?", (idioma,)):
+            yield linha[0]
+
+    # Construção
+
+    def obter_meta(self, chave: str) -> Optional[str]:
+        linha = self._conexao().execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def _guardar_pagina(self, conexao: sqlite3.Connection, idioma: str, pagina: Dict[str, str]):
+        titulo = pagina["titulo"]
+        titulo_norm = normalizar_termo(titulo)
+        if pagina.get("redirecionamento"):
+            conexao.execute(
+                "INSERT OR REPLACE INTO redirecionamentos (idioma, origem_norm, destino) VALUES (?, ?, ?)",
+                (idioma, titulo_norm, pagina["redirecionamento"]),
+            )
+            return
+
+        wikitexto = pagina.get("texto", "")
+        if _PADRAO_DESAMBIGUACAO.search(wikitexto):
+            opcoes = extrair_opcoes_desambiguacao(wikitexto)
+            conexao.execute(
+                "INSERT OR REPLACE INTO desambiguacoes (idioma, titulo_norm, opcoes) VALUES (?, ?, ?)",
+                (idioma, titulo_norm, json.dumps(opcoes, ensure_ascii=False)),
+            )
+            return
+
+        texto = extrair_introducao(wikitexto)
+        if not texto:
+            return
+        existente = conexao.execute(
+            "SELECT id FROM artigos WHERE idioma = ? AND titulo_norm = ?", (idioma, titulo_norm)
+        ).fetchone()
+        if existente:
+            conexao.execute("UPDATE artigos SET titulo = ?, texto = ? WHERE id = ?", (titulo, texto, existente[0]))
+            conexao.execute("DELETE FROM artigos_fts WHERE rowid = ?", (existente[0],))
+            id_artigo = existente[0]
+        else:
+            id_artigo = conexao.execute(
+                "INSERT INTO artigos (idioma, titulo, titulo_norm, texto) VALUES (?, ?, ?, ?)",
+                (idioma, titulo, titulo_norm, texto),
+            ).lastrowid
+        conexao.execute("INSERT INTO artigos_fts (rowid, titulo, texto) VALUES (?, ?, ?)", (id_artigo, titulo, texto))
+
+    def ingerir(self, paginas: Iterator[Dict[str, str]], idioma: str, origem: str, lote: int = 1000) -> int:
+        """Ingere páginas em lotes, retomando a partir do último id já processado de `origem`"""
+        conexao = self._conexao()
+        chave_progresso = f"progresso:{idioma}:{origem}"
+        ultimo_id = int(self.obter_meta(chave_progresso) or 0)
+        processadas = 0
+
+        conexao.execute("BEGIN")
+        for pagina in paginas:
+            id_pagina = int(pagina["id"])
+            if id_pagina <= ultimo_id:
+                continue
+            self._guardar_pagina(conexao, idioma, pagina)
+            processadas += 1
+            if processadas % lote == 0:
+                conexao.execute(
+                    "INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave_progresso, str(id_pagina))
+                )
+                conexao.execute("COMMIT")
+                conexao.execute("BEGIN")
+            ultimo_processado = id_pagina
+        if processadas:
+            conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave_progresso, str(ultimo_processado))
+            )
+        conexao.execute("COMMIT")
+        return processadas
+
+
+def _nome_local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def ler_paginas_dump(caminho: str) -> Iterator[Dict[str, str]]:
+    """Lê as páginas do domínio principal (ns 0) de um dump XML, em streaming"""
+    if caminho.endswith(".bz2"):
+        arquivo = bz2.open(caminho, "rb")
+    elif caminho.endswith(".gz"):
+        arquivo = gzip.open(caminho, "rb")
+    else:
+        arquivo = open(caminho, "rb")
+
+    with arquivo:
+        contexto = ET.iterparse(arquivo, events=("start", "end"))
+        _, raiz = next(contexto)
+        for evento, elemento in contexto:
+            if evento != "end" or _nome_local(elemento.tag) != "page":
+                continue
+            pagina = {}
+            for filho in elemento.iter():
+                nome = _nome_local(filho.tag)
+                if nome == "title":
+                    pagina["titulo"] = filho.text or ""
+                elif nome == "ns":
+                    pagina["ns"] = filho.text or ""
+                elif nome == "id" and "id" not in pagina:
+                    pagina["id"] = filho.text or "0"
+                elif nome == "redirect":
+                    pagina["redirecionamento"] = filho.get("title", "")
+                elif nome == "text":
+                    pagina["texto"] = filho.text or ""
+            # Libera a memória das páginas já lidas
+            raiz.clear()
+            if pagina.get("ns") == "0":
+                yield pagina
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice local da Wikipedia")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    construir = subparsers.add_parser("construir", help="ingere um dump XML (pode ser retomado)")
+    construir.add_argument("dump", help="arquivo pages-articles .xml, .xml.bz2 ou .xml.gz")
+    construir.add_argument("--idioma", default="pt")
+    construir.add_argument("--banco", default=os.getenv("MCP_INDICE_LOCAL", "indice_wikipedia.sqlite3"))
+    construir.add_argument("--lote", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    indice = IndiceLocal(args.banco)
+    inicio = time.time()
+    processadas = indice.ingerir(
+        ler_paginas_dump(args.dump), args.idioma, os.path.basename(args.dump), lote=args.lote
+    )
+    print(f"✅ {processadas} páginas ingeridas em {time.time() - inicio:.1f}s → {args.banco}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
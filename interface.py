@@ -1,8 +1,23 @@
 import streamlit as st
-import asyncio
-from cliente import testar_servidor, cliente_mcp
+from aquecimento import AQUECIMENTO_LLM, Aquecedor, termos_configurados
+from cliente import testar_servidor, testar_servidor_stream, cliente_mcp
+from loop_compartilhado import LoopCompartilhado
 
+# Tem de ser o primeiro comando do Streamlit, antes de obter_loop()
 st.set_page_config(page_title="Busca MCP", layout="centered")
+
+@st.cache_resource
+def obter_loop():
+    """Cria, uma vez por processo, o loop de fundo e o pool de conexões do cliente"""
+    loop = LoopCompartilhado()
+    loop.executar(cliente_mcp.abrir())
+    if AQUECIMENTO_LLM:
+        # Gera de antemão os resumos da IA dos termos configurados (MCP_AQUECIMENTO_TERMOS)
+        Aquecedor(lambda termo: loop.executar(testar_servidor(cliente_mcp, termo)), termos_configurados).iniciar()
+    return loop
+
+obter_loop()
+
 st.title("🔍 Busca na Wikipédia com IA via MCP")
 
 busca = st.text_input("Digite o termo a ser buscado:")
@@ -10,8 +25,15 @@ busca = st.text_input("Digite o termo a ser buscado:")
 if st.button("Buscar"):
     if busca:
         with st.spinner("Buscando e gerando resposta..."):
-            resposta = asyncio.run(testar_servidor(cliente=cliente_mcp, busca=busca))
+            partes = obter_loop().iterar(testar_servidor_stream(cliente=cliente_mcp, busca=busca))
+            resposta = next(partes, "")
             st.success("Resultado:")
-            st.markdown(resposta)
+            # Mostra os tokens conforme chegam
+            area_resposta = st.empty()
+            area_resposta.markdown(resposta + "▌")
+            for parte in partes:
+                resposta += parte
+                area_resposta.markdown(resposta + "▌")
+            area_resposta.markdown(resposta)
     else:
         st.warning("Por favor, digite um termo.")
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import ferramentas
+
+VERSAO_PROTOCOLO_MCP = "2025-06-18"
+
+# Códigos de erro do JSON-RPC 2.0
+ERRO_PARSE = -32700
+REQUISICAO_INVALIDA = -32600
+METODO_NAO_ENCONTRADO = -32601
+PARAMETROS_INVALIDOS = -32602
+ERRO_INTERNO = -32603
+
+def _erro(id_mensagem, codigo: int, mensagem: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": id_mensagem, "error": {"code": codigo, "message": mensagem}}
+
+def erro_parse() -> Dict[str, Any]:
+    return _erro(None, ERRO_PARSE, "JSON inválido")
+
+def _initialize(params):
+    return {
+        "protocolVersion": VERSAO_PROTOCOLO_MCP,
+        "capabilities": {"tools": {}},
+        "serverInfo": {"name": "mcp_app", "version": "1.0"},
+    }
+
+def _tools_list(params):
+    return {"tools": ferramentas.listar()}
+
+def _tools_call(params):
+    nome = params.get("name")
+    argumentos = params.get("arguments") or {}
+    if not isinstance(nome, str) or not isinstance(argumentos, dict):
+        raise ValueError("tools/call exige name (string) e arguments (objeto)")
+    if nome not in ferramentas.REGISTRO:
+        raise ValueError(f"Ferramenta desconhecida: {nome}")
+    return ferramentas.chamar(nome, argumentos)
+
+METODOS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "initialize": _initialize,
+    "ping": lambda params: {},
+    "tools/list": _tools_list,
+    "tools/call": _tools_call,
+}
+
+def despachar(mensagem: Any) -> Optional[Dict[str, Any]]:
+    """Processa uma mensagem; retorna a resposta ou None para notificações"""
+    if not isinstance(mensagem, dict) or mensagem.get("jsonrpc") != "2.0" or not isinstance(mensagem.get("method"), str):
+        return _erro(mensagem.get("id") if isinstance(mensagem, dict) else None, REQUISICAO_INVALIDA, "Requisição inválida")
+
+    notificacao = "id" not in mensagem
+    id_mensagem = mensagem.get("id")
+    metodo = METODOS.get(mensagem["method"])
+    if metodo is None:
+        return None if notificacao else _erro(id_mensagem, METODO_NAO_ENCONTRADO, f"Método não encontrado: {mensagem['method']}")
+
+    params = mensagem.get("params") or {}
+    try:
+        if not isinstance(params, dict):
+            raise ValueError("params deve ser um objeto")
+        resultado = metodo(params)
+    except (TypeError, ValueError) as e:
+        return None if notificacao else _erro(id_mensagem, PARAMETROS_INVALIDOS, str(e))
+    except Exception as e:
+        return None if notificacao else _erro(id_mensagem, ERRO_INTERNO, str(e))
+
+    return None if notificacao else {"jsonrpc": "2.0", "id": id_mensagem, "result": resultado}
+
+def _juntar(respostas: Iterable[Optional[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    # Um lote só de notificações não tem resposta
+    respostas = [r for r in respostas if r is not None]
+    return respostas or None
+
+def processar(payload: Any, mapear: Callable = map) -> Any:
+    """Processa uma mensagem ou um lote; `mapear` decide como o lote é executado (ex.: executor.map)"""
+    if isinstance(payload, list):
+        if not payload:
+            return _erro(None, REQUISICAO_INVALIDA, "Lote vazio")
+        return _juntar(mapear(despachar, payload))
+    return despachar(payload)
+
+async def processar_async(payload: Any, executar: Callable[[Any], Awaitable[Optional[Dict[str, Any]]]]) -> Any:
+    """Versão asyncio: as mensagens de um lote são executadas concorrentemente via `executar`"""
+    if isinstance(payload, list):
+        if not payload:
+            return _erro(None, REQUISICAO_INVALIDA, "Lote vazio")
+        return _juntar(await asyncio.gather(*(executar(mensagem) for mensagem in payload)))
+    return await executar(payload)
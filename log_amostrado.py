@@ -0,0 +1,98 @@
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO
+
+
+class EscritorAssincrono:
+    """Grava registros como JSON em linhas a partir de uma fila limitada, numa thread de fundo.
+
+    Quem registra nunca espera pelo disco: com a fila cheia o registro é descartado
+    e contado em `descartados`. Criado antes de um fork (gunicorn com preload_app),
+    recria a fila e a thread no processo filho na primeira escrita.
+    """
+
+    def __init__(self, destino: Optional[TextIO] = None, capacidade: int = 10000):
+        self.destino = destino or sys.stdout
+        self.capacidade = capacidade
+        self.escritos = 0
+        self.descartados = 0
+        self._trava = threading.Lock()
+        self._iniciar_thread()
+
+    def _iniciar_thread(self) -> None:
+        self._fila: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=self.capacidade)
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._drenar, name="log-escritor", daemon=True)
+        self._thread.start()
+
+    def escrever(self, registro: Dict[str, Any]) -> bool:
+        if self._pid != os.getpid():
+            # Threads não sobrevivem a um fork
+            with self._trava:
+                if self._pid != os.getpid():
+                    self._iniciar_thread()
+        try:
+            self._fila.put_nowait(registro)
+            return True
+        except queue.Full:
+            self.descartados += 1
+            return False
+
+    def _gravar(self, linha: str) -> None:
+        self.destino.write(linha)
+
+    def _descarregar(self) -> None:
+        self.destino.flush()
+
+    def _drenar(self):
+        while True:
+            registro = self._fila.get()
+            if registro is None:
+                self._descarregar()
+                return
+            self._gravar(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            self.escritos += 1
+            # Só força a escrita quando não há mais nada na fila
+            if self._fila.empty():
+                self._descarregar()
+
+    def fechar(self, timeout: float = 5.0) -> None:
+        self._fila.put(None)
+        self._thread.join(timeout)
+
+
+class LogAmostrado:
+    """Decide quais requisições registrar: uma amostra aleatória e todas as lentas"""
+
+    def __init__(self, escritor: EscritorAssincrono, taxa_amostragem: float = 0.01, limiar_lento_ms: float = 500.0):
+        self.escritor = escritor
+        self.taxa_amostragem = taxa_amostragem
+        self.limiar_lento_ms = limiar_lento_ms
+
+    def amostrar(self) -> bool:
+        """Sorteio feito no início da requisição; só as amostradas têm o corpo lido"""
+        return self.taxa_amostragem > 0 and random.random() < self.taxa_amostragem
+
+    def deve_registrar(self, amostrado: bool, duracao_ms: float) -> bool:
+        return amostrado or (self.limiar_lento_ms > 0 and duracao_ms >= self.limiar_lento_ms)
+
+    def registrar(self, registro: Dict[str, Any]) -> None:
+        registro.setdefault("ts", time.time())
+        self.escritor.escrever(registro)
+
+
+def criar_log_do_ambiente() -> LogAmostrado:
+    """Cria o log a partir das variáveis MCP_LOG_*"""
+    arquivo = os.getenv("MCP_LOG_ARQUIVO")
+    destino = open(arquivo, "a", encoding="utf-8") if arquivo else None
+    escritor = EscritorAssincrono(destino, capacidade=int(os.getenv("MCP_LOG_CAPACIDADE", "10000")))
+    return LogAmostrado(
+        escritor,
+        taxa_amostragem=float(os.getenv("MCP_LOG_AMOSTRAGEM", "0.01")),
+        limiar_lento_ms=float(os.getenv("MCP_LOG_LENTO_MS", "500")),
+    )
@@ -0,0 +1,36 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional
+
+
+class LoopCompartilhado:
+    """Event loop de longa duração rodando em uma thread de fundo"""
+
+    def __init__(self, nome: str = "mcp-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._rodar, name=nome, daemon=True)
+        self._thread.start()
+
+    def _rodar(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def executar(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Executa a corrotina no loop de fundo e aguarda o resultado na thread atual"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def iterar(self, gerador: AsyncIterator[Any], timeout: Optional[float] = None) -> Iterator[Any]:
+        """Consome um gerador assíncrono do loop de fundo como um gerador comum"""
+        try:
+            while True:
+                try:
+                    yield self.executar(gerador.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Se o consumidor parar antes do fim, fecha o gerador no loop de fundo
+            asyncio.run_coroutine_threadsafe(gerador.aclose(), self.loop)
+
+    def parar(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
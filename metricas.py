@@ -0,0 +1,210 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Limites dos buckets em segundos, de 0,5 ms a 10 s
+BUCKETS_PADRAO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escapar(valor: str) -> str:
+    """Valor de rótulo no formato de texto do Prometheus, com barra invertida, aspas e
+    quebra de linha escapadas"""
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_rotulos(rotulos: Tuple[Tuple[str, str], ...]) -> str:
+    if not rotulos:
+        return ""
+    pares = ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos)
+    return "{" + pares + "}"
+
+
+def _formatar_valor(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class Histograma:
+    """Histograma no formato do Prometheus, com séries separadas por rótulos"""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, buckets: Tuple[float, ...] = BUCKETS_PADRAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **rotulos: str) -> None:
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                # Contagem por bucket, seguida de soma e total
+                serie = self._series[chave] = [0.0] * (len(self.buckets) + 2)
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[i] += 1
+                    break
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def linhas(self) -> Iterator[str]:
+        with self._lock:
+            series = {chave: list(serie) for chave, serie in self._series.items()}
+        for chave, serie in sorted(series.items()):
+            acumulado = 0.0
+            for i, limite in enumerate(self.buckets):
+                acumulado += serie[i]
+                rotulos = chave + (("le", _formatar_valor(limite)),)
+                yield f"{self.nome}_bucket{_formatar_rotulos(rotulos)} {_formatar_valor(acumulado)}"
+            yield f"{self.nome}_sum{_formatar_rotulos(chave)} {_formatar_valor(serie[-2])}"
+            yield f"{self.nome}_count{_formatar_rotulos(chave)} {_formatar_valor(serie[-1])}"
+
+
+class Contador:
+    """Counter: total que só cresce, somado à mão ou lido de uma função no momento da coleta"""
+
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, funcao: Optional[Callable[[], float]] = None):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.funcao = funcao
+        self._valores: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valor: float = 1.0, **rotulos: str) -> None:
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def linhas(self) -> Iterator[str]:
+        if self.funcao is not None:
+            yield f"{self.nome} {_formatar_valor(self.funcao())}"
+            return
+        with self._lock:
+            valores = dict(self._valores)
+        for chave, valor in sorted(valores.items()):
+            yield f"{self.nome}{_formatar_rotulos(chave)} {_formatar_valor(valor)}"
+
+
+class Medidor:
+    """Gauge: valor atual, ajustado à mão ou lido de uma função no momento da coleta"""
+
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, funcao: Optional[Callable[[], float]] = None):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.funcao = funcao
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+    def incrementar(self, valor: float = 1.0) -> None:
+        with self._lock:
+            self.valor += valor
+
+    def decrementar(self, valor: float = 1.0) -> None:
+        self.incrementar(-valor)
+
+    def linhas(self) -> Iterator[str]:
+        valor = self.funcao() if self.funcao is not None else self.valor
+        yield f"{self.nome} {_formatar_valor(valor)}"
+
+
+class Registro:
+    def __init__(self):
+        self._metricas: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica):
+        with self._lock:
+            # Reaproveita a métrica se o módulo for importado de novo
+            return self._metricas.setdefault(metrica.nome, metrica)
+
+    def histograma(self, nome: str, ajuda: str, buckets: Tuple[float, ...] = BUCKETS_PADRAO) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, buckets))
+
+    def contador(self, nome: str, ajuda: str, funcao: Optional[Callable[[], float]] = None) -> Contador:
+        contador = self._registrar(Contador(nome, ajuda, funcao))
+        if funcao is not None:
+            contador.funcao = funcao
+        return contador
+
+    def medidor(self, nome: str, ajuda: str, funcao: Optional[Callable[[], float]] = None) -> Medidor:
+        medidor = self._registrar(Medidor(nome, ajuda, funcao))
+        if funcao is not None:
+            medidor.funcao = funcao
+        return medidor
+
+    def renderizar(self) -> str:
+        """Texto no formato de exposição do Prometheus"""
+        linhas = []
+        with self._lock:
+            metricas = list(self._metricas.values())
+        for metrica in metricas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.linhas())
+        return "\n".join(linhas) + "\n"
+
+
+# Registro padrão do processo
+registro = Registro()
+
+# Servidor: duração de cada etapa do atendimento de uma busca
+duracao_etapa = registro.histograma(
+    "mcp_etapa_duracao_segundos",
+    "Duração de cada etapa do servidor (parse, wikipedia, desambiguacao, indice_local, serializacao)",
+)
+
+# Cliente: duração das chamadas ao servidor e das etapas da IA
+duracao_cliente = registro.histograma(
+    "mcp_cliente_duracao_segundos",
+    "Duração das etapas do cliente (ferramenta, llm_primeiro_token, llm_total, llm_cache)",
+)
+
+
+# Tempos por etapa da requisição atual, somados além dos histogramas (usado pela captura)
+_etapas_contexto: ContextVar[Optional[Dict[str, float]]] = ContextVar("etapas", default=None)
+
+
+def coletar_etapas(ativo: bool = True) -> Optional[Dict[str, float]]:
+    """A partir daqui, neste contexto (a requisição atual e o que ela copiar para outras
+    threads), medir() também soma o tempo de cada etapa no dicionário retornado;
+    com ativo=False deixa de somar"""
+    etapas: Optional[Dict[str, float]] = {} if ativo else None
+    _etapas_contexto.set(etapas)
+    return etapas
+
+
+def no_contexto_atual(funcao: Callable) -> Callable:
+    """`funcao` para rodar em outras threads (executor.map, run_in_executor) com o
+    contexto de quem a criou, para que as etapas medidas lá contem para a requisição.
+
+    Cada chamada usa uma cópia própria: um mesmo contexto não pode estar ativo em duas
+    threads ao mesmo tempo.
+    """
+    contexto = copy_context()
+    return lambda *args, **kwargs: contexto.copy().run(funcao, *args, **kwargs)
+
+
+@contextmanager
+def medir(histograma: Histograma, **rotulos: str):
+    """Observa no histograma o tempo gasto dentro do bloco"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        histograma.observar(duracao, **rotulos)
+        etapas = _etapas_contexto.get()
+        if etapas is not None and "etapa" in rotulos:
+            etapas[rotulos["etapa"]] = etapas.get(rotulos["etapa"], 0.0) + duracao
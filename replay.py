@@ -0,0 +1,211 @@
+"""Reproduz contra um servidor o tráfego capturado com MCP_CAPTURA=1, respeitando os
+intervalos entre as requisições (em tempo real ou acelerado).
+
+Uso:
+    python replay.py capturas/ --url http://localhost:8000 --velocidade 1
+    python replay.py capturas/captura-20240101-120000-123-0001.jsonl --velocidade 10 --nome cache-maior
+    python replay.py capturas/ --velocidade 0 --concorrencia 32   # o mais rápido possível
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import aiohttp
+
+from benchmark import (
+    HISTOGRAMA_SERVIDOR,
+    PASTA_RESULTADOS,
+    carregar_resultado,
+    commit_atual,
+    comparar,
+    diferenca_etapas,
+    ler_histograma,
+    ler_metricas_servidor,
+    percentil,
+    resumir_latencias,
+    salvar,
+)
+from captura import PASTA as PASTA_CAPTURAS, PREFIXO_ARQUIVO
+from cliente import criar_conector, separar_url
+
+
+def arquivos_captura(caminhos: List[str]) -> List[str]:
+    """Arquivos .jsonl indicados, expandindo pastas"""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos.extend(glob.glob(os.path.join(caminho, f"{PREFIXO_ARQUIVO}*.jsonl")))
+        else:
+            arquivos.append(caminho)
+    return sorted(arquivos)
+
+
+def ler_captura(arquivos: List[str]) -> Iterator[Dict[str, Any]]:
+    for arquivo in arquivos:
+        with open(arquivo, encoding="utf-8") as f:
+            for linha in f:
+                if linha.strip():
+                    yield json.loads(linha)
+
+
+def carregar_registros(args) -> List[Dict[str, Any]]:
+    """Registros em ordem de chegada (os workers gravam em arquivos separados)"""
+    registros = [
+        r for r in ler_captura(arquivos_captura(args.capturas))
+        if not args.rotas or r.get("rota") in args.rotas
+    ]
+    registros.sort(key=lambda r: r["ts"])
+    return registros[:args.limite] if args.limite else registros
+
+
+class Resultados:
+    def __init__(self):
+        self.latencias: List[float] = []
+        self.atrasos: List[float] = []
+        self.status: "Counter[str]" = Counter()
+        self.erros = 0
+
+
+async def _enviar(sessao: aiohttp.ClientSession, url: str, registro: Dict[str, Any], resultados: Resultados) -> None:
+    inicio = time.perf_counter()
+    try:
+        # Com o Accept e o Accept-Encoding originais: mesmo formato e mesma compressão
+        async with sessao.post(
+            f"{url}{registro['rota']}", json=registro.get("argumentos"), headers=registro.get("cabecalhos"),
+        ) as resposta:
+            # Lê o corpo inteiro, inclusive das respostas em streaming
+            await resposta.read()
+            status = resposta.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        resultados.status[type(e).__name__] += 1
+        resultados.erros += 1
+        return
+    resultados.status[str(status)] += 1
+    if status >= 500:
+        resultados.erros += 1
+        return
+    resultados.latencias.append(time.perf_counter() - inicio)
+
+
+async def reproduzir(args, registros: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Dispara cada requisição no instante capturado, dividido pela velocidade (0 = sem
+    esperar), com no máximo `concorrencia` em andamento"""
+    resultados = Resultados()
+    limite = asyncio.Semaphore(args.concorrencia)
+    url, _ = separar_url(args.url)
+    conector = criar_conector(args.url, limite=args.concorrencia)
+    # Sem descomprimir: o corpo só é lido, e o zstd nem sempre é suportado pelo aiohttp
+    async with aiohttp.ClientSession(
+        connector=conector, timeout=aiohttp.ClientTimeout(total=args.timeout), auto_decompress=False,
+    ) as sessao:
+        servidor_antes = ler_histograma(await ler_metricas_servidor(sessao, url), HISTOGRAMA_SERVIDOR)
+        inicio = time.perf_counter()
+        primeiro_ts = registros[0]["ts"] if registros else 0.0
+
+        async def enviar(registro):
+            try:
+                await _enviar(sessao, url, registro, resultados)
+            finally:
+                limite.release()
+
+        tarefas = []
+        for registro in registros:
+            if args.velocidade > 0:
+                previsto = (registro["ts"] - primeiro_ts) / args.velocidade
+                espera = previsto - (time.perf_counter() - inicio)
+                if espera > 0:
+                    await asyncio.sleep(espera)
+            await limite.acquire()
+            if args.velocidade > 0:
+                # Quanto o disparo atrasou em relação ao tráfego original
+                resultados.atrasos.append(max(0.0, time.perf_counter() - inicio - previsto))
+            tarefas.append(asyncio.ensure_future(enviar(registro)))
+        await asyncio.gather(*tarefas)
+        duracao = time.perf_counter() - inicio
+        servidor_depois = ler_histograma(await ler_metricas_servidor(sessao, url), HISTOGRAMA_SERVIDOR)
+
+    total = len(registros)
+    capturadas = [r["duracao_ms"] / 1000 for r in registros if "duracao_ms" in r]
+    return {
+        "requisicoes": total,
+        "sucessos": len(resultados.latencias),
+        "status": dict(resultados.status),
+        "taxa_erros": resultados.erros / total if total else 0.0,
+        "duracao": duracao,
+        "vazao": len(resultados.latencias) / duracao if duracao > 0 else 0.0,
+        "latencia": resumir_latencias(resultados.latencias),
+        "latencia_capturada": resumir_latencias(capturadas),
+        "atraso_disparo_p95": percentil(resultados.atrasos, 95),
+        "cache_capturado": dict(Counter(r["cache"] for r in registros if "cache" in r)),
+        "etapas_servidor": diferenca_etapas(servidor_antes, servidor_depois),
+    }
+
+
+def _ms(valor: Optional[float]) -> str:
+    return "-" if valor is None else f"{valor * 1000:.1f} ms"
+
+
+def imprimir_resultado(resultado: Dict[str, Any]) -> None:
+    print(f"📊 {resultado['sucessos']}/{resultado['requisicoes']} requisições em {resultado['duracao']:.1f}s"
+          f" → {resultado['vazao']:.1f} req/s, {resultado['taxa_erros']:.1%} de erros")
+    print(f"   status: {', '.join(f'{s}: {n}' for s, n in sorted(resultado['status'].items()))}")
+    for nome, chave in (("replay", "latencia"), ("capturada", "latencia_capturada")):
+        latencia = resultado[chave]
+        print(f"   latência {nome:<10} p50 {_ms(latencia['p50'])} | p95 {_ms(latencia['p95'])} | p99 {_ms(latencia['p99'])}")
+    if resultado["atraso_disparo_p95"] is not None:
+        print(f"   atraso de disparo p95: {_ms(resultado['atraso_disparo_p95'])}")
+    if resultado["cache_capturado"]:
+        print(f"   cache na captura: {resultado['cache_capturado']}")
+    for etapa, dados in resultado["etapas_servidor"].items():
+        print(f"     {etapa:<16} {dados['chamadas']:>7}× média {_ms(dados['media'])} | p95 ~{_ms(dados['p95'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay do tráfego capturado")
+    parser.add_argument("capturas", nargs="*", default=[PASTA_CAPTURAS], help="arquivos .jsonl ou pastas")
+    parser.add_argument("--url", default=os.getenv("MCP_BENCHMARK_URL", "http://localhost:8000"))
+    parser.add_argument("--velocidade", type=float, default=1.0, help="1 = tempo real, 10 = 10x mais rápido, 0 = sem pausas")
+    parser.add_argument("--concorrencia", type=int, default=256, help="máximo de requisições em andamento")
+    parser.add_argument("--limite", type=int, default=0, help="reproduz só as primeiras N requisições")
+    parser.add_argument("--rotas", nargs="*", help="só estas rotas (ex.: /tools/buscar_wikipedia)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--nome", help="nome do resultado salvo (padrão: replay + data)")
+    parser.add_argument("--pasta", default=PASTA_RESULTADOS)
+    parser.add_argument("--comparar", help="resultado salvo para comparar ao final")
+    parser.add_argument("--tolerancia", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    registros = carregar_registros(args)
+    if not registros:
+        print("❌ Nenhuma requisição capturada encontrada")
+        return 1
+    segundos = registros[-1]["ts"] - registros[0]["ts"]
+    print(f"🔁 {len(registros)} requisições ({segundos:.0f}s capturados) contra {args.url}, velocidade {args.velocidade:g}x")
+
+    resultado = asyncio.run(reproduzir(args, registros))
+    imprimir_resultado(resultado)
+    args.nome = args.nome or f"replay-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    execucao = {
+        "nome": args.nome,
+        "modo": "replay",
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "configuracao": {k: v for k, v in vars(args).items() if k not in ("comparar", "pasta")},
+        "resultado": resultado,
+    }
+    print(f"💾 {salvar(execucao, args.pasta)}")
+
+    if args.comparar:
+        return 1 if comparar(carregar_resultado(args.comparar), execucao, args.tolerancia) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from metricas import registro
+
+# Prazos e políticas padrão do ClienteMCP
+TIMEOUT_CONEXAO = float(os.getenv("MCP_CLIENTE_TIMEOUT_CONEXAO", "3"))
+TIMEOUT_LEITURA = float(os.getenv("MCP_CLIENTE_TIMEOUT_LEITURA", "30"))
+TENTATIVAS = int(os.getenv("MCP_CLIENTE_TENTATIVAS", "3"))
+BACKOFF_BASE = float(os.getenv("MCP_CLIENTE_BACKOFF_BASE", "0.1"))
+BACKOFF_MAXIMO = float(os.getenv("MCP_CLIENTE_BACKOFF_MAXIMO", "2"))
+HEDGE = os.getenv("MCP_CLIENTE_HEDGE", "0") == "1"
+HEDGE_PERCENTIL = float(os.getenv("MCP_CLIENTE_HEDGE_PERCENTIL", "95"))
+DISJUNTOR_FALHAS = int(os.getenv("MCP_CLIENTE_DISJUNTOR_FALHAS", "5"))
+DISJUNTOR_RECUPERACAO = float(os.getenv("MCP_CLIENTE_DISJUNTOR_RECUPERACAO", "30"))
+# Maior Retry-After atendido; pedidos de espera maiores encerram as tentativas
+RETRY_AFTER_MAXIMO = float(os.getenv("MCP_CLIENTE_RETRY_AFTER_MAXIMO", "10"))
+
+# Respostas em que vale a pena tentar de novo: sobrecarga ou falha do servidor
+STATUS_REPETIVEIS = frozenset({429, 502, 503, 504})
+
+eventos_resiliencia = registro.contador(
+    "mcp_cliente_resiliencia_total",
+    "Novas tentativas, requisições de hedge e chamadas recusadas pelo circuito aberto",
+)
+
+
+class RespostaRepetivel(Exception):
+    """Status HTTP que indica falha temporária do servidor"""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"status {status}")
+        self.status = status
+        # Segundos pedidos pelo servidor no cabeçalho Retry-After, se houver
+        self.retry_after = retry_after
+
+
+def ler_retry_after(valor: Optional[str]) -> Optional[float]:
+    """Segundos de espera do cabeçalho Retry-After, em segundos ou como data HTTP"""
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, data.timestamp() - time.time())
+
+
+class CircuitoAberto(Exception):
+    """O servidor falhou demais em seguida: a chamada nem é feita"""
+
+
+class JanelaLatencias:
+    """Latências recentes das chamadas bem-sucedidas, para estimar percentis"""
+
+    def __init__(self, tamanho: int = 200, minimo: int = 20):
+        self._valores: "deque[float]" = deque(maxlen=tamanho)
+        self.minimo = minimo
+
+    def registrar(self, valor: float) -> None:
+        self._valores.append(valor)
+
+    def percentil(self, p: float) -> Optional[float]:
+        """Percentil p (0-100), ou None enquanto não há amostras suficientes"""
+        if len(self._valores) < self.minimo:
+            return None
+        ordenados = sorted(self._valores)
+        return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+class Disjuntor:
+    """Circuit breaker: após `limiar_falhas` falhas seguidas recusa as chamadas por
+    `tempo_recuperacao` segundos; depois deixa passar uma chamada de teste, que
+    fecha o circuito se der certo e o reabre se falhar.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, limiar_falhas: int = 5, tempo_recuperacao: float = 30.0):
+        self.limiar_falhas = limiar_falhas
+        self.tempo_recuperacao = tempo_recuperacao
+        self.estado = self.FECHADO
+        self.falhas_seguidas = 0
+        self._aberto_em = 0.0
+
+    def permitir(self) -> bool:
+        if self.limiar_falhas <= 0 or self.estado == self.FECHADO:
+            return True
+        agora = time.monotonic()
+        if agora - self._aberto_em >= self.tempo_recuperacao:
+            # Só a primeira chamada depois do intervalo testa o servidor; se o teste
+            # não der resultado, outra é liberada após mais um intervalo
+            self.estado = self.MEIO_ABERTO
+            self._aberto_em = agora
+            return True
+        return False
+
+    def registrar_sucesso(self) -> None:
+        self.estado = self.FECHADO
+        self.falhas_seguidas = 0
+
+    def registrar_falha(self) -> None:
+        self.falhas_seguidas += 1
+        if self.estado == self.MEIO_ABERTO or (0 < self.limiar_falhas <= self.falhas_seguidas):
+            self.estado = self.ABERTO
+            self._aberto_em = time.monotonic()
+
+
+def atraso_backoff(tentativa: int, base: float = BACKOFF_BASE, maximo: float = BACKOFF_MAXIMO) -> float:
+    """Backoff exponencial com jitter completo: sorteado entre 0 e base * 2^tentativa"""
+    return random.uniform(0, min(maximo, base * 2 ** tentativa))
+
+
+async def primeira_que_responder(
+    chamada: Callable[[], Awaitable[Any]], atraso_hedge: Optional[float]
+) -> Any:
+    """Executa a chamada e, se ela não terminar em `atraso_hedge` segundos, dispara uma
+    segunda igual; vale o resultado da que terminar primeiro com sucesso.
+    """
+    if atraso_hedge is None:
+        return await chamada()
+
+    tarefas = {asyncio.ensure_future(chamada())}
+    try:
+        feitas, _ = await asyncio.wait(tarefas, timeout=atraso_hedge)
+        if not feitas:
+            eventos_resiliencia.incrementar(evento="hedge")
+            tarefas.add(asyncio.ensure_future(chamada()))
+        erro: Optional[BaseException] = None
+        while tarefas:
+            feitas, tarefas = await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+            for tarefa in feitas:
+                if tarefa.exception() is None:
+                    return tarefa.result()
+                erro = tarefa.exception()
+        raise erro
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
@@ -0,0 +1,274 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from admissao import UPSTREAM_ESPERA, criar_balde_upstream_do_ambiente
+from cache import (
+    TIPO_DESAMBIGUACAO,
+    TIPO_NAO_ENCONTRADO,
+    TIPO_OK,
+    CacheResumos,
+    normalizar_termo,
+)
+from metricas import duracao_etapa, medir, registro
+from sugestao import IndiceTrigramas
+
+URL_API = os.getenv("MCP_WIKIPEDIA_API_URL", "https://{idioma}.wikipedia.org/w/api.php")
+USER_AGENT = os.getenv("MCP_USER_AGENT", "mcp_app (https://github.com/paribe/mcp_app)")
+TIMEOUT = float(os.getenv("MCP_WIKIPEDIA_TIMEOUT", "10"))
+# Quanto esperar pela consulta exata antes de adiantar a busca textual (ou a do título
+# corrigido) em paralelo; 0 dispara as duas juntas
+ESPERA_BUSCA = float(os.getenv("MCP_RESOLUCAO_ESPERA_BUSCA", "0.3"))
+# Threads, por idioma, das segundas consultas (a exata roda na thread da requisição)
+MAX_CONSULTAS_ADIADAS = int(os.getenv("MCP_MAX_BUSCAS_SIMULTANEAS", "64"))
+
+# Limite de chamadas por segundo à Wikipedia, compartilhado por todos os idiomas do processo
+balde_upstream = criar_balde_upstream_do_ambiente()
+if balde_upstream is not None:
+    registro.contador(
+        "mcp_upstream_esperas_total",
+        "Chamadas à Wikipedia que esperaram pelo balde de tokens",
+        lambda: balde_upstream.esperas,
+    )
+    registro.contador(
+        "mcp_upstream_recusadas_total",
+        "Chamadas à Wikipedia recusadas pelo balde de tokens",
+        lambda: balde_upstream.recusadas,
+    )
+
+# Origem da resolução de um termo
+ORIGEM_DIRETO = "direto"
+ORIGEM_REDIRECIONAMENTO = "redirecionamento"
+ORIGEM_DESAMBIGUACAO = "desambiguacao"
+ORIGEM_BUSCA = "busca"
+ORIGEM_SUGESTAO = "sugestao"
+
+_TIPO_POR_ORIGEM = {
+    ORIGEM_DIRETO: TIPO_OK,
+    ORIGEM_REDIRECIONAMENTO: TIPO_OK,
+    ORIGEM_DESAMBIGUACAO: TIPO_DESAMBIGUACAO,
+    ORIGEM_BUSCA: TIPO_DESAMBIGUACAO,
+    ORIGEM_SUGESTAO: TIPO_DESAMBIGUACAO,
+}
+
+
+class _ConsultaAdiada:
+    """Consulta disparada no executor depois de `espera` segundos, a não ser que seja
+    cancelada antes; `resultado()` a faz na hora, na thread de quem chama, se ela ainda
+    não tiver saído"""
+
+    def __init__(self, executor: ThreadPoolExecutor, espera: float, funcao: Callable, *args: Any):
+        self._funcao = partial(funcao, *args)
+        self._prazo = time.monotonic() + espera
+        self._decidida = threading.Event()
+        self._lock = threading.Lock()
+        self._assumida = False
+        self._futuro: Future = Future()
+        executor.submit(self._disparar)
+
+    def _assumir(self) -> bool:
+        with self._lock:
+            if self._assumida:
+                return False
+            self._assumida = True
+            return True
+
+    def _disparar(self) -> None:
+        # Com o executor cheio a tarefa pode começar atrasada: o prazo conta da criação
+        if self._decidida.wait(max(0.0, self._prazo - time.monotonic())) or not self._assumir():
+            return
+        try:
+            self._futuro.set_result(self._funcao())
+        except BaseException as e:
+            self._futuro.set_exception(e)
+
+    def cancelar(self) -> None:
+        """Descarta a consulta; se ela já saiu, a resposta é ignorada"""
+        self._assumir()
+        self._decidida.set()
+
+    def resultado(self) -> Any:
+        if self._assumir():
+            self._decidida.set()
+            return self._funcao()
+        return self._futuro.result()
+
+
+class ResolvedorTitulos:
+    """Resolve um termo para o título canônico e o resumo em uma única ida à Wikipedia.
+
+    A consulta exata (com redirecionamentos) vem primeiro, na thread de quem chama; a
+    busca textual só é feita se ela não encontrar a página, ou adiantada em paralelo se
+    ela passar de `espera_busca` segundos, e o resultado fica numa tabela termo → título
+    para as próximas vezes. Com um índice de `sugestoes`, o termo que parece um título
+    conhecido digitado errado é consultado pelo título corrigido junto com a exata.
+    """
+
+    def __init__(
+        self,
+        idioma: str = "pt",
+        sessao: Optional[requests.Session] = None,
+        max_termos: int = 50000,
+        max_conexoes: int = 32,
+        sugestoes: Optional[IndiceTrigramas] = None,
+        espera_busca: float = ESPERA_BUSCA,
+        max_consultas_adiadas: int = MAX_CONSULTAS_ADIADAS,
+    ):
+        self.idioma = idioma
+        self.sugestoes = sugestoes
+        self.espera_busca = espera_busca
+        self.url = URL_API.format(idioma=idioma)
+        if sessao is None:
+            # Sessão própria do idioma: conexões keep-alive reaproveitadas entre as threads
+            sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexoes)
+            sessao.mount("https://", adaptador)
+            sessao.mount("http://", adaptador)
+            sessao.headers["User-Agent"] = USER_AGENT
+        self.sessao = sessao
+        self.tabela = CacheResumos(max_itens=max_termos, ttl=86400.0, ttl_desambiguacao=3600.0, ttl_nao_encontrado=600.0)
+        self._executor = ThreadPoolExecutor(max_workers=max_consultas_adiadas, thread_name_prefix=f"resolucao-{idioma}")
+
+    def _consultar(self, parametros: Dict[str, Any], sentencas: Optional[int]) -> Dict[str, Any]:
+        parametros = {
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "prop": "extracts|pageprops",
+            "ppprop": "disambiguation",
+            "explaintext": 1,
+            "exlimit": "max",
+            **parametros,
+        }
+        if sentencas is not None:
+            parametros.update(exintro=1, exsentences=sentencas)
+        if balde_upstream is not None:
+            balde_upstream.adquirir(UPSTREAM_ESPERA)
+        resposta = self.sessao.get(self.url, params=parametros, timeout=TIMEOUT)
+        resposta.raise_for_status()
+        return resposta.json()
+
+    def _consultar_titulo(self, titulo: str, sentencas: Optional[int]) -> Dict[str, Any]:
+        return self._consultar({"titles": titulo, "redirects": 1}, sentencas)
+
+    def _consultar_busca(self, termo: str, sentencas: Optional[int]) -> Dict[str, Any]:
+        return self._consultar({"generator": "search", "gsrsearch": termo, "gsrlimit": 3}, sentencas)
+
+    @staticmethod
+    def _paginas(dados: Dict[str, Any]) -> List[Dict[str, Any]]:
+        paginas = dados.get("query", {}).get("pages", [])
+        paginas = [p for p in paginas if not p.get("missing") and not p.get("invalid")]
+        return sorted(paginas, key=lambda p: p.get("index", 0))
+
+    @staticmethod
+    def _eh_desambiguacao(pagina: Dict[str, Any]) -> bool:
+        return "disambiguation" in pagina.get("pageprops", {})
+
+    def _resultado(self, pagina: Dict[str, Any], origem: str) -> Dict[str, str]:
+        return {"titulo": pagina["title"], "texto": pagina.get("extract", ""), "origem": origem}
+
+    def titulo_conhecido(self, termo: str) -> Optional[str]:
+        """Título canônico já resolvido para o termo, sem ir à Wikipedia"""
+        conhecido = self.tabela.obter(normalizar_termo(termo))
+        if conhecido is None:
+            return None
+        _, (_, titulo) = conhecido
+        return titulo
+
+    def resolver(self, termo: str, sentencas: Optional[int] = 3) -> Optional[Dict[str, str]]:
+        """Retorna {'titulo', 'texto', 'origem'} ou None se nada foi encontrado.
+
+        Com sentencas=None o texto é o artigo completo, e não só o início da introdução.
+        """
+        chave = normalizar_termo(termo)
+        conhecido = self.tabela.obter(chave)
+        if conhecido is not None:
+            tipo, (origem, titulo) = conhecido
+            if tipo == TIPO_NAO_ENCONTRADO:
+                return None
+            # Título canônico já conhecido: uma única consulta, sem busca
+            with medir(duracao_etapa, etapa="wikipedia"):
+                paginas = self._paginas(self._consultar_titulo(titulo, sentencas))
+            if paginas and not self._eh_desambiguacao(paginas[0]):
+                return self._resultado(paginas[0], origem)
+
+        corrigido = None
+        if self.sugestoes is not None:
+            with medir(duracao_etapa, etapa="sugestao"):
+                corrigido = self.sugestoes.corrigir(termo)
+
+        # Na maioria das vezes a consulta exata basta: a busca textual só sai junto, como
+        # num hedge, se a exata demorar mais que espera_busca. Um termo parecido com um
+        # título conhecido provavelmente foi digitado errado, e a correção sai já
+        correcao = busca = None
+        if corrigido is not None:
+            correcao = _ConsultaAdiada(self._executor, 0.0, self._consultar_titulo, corrigido, sentencas)
+        else:
+            busca = _ConsultaAdiada(self._executor, self.espera_busca, self._consultar_busca, termo, sentencas)
+        try:
+            with medir(duracao_etapa, etapa="wikipedia"):
+                dados_exata = self._consultar_titulo(termo, sentencas)
+        except BaseException:
+            for adiantada in (correcao, busca):
+                if adiantada is not None:
+                    adiantada.cancelar()
+            raise
+
+        paginas = self._paginas(dados_exata)
+        if correcao is not None:
+            if paginas:
+                correcao.cancelar()
+            else:
+                # O termo não é um título: fica a correção, se ela existir e não for ambígua
+                with medir(duracao_etapa, etapa="wikipedia"):
+                    corrigidas = self._paginas(correcao.resultado())
+                if corrigidas and not self._eh_desambiguacao(corrigidas[0]):
+                    resultado = self._resultado(corrigidas[0], ORIGEM_SUGESTAO)
+                    self._lembrar(termo, ORIGEM_SUGESTAO, resultado)
+                    return resultado
+
+        if paginas and not self._eh_desambiguacao(paginas[0]):
+            if busca is not None:
+                busca.cancelar()
+            origem = ORIGEM_REDIRECIONAMENTO if dados_exata.get("query", {}).get("redirects") else ORIGEM_DIRETO
+            resultado = self._resultado(paginas[0], origem)
+        else:
+            # Página ambígua ou inexistente: usa o primeiro resultado da busca que não seja ambíguo
+            origem = ORIGEM_DESAMBIGUACAO if paginas else ORIGEM_BUSCA
+            with medir(duracao_etapa, etapa="desambiguacao"):
+                dados_busca = busca.resultado() if busca is not None else self._consultar_busca(termo, sentencas)
+            candidatos = [p for p in self._paginas(dados_busca) if not self._eh_desambiguacao(p)]
+            resultado = self._resultado(candidatos[0], origem) if candidatos else None
+            if resultado is not None and sentencas is None and not resultado["texto"]:
+                # A API só devolve um artigo completo por consulta; busca o escolhido pelo título
+                paginas = self._paginas(self._consultar_titulo(resultado["titulo"], sentencas))
+                if paginas:
+                    resultado = self._resultado(paginas[0], origem)
+
+        self._lembrar(termo, origem, resultado)
+        return resultado
+
+    def _lembrar(self, termo: str, origem: str, resultado: Optional[Dict[str, str]]) -> None:
+        """Guarda termo → título na tabela e o título no índice de sugestões"""
+        chave = normalizar_termo(termo)
+        if resultado is None:
+            self.tabela.guardar(chave, (ORIGEM_BUSCA, None), TIPO_NAO_ENCONTRADO)
+            return
+        self.tabela.guardar(chave, (origem, resultado["titulo"]), _TIPO_POR_ORIGEM[origem])
+        self.tabela.guardar(normalizar_termo(resultado["titulo"]), (ORIGEM_DIRETO, resultado["titulo"]))
+        if self.sugestoes is not None:
+            self.sugestoes.adicionar(resultado["titulo"])
+            if origem == ORIGEM_REDIRECIONAMENTO:
+                # O nome do redirecionamento também é um título válido (ex.: Maradona)
+                self.sugestoes.adicionar(termo)
+
+
+def tipo_cache(origem: str) -> str:
+    """Tipo de entrada do cache de resumos (e o TTL) para uma origem de resolução"""
+    return _TIPO_POR_ORIGEM[origem]
@@ -1,39 +1,229 @@
-from flask import Flask, request, jsonify
-import wikipedia
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+
+import jsonrpc
+from admissao import ControleAdmissao, Sobrecarga
+from busca_wikipedia import (
+    IDIOMA,
+    MAX_PARALELISMO_LOTE,
+    SENTENCAS,
+    atualizar_resumo,
+    buscar_item_lote,
+    cache_resumos,
+    consultar_cache,
+    criar_aquecedor,
+    titulo_conhecido,
+    validar_idioma,
+    validar_lote,
+)
+from captura import anotar_busca, criar_captura_do_ambiente
+from compressao import codificar_resposta
+from metricas import CONTENT_TYPE, duracao_etapa, medir, no_contexto_atual, registro
+from streaming import CONTENT_TYPE_NDJSON, evento_erro, evento_titulo, eventos_resumo, linha_ndjson, quer_stream
 
 app = Flask(__name__)
 
+# Executa as mensagens de um lote JSON-RPC em paralelo
+executor_rpc = ThreadPoolExecutor(max_workers=MAX_PARALELISMO_LOTE, thread_name_prefix="rpc")
+
+requisicoes_em_andamento = registro.medidor("mcp_requisicoes_em_andamento", "Requisições sendo atendidas")
+# Rótulo `rota` das requisições que não casam com nenhuma rota (404)
+ROTA_DESCONHECIDA = "desconhecida"
+requisicoes = registro.contador("mcp_requisicoes_total", "Requisições atendidas por rota e status")
+
+# Rotas que chegam à Wikipedia passam pelo controle de admissão (MCP_ADMISSAO_*)
+admissao = ControleAdmissao()
+ROTAS_ADMITIDAS = {'buscar_wikipedia', 'buscar_wikipedia_lote', 'mcp'}
+registro.medidor("mcp_admissao_fila", "Requisições aguardando vaga", lambda: admissao.aguardando)
+registro.contador("mcp_admissao_rejeitadas_total", "Requisições recusadas com 429", lambda: admissao.rejeitadas)
+
+# Aquecimento do cache em segundo plano (MCP_AQUECIMENTO_*), que cede a vez ao tráfego real
+aquecedor = criar_aquecedor(ocupado=admissao.ocupado)
+
+def iniciar_aquecimento():
+    if aquecedor is not None:
+        aquecedor.iniciar()
+
+# Captura das requisições em JSONL para o replay.py (MCP_CAPTURA_*)
+captura = criar_captura_do_ambiente()
+
+def resposta_sobrecarga(e):
+    resposta = jsonify({'error': str(e)})
+    resposta.status_code = 429
+    resposta.headers['Retry-After'] = e.cabecalho_retry_after
+    return resposta
+
+def resposta_ferramenta(conteudo):
+    """Resposta de /tools/* em JSON ou MessagePack, comprimida acima de
+    MCP_COMPRESSAO_LIMIAR, conforme o Accept e o Accept-Encoding do cliente"""
+    corpo, content_type, cabecalhos = codificar_resposta(conteudo, request.accept_mimetypes, request.accept_encodings)
+    return Response(corpo, content_type=content_type, headers=cabecalhos)
+
+@app.before_request
+def iniciar_requisicao():
+    requisicoes_em_andamento.incrementar()
+    g.em_andamento = True
+    if captura is not None and request.endpoint in ROTAS_ADMITIDAS:
+        # Antes da admissão: as requisições recusadas também fazem parte do tráfego
+        g.captura = captura.iniciar(request.headers)
+    if request.endpoint in ROTAS_ADMITIDAS:
+        try:
+            admissao.entrar()
+        except Sobrecarga as e:
+            return resposta_sobrecarga(e)
+        g.admitida = True
+
+@app.after_request
+def contar_requisicao(response):
+    # A regra da rota, e não o caminho pedido: caminhos quaisquer (404) não criam séries
+    rota = request.url_rule.rule if request.url_rule is not None else ROTA_DESCONHECIDA
+    requisicoes.incrementar(rota=rota, status=str(response.status_code))
+    g.status = response.status_code
+    return response
+
+@app.teardown_request
+def encerrar_requisicao(exc):
+    # Roda assim que a view retorna, antes do corpo de uma resposta em streaming ser
+    # enviado, e de novo ao fim dele (stream_with_context): nesse caso a contagem, a vaga
+    # e a captura ficam com _liberar_ao_fim, e os g.pop evitam liberar duas vezes
+    if g.pop('em_andamento', False):
+        requisicoes_em_andamento.decrementar()
+    if g.pop('admitida', False):
+        admissao.sair()
+    anotacao = g.pop('captura', None)
+    if anotacao is not None:
+        captura.concluir(anotacao, request.path, request.get_json(silent=True), g.get('status', 500))
+
+def _liberar_ao_fim(gerador, em_andamento, admitida, anotacao, rota, argumentos):
+    """Mantém a requisição em andamento e a vaga da admissão, e adia a captura, até o
+    fim da resposta em streaming"""
+    try:
+        yield from gerador
+    finally:
+        if em_andamento:
+            requisicoes_em_andamento.decrementar()
+        if admitida:
+            admissao.sair()
+        if anotacao is not None:
+            captura.concluir(anotacao, rota, argumentos, 200)
+
 @app.route('/tools/buscar_wikipedia', methods=['POST'])
 def buscar_wikipedia():
     try:
-        data = request.get_json()
-        busca = data.get('busca', '')
+        with medir(duracao_etapa, etapa="parse"):
+            data = request.get_json()
+            busca = data.get('busca', '')
+            lang = data.get('lang', IDIOMA)
+            # Artigo completo em vez do resumo, para montar o contexto no cliente
+            sentencas = None if data.get('completo') else SENTENCAS
         
         if not busca:
             return jsonify({'error': 'Parâmetro busca é obrigatório'}), 400
+        try:
+            validar_idioma(lang)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Configura Wikipedia para português
-        wikipedia.set_lang("pt")
+        if quer_stream(data, request.headers.get('Accept', '')):
+            anotacao = g.pop('captura', None)
+            corpo = _liberar_ao_fim(
+                _stream_busca(busca, lang, sentencas, anotacao),
+                g.pop('em_andamento', False), g.pop('admitida', False), anotacao, request.path, data,
+            )
+            return Response(stream_with_context(corpo), content_type=CONTENT_TYPE_NDJSON)
         
+        detalhes = consultar_cache(busca, lang, sentencas)
+        em_cache = detalhes is not None
         try:
-            resultado = wikipedia.summary(busca, sentences=3)
-            return jsonify({'content': resultado})
-        except wikipedia.exceptions.DisambiguationError as e:
-            # Se há ambiguidade, pega a primeira opção
-            resultado = wikipedia.summary(e.options[0], sentences=3)
-            return jsonify({'content': resultado})
-        except wikipedia.exceptions.PageError:
-            return jsonify({'content': f'Não foi encontrada informação sobre "{busca}" na Wikipedia.'})
+            if detalhes is None:
+                detalhes = atualizar_resumo(busca, lang, sentencas)
+            resultado = detalhes['texto']
+            anotar_busca(g.get('captura'), detalhes, em_cache)
+        except Sobrecarga as e:
+            return resposta_sobrecarga(e)
         except Exception as e:
-            return jsonify({'content': f'Erro ao buscar: {str(e)}'})
+            resultado = f'Erro ao buscar: {str(e)}'
+        
+        return resposta_ferramenta({'content': resultado})
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _stream_busca(busca, lang, sentencas, anotacao=None):
+    """Resposta NDJSON: título assim que conhecido, depois os trechos do resumo e os metadados"""
+    detalhes = consultar_cache(busca, lang, sentencas)
+    em_cache = detalhes is not None
+    titulo = None
+    if detalhes is None:
+        # Título já resolvido antes: sai antes da ida à Wikipedia
+        titulo = titulo_conhecido(busca, lang)
+        if titulo:
+            yield linha_ndjson(evento_titulo(titulo))
+        try:
+            detalhes = atualizar_resumo(busca, lang, sentencas)
+        except Exception as e:
+            yield linha_ndjson(evento_erro(f'Erro ao buscar: {str(e)}'))
+            return
+    
+    anotar_busca(anotacao, detalhes, em_cache)
+    for evento in eventos_resumo(detalhes, lang, em_cache, titulo_enviado=bool(titulo)):
+        yield linha_ndjson(evento)
+
+@app.route('/tools/buscar_wikipedia_lote', methods=['POST'])
+def buscar_wikipedia_lote():
+    try:
+        with medir(duracao_etapa, etapa="parse"):
+            data = request.get_json()
+            try:
+                buscas, paralelismo, lang = validar_lote(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        # Busca os termos em paralelo, preservando a ordem do pedido
+        with ThreadPoolExecutor(max_workers=paralelismo) as executor:
+            resultados = list(executor.map(no_contexto_atual(partial(buscar_item_lote, idioma=lang)), buscas))
+        
+        return resposta_ferramenta({'resultados': resultados})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/mcp', methods=['POST'])
+def mcp():
+    """Despacho JSON-RPC 2.0 (initialize, tools/list, tools/call), com suporte a lotes"""
+    with medir(duracao_etapa, etapa="parse"):
+        payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify(jsonrpc.erro_parse())
+    
+    resposta = jsonrpc.processar(payload, lambda funcao, itens: executor_rpc.map(no_contexto_atual(funcao), itens))
+    if resposta is None:
+        # Só notificações: nada a responder
+        return '', 202
+    
+    with medir(duracao_etapa, etapa="serializacao"):
+        return jsonify(resposta)
+
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok'})
+    estado = {'status': 'ok', 'cache': cache_resumos.estatisticas()}
+    if aquecedor is not None:
+        estado['aquecimento'] = aquecedor.estatisticas()
+    return jsonify(estado)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(registro.renderizar(), content_type=CONTENT_TYPE)
 
 if __name__ == "__main__":
-    print("Servidor MCP iniciado em http://localhost:8000")
-    app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    # Com MCP_SOCKET_UNIX, escuta só no socket Unix (ClienteMCP com unix:///caminho/do.sock)
+    socket_unix = os.getenv("MCP_SOCKET_UNIX")
+    host = f"unix://{socket_unix}" if socket_unix else '0.0.0.0'
+    print(f"Servidor MCP iniciado em {host}" if socket_unix else "Servidor MCP iniciado em http://localhost:8000")
+    # Com o reloader do modo debug, só o processo que atende as requisições aquece o cache
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        iniciar_aquecimento()
+    app.run(host=host, port=8000, debug=True)
\ No newline at end of file
@@ -0,0 +1,269 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from quart import Quart, Response, g, request, jsonify
+
+import jsonrpc
+from admissao import ControleAdmissaoAsync, Sobrecarga
+from busca_wikipedia import (
+    IDIOMA,
+    SENTENCAS,
+    atualizar_resumo,
+    buscar_item_lote,
+    cache_resumos,
+    chave_cache,
+    consultar_cache,
+    criar_aquecedor,
+    titulo_conhecido,
+    validar_idioma,
+    validar_lote,
+)
+from captura import anotar_busca, criar_captura_do_ambiente
+from compressao import codificar_resposta
+from coalescencia import ChamadaUnicaAsync
+from metricas import CONTENT_TYPE, duracao_etapa, medir, no_contexto_atual, registro
+from streaming import CONTENT_TYPE_NDJSON, evento_erro, evento_titulo, eventos_resumo, linha_ndjson, quer_stream
+
+app = Quart(__name__)
+
+# Executor limitado para as chamadas bloqueantes à Wikipedia
+MAX_BUSCAS_SIMULTANEAS = int(os.getenv("MCP_MAX_BUSCAS_SIMULTANEAS", "64"))
+executor = ThreadPoolExecutor(
+    max_workers=MAX_BUSCAS_SIMULTANEAS,
+    thread_name_prefix="wikipedia",
+)
+
+# Requisições idênticas aguardam a mesma busca sem ocupar threads do executor
+buscas_em_andamento = ChamadaUnicaAsync()
+
+requisicoes_em_andamento = registro.medidor("mcp_requisicoes_em_andamento", "Requisições sendo atendidas")
+# Rótulo `rota` das requisições que não casam com nenhuma rota (404)
+ROTA_DESCONHECIDA = "desconhecida"
+requisicoes = registro.contador("mcp_requisicoes_total", "Requisições atendidas por rota e status")
+registro.medidor(
+    "mcp_buscas_async_em_andamento",
+    "Buscas distintas aguardando o executor",
+    buscas_em_andamento.em_andamento,
+)
+
+# Rotas que chegam à Wikipedia passam pelo controle de admissão (MCP_ADMISSAO_*)
+admissao = ControleAdmissaoAsync()
+ROTAS_ADMITIDAS = {'buscar_wikipedia', 'buscar_wikipedia_lote', 'mcp'}
+registro.medidor("mcp_admissao_fila", "Requisições aguardando vaga", lambda: admissao.aguardando)
+registro.contador("mcp_admissao_rejeitadas_total", "Requisições recusadas com 429", lambda: admissao.rejeitadas)
+
+# Aquecimento do cache em segundo plano (MCP_AQUECIMENTO_*), que cede a vez ao tráfego real
+aquecedor = criar_aquecedor(ocupado=admissao.ocupado)
+
+# Captura das requisições em JSONL para o replay.py (MCP_CAPTURA_*)
+captura = criar_captura_do_ambiente()
+
+def resposta_sobrecarga(e):
+    return jsonify({'error': str(e)}), 429, {'Retry-After': e.cabecalho_retry_after}
+
+def resposta_ferramenta(conteudo):
+    """Resposta de /tools/* em JSON ou MessagePack, comprimida acima de
+    MCP_COMPRESSAO_LIMIAR, conforme o Accept e o Accept-Encoding do cliente"""
+    corpo, content_type, cabecalhos = codificar_resposta(conteudo, request.accept_mimetypes, request.accept_encodings)
+    return Response(corpo, content_type=content_type, headers=cabecalhos)
+
+@app.before_request
+async def iniciar_requisicao():
+    requisicoes_em_andamento.incrementar()
+    g.em_andamento = True
+    if captura is not None and request.endpoint in ROTAS_ADMITIDAS:
+        # Antes da admissão: as requisições recusadas também fazem parte do tráfego
+        g.captura = captura.iniciar(request.headers)
+    if request.endpoint in ROTAS_ADMITIDAS:
+        try:
+            await admissao.entrar()
+        except Sobrecarga as e:
+            return resposta_sobrecarga(e)
+        g.admitida = True
+
+@app.after_request
+async def contar_requisicao(response):
+    # A regra da rota, e não o caminho pedido: caminhos quaisquer (404) não criam séries
+    rota = request.url_rule.rule if request.url_rule is not None else ROTA_DESCONHECIDA
+    requisicoes.incrementar(rota=rota, status=str(response.status_code))
+    g.status = response.status_code
+    return response
+
+@app.teardown_request
+async def encerrar_requisicao(exc):
+    # Numa resposta em streaming a contagem, a vaga e a captura ficam com _liberar_ao_fim
+    if g.pop('em_andamento', False):
+        requisicoes_em_andamento.decrementar()
+    if g.pop('admitida', False):
+        await admissao.sair()
+    anotacao = g.pop('captura', None)
+    if anotacao is not None:
+        captura.concluir(anotacao, request.path, await request.get_json(silent=True), g.get('status', 500))
+
+async def _liberar_ao_fim(gerador, em_andamento, admitida, anotacao, rota, argumentos):
+    """Mantém a requisição em andamento e a vaga da admissão, e adia a captura, até o
+    fim da resposta em streaming"""
+    try:
+        async for parte in gerador:
+            yield parte
+    finally:
+        if em_andamento:
+            requisicoes_em_andamento.decrementar()
+        if admitida:
+            await admissao.sair()
+        if anotacao is not None:
+            captura.concluir(anotacao, rota, argumentos, 200)
+
+@app.route('/tools/buscar_wikipedia', methods=['POST'])
+async def buscar_wikipedia():
+    try:
+        with medir(duracao_etapa, etapa="parse"):
+            data = await request.get_json()
+            busca = data.get('busca', '')
+            lang = data.get('lang', IDIOMA)
+            # Artigo completo em vez do resumo, para montar o contexto no cliente
+            sentencas = None if data.get('completo') else SENTENCAS
+        
+        if not busca:
+            return jsonify({'error': 'Parâmetro busca é obrigatório'}), 400
+        try:
+            validar_idioma(lang)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if quer_stream(data, request.headers.get('Accept', '')):
+            anotacao = g.pop('captura', None)
+            corpo = _liberar_ao_fim(
+                _stream_busca(busca, lang, sentencas, anotacao),
+                g.pop('em_andamento', False), g.pop('admitida', False), anotacao, request.path, data,
+            )
+            return Response(corpo, content_type=CONTENT_TYPE_NDJSON)
+        
+        # Acertos de cache não precisam passar pelo executor
+        detalhes = consultar_cache(busca, lang, sentencas)
+        em_cache = detalhes is not None
+        try:
+            if detalhes is None:
+                detalhes = await _atualizar_resumo(busca, lang, sentencas)
+            resultado = detalhes['texto']
+            anotar_busca(g.get('captura'), detalhes, em_cache)
+        except Sobrecarga as e:
+            return resposta_sobrecarga(e)
+        except Exception as e:
+            resultado = f'Erro ao buscar: {str(e)}'
+        
+        return resposta_ferramenta({'content': resultado})
+            
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _atualizar_resumo(busca, lang, sentencas):
+    loop = asyncio.get_running_loop()
+    # O contexto vai junto para a thread: as etapas medidas lá contam para a captura
+    atualizar = no_contexto_atual(atualizar_resumo)
+    return buscas_em_andamento.executar(
+        chave_cache(busca, lang, sentencas),
+        lambda: loop.run_in_executor(executor, atualizar, busca, lang, sentencas),
+    )
+
+async def _stream_busca(busca, lang, sentencas, anotacao=None):
+    """Resposta NDJSON: título assim que conhecido, depois os trechos do resumo e os metadados"""
+    detalhes = consultar_cache(busca, lang, sentencas)
+    em_cache = detalhes is not None
+    titulo = None
+    if detalhes is None:
+        # Título já resolvido antes: sai antes da ida à Wikipedia
+        titulo = titulo_conhecido(busca, lang)
+        if titulo:
+            yield linha_ndjson(evento_titulo(titulo))
+        try:
+            detalhes = await _atualizar_resumo(busca, lang, sentencas)
+        except Exception as e:
+            yield linha_ndjson(evento_erro(f'Erro ao buscar: {str(e)}'))
+            return
+    
+    anotar_busca(anotacao, detalhes, em_cache)
+    for evento in eventos_resumo(detalhes, lang, em_cache, titulo_enviado=bool(titulo)):
+        yield linha_ndjson(evento)
+
+@app.route('/tools/buscar_wikipedia_lote', methods=['POST'])
+async def buscar_wikipedia_lote():
+    try:
+        with medir(duracao_etapa, etapa="parse"):
+            data = await request.get_json()
+            try:
+                buscas, paralelismo, lang = validar_lote(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        loop = asyncio.get_running_loop()
+        limite = asyncio.Semaphore(paralelismo)
+        buscar_item = no_contexto_atual(buscar_item_lote)
+        
+        async def buscar(busca):
+            async with limite:
+                return await loop.run_in_executor(executor, buscar_item, busca, lang)
+        
+        resultados = await asyncio.gather(*(buscar(busca) for busca in buscas))
+        
+        return resposta_ferramenta({'resultados': list(resultados)})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/mcp', methods=['POST'])
+async def mcp():
+    """Despacho JSON-RPC 2.0 (initialize, tools/list, tools/call), com suporte a lotes"""
+    with medir(duracao_etapa, etapa="parse"):
+        payload = await request.get_json(silent=True)
+    if payload is None:
+        return jsonify(jsonrpc.erro_parse())
+    
+    # As mensagens de um lote rodam concorrentemente no executor
+    loop = asyncio.get_running_loop()
+    despachar = no_contexto_atual(jsonrpc.despachar)
+    resposta = await jsonrpc.processar_async(
+        payload,
+        lambda mensagem: loop.run_in_executor(executor, despachar, mensagem),
+    )
+    if resposta is None:
+        # Só notificações: nada a responder
+        return '', 202
+    
+    with medir(duracao_etapa, etapa="serializacao"):
+        return jsonify(resposta)
+
+@app.route('/health', methods=['GET'])
+async def health():
+    estado = {'status': 'ok', 'cache': cache_resumos.estatisticas()}
+    if aquecedor is not None:
+        estado['aquecimento'] = aquecedor.estatisticas()
+    return jsonify(estado)
+
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    return Response(registro.renderizar(), content_type=CONTENT_TYPE)
+
+@app.before_serving
+async def iniciar_aquecimento():
+    if aquecedor is not None:
+        aquecedor.iniciar()
+
+@app.after_serving
+async def encerrar_executor():
+    if aquecedor is not None:
+        aquecedor.parar()
+    executor.shutdown(wait=False)
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    # Com MCP_SOCKET_UNIX, escuta só no socket Unix (ClienteMCP com unix:///caminho/do.sock)
+    socket_unix = os.getenv("MCP_SOCKET_UNIX")
+    if socket_unix:
+        print(f"Servidor MCP (async) iniciado em unix://{socket_unix}")
+        uvicorn.run(app, uds=socket_unix)
+    else:
+        print("Servidor MCP (async) iniciado em http://localhost:8000")
+        uvicorn.run(app, host='0.0.0.0', port=8000)
\ No newline at end of file
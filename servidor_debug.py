@@ -1,15 +1,54 @@
-from flask import Flask, request, jsonify
-import wikipedia
+import os
+import time
+
+from flask import Flask, g, request, jsonify
+
+from busca_wikipedia import IDIOMA, obter_resolvedor, validar_idioma
+from log_amostrado import criar_log_do_ambiente
 
 app = Flask(__name__)
 
+# "estruturado": JSON amostrado gravado em segundo plano; "verboso": prints de cada requisição
+MODO_LOG = os.getenv("MCP_LOG_MODO", "estruturado")
+VERBOSO = MODO_LOG == "verboso"
+log = None if VERBOSO else criar_log_do_ambiente()
+
 # Logs para debug
 @app.before_request
 def log_request_info():
-    print(f"🔍 REQUEST: {request.method} {request.url}")
-    print(f"📝 Headers: {dict(request.headers)}")
-    if request.is_json:
-        print(f"📦 JSON Data: {request.get_json()}")
+    if VERBOSO:
+        print(f"🔍 REQUEST: {request.method} {request.url}")
+        print(f"📝 Headers: {dict(request.headers)}")
+        if request.is_json:
+            print(f"📦 JSON Data: {request.get_json()}")
+        return
+    
+    g.inicio = time.perf_counter()
+    g.amostrado = log.amostrar()
+
+@app.after_request
+def log_response_info(response):
+    if VERBOSO:
+        return response
+    
+    duracao_ms = (time.perf_counter() - g.inicio) * 1000
+    if not log.deve_registrar(g.amostrado, duracao_ms):
+        return response
+    
+    registro = {
+        'metodo': request.method,
+        'caminho': request.path,
+        'status': response.status_code,
+        'duracao_ms': round(duracao_ms, 3),
+        'amostrado': g.amostrado,
+    }
+    # Cabeçalhos e corpo só são lidos nas requisições amostradas
+    if g.amostrado:
+        registro['headers'] = dict(request.headers)
+        if request.is_json:
+            registro['json'] = request.get_json(silent=True)
+    log.registrar(registro)
+    return response
 
 @app.route('/', methods=['GET'])
 def home():
@@ -21,7 +60,8 @@ def home():
 
 @app.route('/tools/buscar_wikipedia', methods=['POST'])
 def buscar_wikipedia():
-    print("🎯 Endpoint buscar_wikipedia chamado!")
+    if VERBOSO:
+        print("🎯 Endpoint buscar_wikipedia chamado!")
     
     try:
         # Verificar se é JSON
@@ -29,26 +69,31 @@ def buscar_wikipedia():
             return jsonify({'error': 'Content-Type deve ser application/json'}), 400
         
         data = request.get_json()
-        print(f"📊 Dados recebidos: {data}")
+        if VERBOSO:
+            print(f"📊 Dados recebidos: {data}")
         
         busca = data.get('busca', '')
         if not busca:
             return jsonify({'error': 'Parâmetro busca é obrigatório'}), 400
         
-        print(f"🔎 Buscando: {busca}")
+        lang = data.get('lang', IDIOMA)
+        try:
+            validar_idioma(lang)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Configura Wikipedia para português
-        wikipedia.set_lang("pt")
+        if VERBOSO:
+            print(f"🔎 Buscando: {busca} ({lang})")
         
         try:
-            resultado = wikipedia.summary(busca, sentences=2)
-            print(f"✅ Resultado: {resultado[:100]}...")
-            return jsonify({'content': resultado})
-        except wikipedia.exceptions.DisambiguationError as e:
-            resultado = wikipedia.summary(e.options[0], sentences=2)
+            # Resolvedor do idioma: sem estado global do módulo wikipedia
+            resolucao = obter_resolvedor(lang).resolver(busca, sentencas=2)
+            if resolucao is None:
+                return jsonify({'content': f'Página não encontrada para "{busca}"'})
+            resultado = resolucao['texto']
+            if VERBOSO:
+                print(f"✅ Resultado ({resolucao['origem']}): {resultado[:100]}...")
             return jsonify({'content': resultado})
-        except wikipedia.exceptions.PageError:
-            return jsonify({'content': f'Página não encontrada para "{busca}"'})
         except Exception as wiki_error:
             print(f"❌ Erro Wikipedia: {wiki_error}")
             return jsonify({'content': f'Erro na Wikipedia: {str(wiki_error)}'})
@@ -0,0 +1,44 @@
+import json
+import re
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+# Modo streaming do /tools/buscar_wikipedia: um objeto JSON por linha (NDJSON)
+CONTENT_TYPE_NDJSON = "application/x-ndjson"
+
+# Cada trecho vai até o fim de uma sentença, incluindo o espaço que a segue,
+# de modo que juntar os trechos reconstrói o texto original
+_PADRAO_TRECHO = re.compile(r"[^.!?]*(?:[.!?]+|$)\s*")
+
+
+def quer_stream(data: Mapping[str, Any], accept: str) -> bool:
+    """O cliente pede streaming com "stream": true no corpo ou com Accept: application/x-ndjson"""
+    return bool(data.get("stream")) or CONTENT_TYPE_NDJSON in accept
+
+
+def linha_ndjson(evento: Dict[str, Any]) -> str:
+    return json.dumps(evento, ensure_ascii=False) + "\n"
+
+
+def trechos(texto: str) -> Iterator[str]:
+    for trecho in _PADRAO_TRECHO.findall(texto):
+        if trecho:
+            yield trecho
+
+
+def evento_titulo(titulo: Optional[str]) -> Dict[str, Any]:
+    return {"tipo": "titulo", "titulo": titulo}
+
+
+def evento_erro(mensagem: str) -> Dict[str, Any]:
+    return {"tipo": "erro", "mensagem": mensagem}
+
+
+def eventos_resumo(
+    detalhes: Dict[str, Any], idioma: str, cache: bool, titulo_enviado: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Eventos de um resumo já buscado: título (se ainda não foi enviado), trechos e metadados finais"""
+    if not titulo_enviado:
+        yield evento_titulo(detalhes["titulo"])
+    for trecho in trechos(detalhes["texto"]):
+        yield {"tipo": "conteudo", "texto": trecho}
+    yield {"tipo": "fim", "titulo": detalhes["titulo"], "origem": detalhes["origem"], "lang": idioma, "cache": cache}
@@ -0,0 +1,237 @@
+"""Substitutos locais da API da Wikipedia e da API de chat da OpenAI, com latência
+e taxa de erros configuráveis, para medir o desempenho sem rede (ver benchmark.py).
+
+Uso:
+    python stubs_locais.py --latencia-wikipedia 0.05 --erros-wikipedia 0.01
+    MCP_WIKIPEDIA_API_URL=http://127.0.0.1:8030/w/api.php python servidor.py
+    OPENAI_BASE_URL=http://127.0.0.1:8020/v1 OPENAI_API_KEY=stub python benchmark.py pipeline
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+# Artigos fixos, para os exemplos do app e os casos especiais da API
+ARTIGOS_FIXOS = {
+    "Python": "Python é uma linguagem de programação de alto nível.",
+    "Diego Maradona": "Diego Maradona foi um futebolista argentino.",
+    "Inteligência artificial": "Inteligência artificial é a inteligência demonstrada por máquinas.",
+    "Brasil": "O Brasil é o maior país da América do Sul.",
+    "Mercúrio (planeta)": "Mercúrio é o menor planeta do Sistema Solar.",
+    "Mercúrio (elemento químico)": "O mercúrio é um elemento químico de símbolo Hg.",
+}
+REDIRECIONAMENTOS = {"Maradona": "Diego Maradona", "IA": "Inteligência artificial"}
+DESAMBIGUACOES = {"Mercúrio": ["Mercúrio (planeta)", "Mercúrio (elemento químico)"]}
+
+_PALAVRAS = (
+    "história sistema desenvolvimento estudo região processo século forma teoria grupo "
+    "estrutura período cultura modelo população economia técnica obra espécie método"
+).split()
+
+
+@dataclass
+class Perfil:
+    """Latência e taxa de erros de um stub: latencia + cauda exponencial de média `cauda`"""
+
+    latencia: float = 0.05
+    cauda: float = 0.0
+    erros: float = 0.0
+
+    async def esperar(self) -> None:
+        atraso = self.latencia + (random.expovariate(1 / self.cauda) if self.cauda > 0 else 0.0)
+        if atraso > 0:
+            await asyncio.sleep(atraso)
+
+    def falhar(self) -> bool:
+        return random.random() < self.erros
+
+
+def titulo_sintetico(n: int) -> str:
+    return f"Artigo {n}"
+
+
+def _sentencas(titulo: str, quantidade: int) -> List[str]:
+    # Determinístico por título: o mesmo artigo tem sempre o mesmo texto
+    sorteio = random.Random(titulo)
+    return [
+        f"{titulo} tem relação com {' '.join(sorteio.choices(_PALAVRAS, k=8))}."
+        for _ in range(quantidade)
+    ]
+
+
+def texto_artigo(titulo: str, completo: bool, sentencas: Optional[int]) -> str:
+    """Introdução (as primeiras `sentencas`) ou, com completo, o artigo com seções"""
+    introducao = [ARTIGOS_FIXOS[titulo]] if titulo in ARTIGOS_FIXOS else []
+    introducao += _sentencas(titulo, 6)
+    if not completo:
+        return " ".join(introducao[:sentencas] if sentencas else introducao)
+    partes = [" ".join(introducao)]
+    for secao in ("História", "Características", "Ver também"):
+        partes.append(f"\n\n== {secao} ==\n" + " ".join(_sentencas(titulo + secao, 25)))
+    return "".join(partes)
+
+
+class StubWikipedia:
+    """API de consulta (action=query) da Wikipedia com artigos sintéticos"""
+
+    def __init__(self, perfil: Perfil, artigos: int = 10000):
+        self.perfil = perfil
+        self.titulos = list(ARTIGOS_FIXOS) + [titulo_sintetico(n) for n in range(artigos)]
+        self._existentes = set(self.titulos)
+        self.chamadas = 0
+
+    def _pagina(self, titulo: str, consulta: Dict[str, str], indice: int = 0) -> Dict:
+        if titulo in DESAMBIGUACOES:
+            return {"title": titulo, "index": indice, "pageprops": {"disambiguation": ""},
+                    "extract": f"{titulo} pode referir-se a:"}
+        if titulo not in self._existentes:
+            return {"title": titulo, "missing": True}
+        completo = "exintro" not in consulta
+        sentencas = int(consulta["exsentences"]) if "exsentences" in consulta else None
+        return {"title": titulo, "index": indice, "extract": texto_artigo(titulo, completo, sentencas)}
+
+    def _buscar(self, termo: str, limite: int) -> List[str]:
+        termo = termo.casefold()
+        achados = [t for t in self.titulos if termo in t.casefold()]
+        return achados[:limite]
+
+    async def api(self, requisicao: web.Request) -> web.Response:
+        self.chamadas += 1
+        await self.perfil.esperar()
+        if self.perfil.falhar():
+            return web.json_response({"error": "stub: falha simulada"}, status=503)
+        consulta = requisicao.query
+        if "titles" in consulta:
+            titulo = consulta["titles"]
+            resultado: Dict = {}
+            if titulo in REDIRECIONAMENTOS and "redirects" in consulta:
+                resultado["redirects"] = [{"from": titulo, "to": REDIRECIONAMENTOS[titulo]}]
+                titulo = REDIRECIONAMENTOS[titulo]
+            resultado["pages"] = [self._pagina(titulo, consulta)]
+            return web.json_response({"query": resultado})
+        if consulta.get("generator") == "search":
+            titulos = self._buscar(consulta.get("gsrsearch", ""), int(consulta.get("gsrlimit", 10)))
+            if not titulos:
+                return web.json_response({"batchcomplete": True})
+            paginas = [self._pagina(t, consulta, i + 1) for i, t in enumerate(titulos)]
+            return web.json_response({"query": {"pages": paginas}})
+        return web.json_response({"batchcomplete": True})
+
+
+class StubOpenAI:
+    """POST /v1/chat/completions com e sem stream, gerando `tokens` pedaços de texto"""
+
+    def __init__(self, perfil: Perfil, tokens: int = 50, intervalo_token: float = 0.01):
+        self.perfil = perfil
+        self.tokens = tokens
+        self.intervalo_token = intervalo_token
+        self.chamadas = 0
+
+    def _pedaco(self, corpo: Dict, conteudo: Optional[str], fim: Optional[str] = None) -> Dict:
+        delta = {"content": conteudo} if conteudo is not None else {}
+        return {
+            "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": corpo.get("model", "stub"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": fim}],
+        }
+
+    async def completions(self, requisicao: web.Request) -> web.StreamResponse:
+        self.chamadas += 1
+        corpo = await requisicao.json()
+        # Latência até o primeiro token
+        await self.perfil.esperar()
+        if self.perfil.falhar():
+            return web.json_response({"error": {"message": "stub: falha simulada", "type": "server_error"}}, status=500)
+        palavras = [f" palavra{i}" for i in range(self.tokens)]
+
+        if not corpo.get("stream"):
+            await asyncio.sleep(self.intervalo_token * self.tokens)
+            return web.json_response({
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                "model": corpo.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(palavras)}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": self.tokens, "total_tokens": self.tokens},
+            })
+
+        resposta = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resposta.prepare(requisicao)
+        for palavra in palavras:
+            await resposta.write(f"data: {json.dumps(self._pedaco(corpo, palavra))}\n\n".encode())
+            if self.intervalo_token > 0:
+                await asyncio.sleep(self.intervalo_token)
+        await resposta.write(f"data: {json.dumps(self._pedaco(corpo, None, 'stop'))}\n\n".encode())
+        await resposta.write(b"data: [DONE]\n\n")
+        return resposta
+
+
+def criar_app_wikipedia(stub: StubWikipedia) -> web.Application:
+    app = web.Application()
+    app.router.add_get("/w/api.php", stub.api)
+    return app
+
+
+def criar_app_openai(stub: StubOpenAI) -> web.Application:
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", stub.completions)
+    return app
+
+
+async def iniciar_stubs(
+    wikipedia: StubWikipedia, openai: StubOpenAI, host: str = "127.0.0.1",
+    porta_wikipedia: int = 8030, porta_openai: int = 8020,
+) -> List[web.AppRunner]:
+    """Sobe os dois stubs no event loop atual; encerre com `await runner.cleanup()`"""
+    runners = []
+    for app, porta in ((criar_app_wikipedia(wikipedia), porta_wikipedia), (criar_app_openai(openai), porta_openai)):
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, porta).start()
+        runners.append(runner)
+    return runners
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stubs locais da Wikipedia e da OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta-wikipedia", type=int, default=8030)
+    parser.add_argument("--porta-openai", type=int, default=8020)
+    parser.add_argument("--artigos", type=int, default=10000, help="artigos sintéticos (Artigo 0, Artigo 1, ...)")
+    parser.add_argument("--latencia-wikipedia", type=float, default=0.05, help="segundos por chamada")
+    parser.add_argument("--cauda-wikipedia", type=float, default=0.0, help="média da cauda exponencial (s)")
+    parser.add_argument("--erros-wikipedia", type=float, default=0.0, help="fração de respostas 503")
+    parser.add_argument("--latencia-llm", type=float, default=0.3, help="segundos até o primeiro token")
+    parser.add_argument("--cauda-llm", type=float, default=0.0)
+    parser.add_argument("--erros-llm", type=float, default=0.0, help="fração de respostas 500")
+    parser.add_argument("--tokens-llm", type=int, default=50)
+    parser.add_argument("--intervalo-token", type=float, default=0.01, help="segundos entre tokens")
+    args = parser.parse_args(argv)
+
+    wikipedia = StubWikipedia(Perfil(args.latencia_wikipedia, args.cauda_wikipedia, args.erros_wikipedia), args.artigos)
+    openai = StubOpenAI(Perfil(args.latencia_llm, args.cauda_llm, args.erros_llm), args.tokens_llm, args.intervalo_token)
+
+    async def rodar():
+        runners = await iniciar_stubs(wikipedia, openai, args.host, args.porta_wikipedia, args.porta_openai)
+        print(f"🧪 Wikipedia: http://{args.host}:{args.porta_wikipedia}/w/api.php")
+        print(f"🧪 OpenAI:    http://{args.host}:{args.porta_openai}/v1")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+
+    try:
+        asyncio.run(rodar())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import gzip
+import os
+import threading
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Índice de títulos para corrigir erros de digitação sem ir à Wikipedia
+SUGESTAO = os.getenv("MCP_SUGESTAO", "1") != "0"
+# Lista de títulos por idioma, como o all-titles-in-ns0.gz dos dumps ("{idioma}" é substituído)
+ARQUIVO_TITULOS = os.getenv("MCP_SUGESTAO_TITULOS")
+# Similaridade mínima para trocar o termo pelo título sem perguntar, e para sugerir
+LIMIAR_CORRECAO = float(os.getenv("MCP_SUGESTAO_LIMIAR_CORRECAO", "0.8"))
+LIMIAR_SUGESTAO = float(os.getenv("MCP_SUGESTAO_LIMIAR", "0.6"))
+# Títulos aprendidos com as buscas mantidos no índice (os mais recentes), como a tabela do resolvedor
+MAX_APRENDIDOS = int(os.getenv("MCP_SUGESTAO_MAX_APRENDIDOS", "50000"))
+
+# Candidatos pré-selecionados pelos trigramas raros antes da pontuação exata
+_MAX_CANDIDATOS = 16
+
+
+def normalizar_titulo(texto: str) -> str:
+    """Minúsculas, sem acentos e com espaços no lugar de sublinhados"""
+    decomposto = unicodedata.normalize("NFKD", texto.replace("_", " ").casefold())
+    return " ".join("".join(c for c in decomposto if not unicodedata.combining(c)).split())
+
+
+def trigramas(texto_normalizado: str) -> Set[str]:
+    preenchido = f"  {texto_normalizado} "
+    return {preenchido[i:i + 3] for i in range(len(preenchido) - 2)}
+
+
+def similaridade(a: str, b: str) -> float:
+    """Semelhança (0 a 1) entre dois textos normalizados, tolerante a letras trocadas"""
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+class IndiceTrigramas:
+    """Índice de títulos por trigramas de caracteres, para sugestões tolerantes a erros.
+
+    Cada trigrama aponta para um array('I') com os ids dos títulos que o contêm;
+    a consulta junta as listas dos trigramas mais raros do termo com NumPy e
+    compara com o termo só os títulos que mais compartilham trigramas com ele.
+
+    Os títulos carregados em bloco (adicionar_varios) ficam para sempre; os aprendidos
+    um a um durante as buscas (adicionar) ficam numa LRU de até `max_aprendidos`.
+    """
+
+    def __init__(self, max_aprendidos: int = MAX_APRENDIDOS):
+        self._titulos: List[str] = []
+        self._por_normalizado: Dict[str, int] = {}
+        self._postagens: Dict[str, array] = {}
+        self.max_aprendidos = max_aprendidos
+        self._aprendidos: "OrderedDict[str, str]" = OrderedDict()
+        self._postagens_aprendidos: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._titulos) + len(self._aprendidos)
+
+    def _adicionar(self, titulo: str) -> None:
+        normalizado = normalizar_titulo(titulo)
+        if not normalizado or normalizado in self._por_normalizado:
+            return
+        self._esquecer(normalizado)
+        id_titulo = len(self._titulos)
+        self._titulos.append(titulo)
+        self._por_normalizado[normalizado] = id_titulo
+        for trigrama in trigramas(normalizado):
+            postagens = self._postagens.get(trigrama)
+            if postagens is None:
+                postagens = self._postagens[trigrama] = array("I")
+            postagens.append(id_titulo)
+
+    def _esquecer(self, normalizado: str) -> None:
+        """Tira um título da LRU de aprendidos, se estiver nela"""
+        titulo = self._aprendidos.pop(normalizado, None)
+        if titulo is None:
+            return
+        for trigrama in trigramas(normalizado):
+            postagens = self._postagens_aprendidos[trigrama]
+            postagens.discard(titulo)
+            if not postagens:
+                del self._postagens_aprendidos[trigrama]
+
+    def adicionar(self, titulo: str) -> None:
+        normalizado = normalizar_titulo(titulo)
+        if not normalizado or normalizado in self._por_normalizado or self.max_aprendidos <= 0:
+            return
+        with self._lock:
+            if normalizado in self._aprendidos:
+                self._aprendidos.move_to_end(normalizado)
+                return
+            self._aprendidos[normalizado] = titulo
+            for trigrama in trigramas(normalizado):
+                self._postagens_aprendidos.setdefault(trigrama, set()).add(titulo)
+            while len(self._aprendidos) > self.max_aprendidos:
+                self._esquecer(next(iter(self._aprendidos)))
+
+    def adicionar_varios(self, titulos: Iterable[str]) -> int:
+        antes = len(self._titulos)
+        with self._lock:
+            for titulo in titulos:
+                self._adicionar(titulo)
+        return len(self._titulos) - antes
+
+    def contem(self, termo: str) -> bool:
+        normalizado = normalizar_titulo(termo)
+        return normalizado in self._por_normalizado or normalizado in self._aprendidos
+
+    def sugerir(self, termo: str, limite: int = 3, minimo: float = LIMIAR_SUGESTAO) -> List[Tuple[str, float]]:
+        """Títulos mais parecidos com o termo, com a similaridade (0 a 1), do melhor para o pior"""
+        normalizado = normalizar_titulo(termo)
+        consulta = trigramas(normalizado)
+        # Sob o lock só a cópia das listas; a contagem com NumPy é feita fora dele
+        with self._lock:
+            listas = [self._postagens[t] for t in consulta if t in self._postagens]
+            # Trigramas muito comuns (" de", "ão ") pouco distinguem e custam caro: ficam de fora
+            listas.sort(key=len)
+            teto = max(1000, len(self._titulos) // 20)
+            raras = [p.tobytes() for p in ([p for p in listas if len(p) <= teto] or listas[:1])]
+            aprendidos = [list(self._postagens_aprendidos[t]) for t in consulta if t in self._postagens_aprendidos]
+
+        titulos: List[str] = []
+        if raras:
+            candidatos = np.concatenate([np.frombuffer(p, dtype=np.uint32) for p in raras])
+            ids, contagens = np.unique(candidatos, return_counts=True)
+            melhores = ids[np.argsort(-contagens, kind="stable")[:_MAX_CANDIDATOS]]
+            # A lista de títulos só cresce: os ids copiados continuam válidos
+            titulos = [self._titulos[i] for i in melhores.tolist()]
+        if aprendidos:
+            contagem = Counter(titulo for lista in aprendidos for titulo in lista)
+            titulos += [titulo for titulo, _ in contagem.most_common(_MAX_CANDIDATOS)]
+
+        pontuados = [(titulo, similaridade(normalizado, normalizar_titulo(titulo))) for titulo in titulos]
+        pontuados = [(titulo, nota) for titulo, nota in pontuados if nota >= minimo]
+        pontuados.sort(key=lambda item: -item[1])
+        return pontuados[:limite]
+
+    def corrigir(self, termo: str, minimo: float = LIMIAR_CORRECAO) -> Optional[str]:
+        """Título que provavelmente corresponde a um termo digitado errado, ou None se o
+        termo já é um título conhecido ou nada é parecido o bastante"""
+        if self.contem(termo):
+            return None
+        sugestoes = self.sugerir(termo, limite=1, minimo=minimo)
+        return sugestoes[0][0] if sugestoes else None
+
+
+def ler_titulos(caminho: str) -> Iterator[str]:
+    """Lê uma lista de títulos, um por linha (texto puro ou .gz), como all-titles-in-ns0"""
+    abrir = gzip.open if caminho.endswith(".gz") else open
+    with abrir(caminho, "rt", encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            titulo = linha.rstrip("\n").replace("_", " ").strip()
+            if titulo and titulo != "page title":
+                yield titulo
+
+
+def criar_indice_sugestao(idioma: str, indice_local=None) -> Optional[IndiceTrigramas]:
+    """Índice do idioma com os títulos de MCP_SUGESTAO_TITULOS e do índice local, se houver;
+    None com MCP_SUGESTAO=0. Os títulos resolvidos depois são acrescentados pelo resolvedor."""
+    if not SUGESTAO:
+        return None
+    indice = IndiceTrigramas()
+    if ARQUIVO_TITULOS:
+        caminho = ARQUIVO_TITULOS.format(idioma=idioma)
+        if os.path.exists(caminho):
+            indice.adicionar_varios(ler_titulos(caminho))
+    if indice_local is not None:
+        indice.adicionar_varios(indice_local.titulos(idioma))
+    return indice
@@ -0,0 +1,131 @@
+"""Mede quanto cada módulo custa para importar, com `python -X importtime` num processo
+novo (como num cold start), com e sem as importações adiadas (MCP_IMPORTACAO_PREGUICOSA).
+
+Uso:
+    python tempo_importacao.py                          # servidor, cliente, interface e app
+    python tempo_importacao.py cliente --top 20
+    python tempo_importacao.py app --modo ambos         # compara com as importações imediatas
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+MODULOS_PADRAO = ["servidor", "servidor_async", "cliente", "interface", "app"]
+MODOS = {"preguicoso": "1", "imediato": "0"}
+
+_LINHA = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+class Importacao(NamedTuple):
+    modulo: str
+    nivel: int
+    proprio_us: int
+    acumulado_us: int
+
+
+class Medicao(NamedTuple):
+    modulo: str
+    modo: str
+    total_s: float
+    importacoes: List[Importacao]
+    erro: str
+
+
+def ler_importtime(saida: str) -> List[Importacao]:
+    """Linhas do -X importtime (a indentação do nome indica quem importou quem)"""
+    importacoes = []
+    for linha in saida.splitlines():
+        achado = _LINHA.match(linha)
+        if achado:
+            proprio, acumulado, recuo, nome = achado.groups()
+            importacoes.append(Importacao(nome, (len(recuo) - 1) // 2, int(proprio), int(acumulado)))
+    return importacoes
+
+
+def medir(modulo: str, modo: str = "preguicoso") -> Medicao:
+    """Importa `modulo` num interpretador novo e devolve o tempo total e o de cada importação"""
+    ambiente = dict(os.environ, MCP_IMPORTACAO_PREGUICOSA=MODOS[modo])
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True, text=True, env=ambiente,
+    )
+    total = time.perf_counter() - inicio
+    erro = ""
+    if processo.returncode != 0:
+        erro = processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else f"código {processo.returncode}"
+    importacoes = ler_importtime(processo.stderr)
+    # Se a importação falhou no meio, mostra tudo o que chegou a ser importado
+    return Medicao(modulo, modo, total, subarvore(importacoes, modulo) or importacoes, erro)
+
+
+def subarvore(importacoes: List[Importacao], modulo: str) -> List[Importacao]:
+    """Só o que `modulo` importou, sem a inicialização do interpretador (site, encodings):
+    os filhos aparecem antes do pai, mais indentados"""
+    for fim in range(len(importacoes) - 1, -1, -1):
+        if importacoes[fim].nivel == 0 and importacoes[fim].modulo == modulo:
+            break
+    else:
+        return []
+    inicio = fim
+    while inicio > 0 and importacoes[inicio - 1].nivel > 0:
+        inicio -= 1
+    return [i._replace(nivel=i.nivel - 1) for i in importacoes[inicio:fim]]
+
+
+def por_pacote(importacoes: List[Importacao]) -> Dict[str, int]:
+    """Tempo próprio somado por pacote de primeiro nível (openai, aiohttp, numpy...)"""
+    soma: Dict[str, int] = defaultdict(int)
+    for importacao in importacoes:
+        soma[importacao.modulo.split(".")[0]] += importacao.proprio_us
+    return dict(sorted(soma.items(), key=lambda item: item[1], reverse=True))
+
+
+def _ms(microssegundos: float) -> str:
+    return f"{microssegundos / 1000:8.1f} ms"
+
+
+def imprimir(medicao: Medicao, top: int) -> None:
+    importado = sum(i.proprio_us for i in medicao.importacoes)
+    print(f"📦 {medicao.modulo} ({medicao.modo}): {medicao.total_s * 1000:.0f} ms no processo, "
+          f"{importado / 1000:.0f} ms importando {len(medicao.importacoes)} módulos")
+    if medicao.erro:
+        print(f"   ⚠️ {medicao.erro}")
+    print("   por pacote (tempo próprio):")
+    for pacote, us in list(por_pacote(medicao.importacoes).items())[:top]:
+        print(f"     {_ms(us)}  {pacote}")
+    print("   importações diretas (acumulado):")
+    diretas = [i for i in medicao.importacoes if i.nivel == 0]
+    for importacao in sorted(diretas, key=lambda i: i.acumulado_us, reverse=True)[:top]:
+        print(f"     {_ms(importacao.acumulado_us)}  {importacao.modulo}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Custo de importação de cada módulo")
+    parser.add_argument("modulos", nargs="*", default=MODULOS_PADRAO)
+    parser.add_argument("--modo", choices=[*MODOS, "ambos"], default="preguicoso",
+                        help="com importações adiadas, imediatas ou as duas")
+    parser.add_argument("--top", type=int, default=10, help="linhas por lista")
+    args = parser.parse_args(argv)
+
+    modos = list(MODOS) if args.modo == "ambos" else [args.modo]
+    falhas = 0
+    for modulo in args.modulos:
+        medicoes = [medir(modulo, modo) for modo in modos]
+        for medicao in medicoes:
+            imprimir(medicao, args.top)
+            falhas += bool(medicao.erro)
+        if len(medicoes) == 2:
+            preguicoso, imediato = medicoes
+            print(f"   ⏱️ importações adiadas economizam {(imediato.total_s - preguicoso.total_s) * 1000:.0f} ms")
+        print()
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
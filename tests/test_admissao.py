@@ -0,0 +1,79 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from admissao import ControleAdmissao, ControleAdmissaoAsync, Sobrecarga
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _limites_no_gunicorn(**ambiente):
+    """MCP_ADMISSAO_LIMITE e MCP_ADMISSAO_FILA depois de carregar o gunicorn.conf.py"""
+    ambiente = {k: v for k, v in os.environ.items() if not k.startswith("MCP_ADMISSAO_")} | ambiente
+    codigo = (
+        "import json, os, runpy; runpy.run_path('gunicorn.conf.py'); "
+        "print(json.dumps([os.environ['MCP_ADMISSAO_LIMITE'], os.environ['MCP_ADMISSAO_FILA']]))"
+    )
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, env=ambiente, capture_output=True, text=True, check=True)
+    return [int(v) for v in json.loads(saida.stdout.splitlines()[-1])]
+
+
+def test_admissao_cabe_nas_threads_do_gunicorn():
+    assert _limites_no_gunicorn(MCP_WORKERS="1", MCP_THREADS_POR_WORKER="16") == [12, 2]
+    # Um limite maior que as threads nunca seria atingido: fica uma thread livre para o 429
+    assert _limites_no_gunicorn(MCP_WORKERS="1", MCP_THREADS_POR_WORKER="16", MCP_ADMISSAO_LIMITE="64") == [15, 0]
+
+
+def test_admissao_async_respeita_a_ordem_da_fila():
+    async def cenario():
+        admissao = ControleAdmissaoAsync(limite=1, fila=4, espera=0.1)
+        await admissao.entrar()
+        admitidas = []
+
+        async def pedir(nome):
+            await admissao.entrar()
+            admitidas.append(nome)
+
+        primeira = asyncio.create_task(pedir("primeira da fila"))
+        await asyncio.sleep(0.01)
+        assert admissao.aguardando == 1
+        await admissao.sair()
+        # A vaga liberada é da primeira da fila: quem chega agora vai para o fim dela
+        # (e, com a vaga ocupada até o fim do teste, desiste por tempo)
+        with pytest.raises(Sobrecarga):
+            await admissao.entrar()
+        await primeira
+        assert admitidas == ["primeira da fila"]
+        assert admissao.aguardando == 0
+
+    asyncio.run(cenario())
+
+
+def test_admissao_atende_a_fila_em_ordem():
+    admissao = ControleAdmissao(limite=1, fila=8, espera=2)
+    admissao.entrar()
+    admitidas = []
+
+    def pedir(n):
+        admissao.entrar()
+        admitidas.append(n)
+        admissao.sair()
+
+    threads = []
+    for n in range(5):
+        threads.append(threading.Thread(target=pedir, args=(n,)))
+        threads[-1].start()
+        while admissao.aguardando < n + 1:
+            time.sleep(0.001)
+    admissao.sair()
+    for thread in threads:
+        thread.join()
+
+    assert admitidas == [0, 1, 2, 3, 4]
+    assert admissao.em_execucao == 0
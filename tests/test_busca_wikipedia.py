@@ -0,0 +1,75 @@
+import pytest
+
+import busca_wikipedia
+from cache import CacheResumos, TIPO_OK
+from indice_local import IndiceLocal
+
+WIKITEXTO_PYTHON = (
+    "'''Python''' é uma linguagem de programação. Foi criada por Guido van Rossum. "
+    "É usada em ciência de dados. Tem tipagem dinâmica.\n"
+    "== História ==\nA primeira versão saiu em 1991."
+)
+ARTIGO_COMPLETO = "Python é uma linguagem de programação. (...) A primeira versão saiu em 1991."
+
+
+@pytest.fixture
+def indice(tmp_path, monkeypatch):
+    """Índice local com o artigo Python, na frente de uma API falsa que registra as chamadas"""
+    indice = IndiceLocal(str(tmp_path / "indice.sqlite3"))
+    indice.ingerir(iter([{"id": "1", "titulo": "Python", "texto": WIKITEXTO_PYTHON}]), "pt", "teste")
+    chamadas_api = []
+
+    def api_falsa(busca, idioma, sentencas):
+        chamadas_api.append((busca, sentencas))
+        return {"titulo": "Python", "texto": ARTIGO_COMPLETO, "origem": "direto"}, TIPO_OK
+
+    monkeypatch.setattr(busca_wikipedia, "indice_local", indice)
+    monkeypatch.setattr(busca_wikipedia, "cache_resumos", CacheResumos())
+    monkeypatch.setattr(busca_wikipedia, "backends", [busca_wikipedia._buscar_no_indice_local, api_falsa])
+    return chamadas_api
+
+
+def test_artigo_completo_nao_vem_da_introducao_do_indice_local(indice):
+    detalhes = busca_wikipedia.buscar_detalhes("Python", "pt", None)
+
+    assert detalhes["texto"] == ARTIGO_COMPLETO
+    assert indice == [("Python", None)]
+    assert busca_wikipedia.consultar_cache("Python", "pt", None)["texto"] == ARTIGO_COMPLETO
+
+
+def test_artigo_completo_sem_api_usa_a_introducao_inteira(indice, monkeypatch):
+    monkeypatch.setattr(busca_wikipedia, "FALLBACK_API", False)
+
+    detalhes = busca_wikipedia.buscar_detalhes("Python", "pt", None)
+
+    assert detalhes["origem"] == busca_wikipedia.ORIGEM_INDICE_LOCAL
+    assert detalhes["texto"].endswith("Tem tipagem dinâmica.")
+    assert indice == []
+
+
+def test_indice_local_responde_antes_da_api(indice):
+    detalhes = busca_wikipedia.buscar_detalhes("python", "pt", 2)
+
+    assert detalhes == {
+        "titulo": "Python",
+        "texto": "Python é uma linguagem de programação. Foi criada por Guido van Rossum.",
+        "origem": busca_wikipedia.ORIGEM_INDICE_LOCAL,
+    }
+    assert indice == []
+
+
+def test_termo_fora_do_indice_vai_para_a_api(indice):
+    busca_wikipedia.buscar_detalhes("Java", "pt", 3)
+
+    assert indice == [("Java", 3)]
+
+
+def test_sem_fallback_termo_fora_do_indice_nao_e_encontrado(indice, monkeypatch):
+    monkeypatch.setattr(busca_wikipedia, "FALLBACK_API", False)
+    monkeypatch.setattr(busca_wikipedia, "backends", [busca_wikipedia._buscar_no_indice_local])
+    monkeypatch.setattr(busca_wikipedia, "obter_sugestoes", lambda idioma: None)
+
+    detalhes = busca_wikipedia.buscar_detalhes("Java", "pt", 3)
+
+    assert detalhes["origem"] == busca_wikipedia.ORIGEM_NAO_ENCONTRADO
+    assert detalhes["texto"] == 'Não foi encontrada informação sobre "Java" na Wikipedia.'
@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+
+from cache import TIPO_NAO_ENCONTRADO, TIPO_OK, CacheEmCamadas, CacheResumos, VERSAO_FORMATO
+from cache_persistente import CacheSQLite, gerar_chave
+
+
+def test_lru_remove_o_menos_usado():
+    cache = CacheResumos(max_itens=2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obter("a") == (TIPO_OK, 1)
+    cache.guardar("c", 3)
+
+    assert cache.obter("b") is None
+    assert cache.obter("a") == (TIPO_OK, 1) and cache.obter("c") == (TIPO_OK, 3)
+    assert cache.estatisticas()["remocoes"] == 1
+
+
+def test_ttl_por_tipo_de_entrada():
+    cache = CacheResumos(ttl=60, ttl_nao_encontrado=0.05)
+    cache.guardar("python", "Python é uma linguagem.")
+    cache.guardar("xyzzy", "não encontrado", TIPO_NAO_ENCONTRADO)
+    time.sleep(0.06)
+
+    assert cache.obter("python") == (TIPO_OK, "Python é uma linguagem.")
+    assert cache.obter("xyzzy") is None
+    assert cache.estatisticas()["expiracoes"] == 1
+
+
+def test_cache_compartilhado_de_formato_anterior_e_ignorado(tmp_path):
+    chave = ("pt", "python", 3)
+    compartilhado = CacheSQLite(str(tmp_path / "cache.db"))
+    # Como um worker anterior guardava: só o texto, sem versão na chave
+    compartilhado.guardar(gerar_chave(*chave), json.dumps([TIPO_OK, "Python é uma linguagem."]))
+
+    cache = CacheEmCamadas(CacheResumos(), compartilhado)
+    assert cache.obter(chave) is None
+
+    detalhes = {"titulo": "Python", "texto": "Python é uma linguagem.", "origem": "direto"}
+    cache.guardar(chave, detalhes)
+    assert CacheEmCamadas(CacheResumos(), compartilhado).obter(chave) == (TIPO_OK, detalhes)
+    assert compartilhado.obter(gerar_chave(VERSAO_FORMATO, *chave)) is not None
+
+
+def test_acerto_compartilhado_herda_o_ttl_restante(tmp_path):
+    chave = ("pt", "python", 3)
+    compartilhado = CacheSQLite(str(tmp_path / "cache.db"))
+    detalhes = {"titulo": "Python", "texto": "Python é uma linguagem.", "origem": "direto"}
+    CacheEmCamadas(CacheResumos(ttl=3600), compartilhado).guardar(chave, detalhes)
+    # Outro worker encontra a entrada a 5 segundos de expirar no SQLite
+    compartilhado._conexao().execute("UPDATE cache SET expira = ?", (time.time() + 5,))
+
+    local = CacheResumos(ttl=3600)
+    assert CacheEmCamadas(local, compartilhado).obter(chave) == (TIPO_OK, detalhes)
+    expira_em, _, _ = local._itens[chave]
+    assert expira_em - time.monotonic() <= 5
+
+
+def test_acertos_compartilhados_contados_entre_threads(tmp_path):
+    chave = ("pt", "python", 3)
+    # Sem itens na memória, toda leitura vai ao SQLite
+    cache = CacheEmCamadas(CacheResumos(max_itens=0), CacheSQLite(str(tmp_path / "cache.db")))
+    cache.guardar(chave, {"titulo": "Python", "texto": "Python.", "origem": "direto"})
+
+    def ler():
+        for _ in range(50):
+            assert cache.obter(chave) is not None
+
+    threads = [threading.Thread(target=ler) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.estatisticas()["acertos_compartilhado"] == 400
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import cliente
+from cliente import ClienteMCP
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _com_servidor(respostas, cenario):
+    """Executa cenario(cliente, chamadas) contra um servidor que devolve as respostas em ordem"""
+    chamadas = []
+
+    async def tratar(request):
+        chamadas.append(request.path)
+        status, cabecalhos = respostas[min(len(chamadas), len(respostas)) - 1]
+        return web.json_response({"content": "ok"}, status=status, headers=cabecalhos)
+
+    async def executar():
+        app = web.Application()
+        app.router.add_post("/tools/{nome}", tratar)
+        servidor = TestServer(app)
+        await servidor.start_server()
+        try:
+            async with ClienteMCP(str(servidor.make_url("")).rstrip("/"), hedge=False) as cliente:
+                return await cenario(cliente, chamadas)
+        finally:
+            await servidor.close()
+
+    return asyncio.run(executar())
+
+
+def test_5xx_sem_repeticao_conta_como_falha_e_fica_fora_das_latencias():
+    async def cenario(cliente, chamadas):
+        resultado = await cliente.chamar_ferramenta("buscar_wikipedia", {"busca": "Python"})
+        return resultado, len(chamadas), cliente.disjuntor.falhas_seguidas, len(cliente.latencias._valores)
+
+    assert _com_servidor([(500, {})], cenario) == ("Erro na requisição: 500", 1, 1, 0)
+
+
+def test_4xx_nao_e_falha_nem_amostra_de_latencia():
+    async def cenario(cliente, chamadas):
+        cliente.disjuntor.registrar_falha()
+        resultado = await cliente.chamar_ferramenta("buscar_wikipedia", {"busca": "Python"})
+        return resultado, cliente.disjuntor.falhas_seguidas, len(cliente.latencias._valores)
+
+    assert _com_servidor([(404, {})], cenario) == ("Erro na requisição: 404", 0, 0)
+
+
+def test_429_respeita_o_retry_after():
+    async def cenario(cliente, chamadas):
+        resultado = await cliente.chamar_ferramenta("buscar_wikipedia", {"busca": "Python"})
+        return resultado, len(chamadas), len(cliente.latencias._valores)
+
+    # Retry-After curto: espera o pedido pelo servidor e repete
+    assert _com_servidor([(429, {"Retry-After": "0"}), (200, {})], cenario) == ("ok", 2, 1)
+    # Retry-After acima de MCP_CLIENTE_RETRY_AFTER_MAXIMO: desiste sem repetir
+    assert _com_servidor([(429, {"Retry-After": "3600"}), (200, {})], cenario) == ("Erro na requisição: 429", 1, 0)
+
+
+def test_importar_nao_cria_o_cache_llm(tmp_path):
+    ambiente = {k: v for k, v in os.environ.items() if not k.startswith("MCP_CACHE_LLM_")}
+    codigo = f"import sys; sys.path.insert(0, {RAIZ!r}); import cliente"
+    subprocess.run([sys.executable, "-c", codigo], cwd=tmp_path, env=ambiente, check=True)
+    assert not (tmp_path / ".cache").exists()
+
+
+class OpenAIFalso:
+    def __init__(self, **kwargs):
+        self.fechado_no_loop = None
+
+    async def close(self):
+        self.fechado_no_loop = asyncio.get_running_loop()
+
+
+def test_cliente_openai_de_outro_loop_e_fechado(monkeypatch):
+    monkeypatch.setattr(cliente, "openai", SimpleNamespace(AsyncOpenAI=OpenAIFalso))
+    monkeypatch.setattr(cliente, "_cliente_openai", None)
+    monkeypatch.setattr(cliente, "chave_openai", lambda: "teste")
+
+    async def obter():
+        return cliente.obter_cliente_openai(), asyncio.get_running_loop()
+
+    async def trocar_de_loop(antigo):
+        novo = cliente.obter_cliente_openai()
+        for _ in range(100):
+            if antigo.fechado_no_loop is not None:
+                break
+            await asyncio.sleep(0.01)
+        return novo
+
+    # Loop anterior já encerrado (outro asyncio.run): fecha no loop atual
+    antigo, _ = asyncio.run(obter())
+    novo = asyncio.run(trocar_de_loop(antigo))
+    assert novo is not antigo and antigo.fechado_no_loop is not None
+
+    # Loop anterior ainda rodando em outra thread: fecha nele
+    loop_thread = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop_thread.run_forever)
+    thread.start()
+    try:
+        antigo, _ = asyncio.run_coroutine_threadsafe(obter(), loop_thread).result()
+        asyncio.run(trocar_de_loop(antigo))
+        assert antigo.fechado_no_loop is loop_thread
+    finally:
+        loop_thread.call_soon_threadsafe(loop_thread.stop)
+        thread.join()
+        loop_thread.close()
+
+
+def test_cliente_fala_com_o_servidor_pelo_socket_unix(tmp_path):
+    caminho = str(tmp_path / "mcp.sock")
+    assert cliente.separar_url(f"unix://{caminho}") == ("http://localhost", caminho)
+
+    async def tratar(request):
+        return web.json_response({"content": f"via socket: {(await request.json())['busca']}"})
+
+    async def executar():
+        app = web.Application()
+        app.router.add_post("/tools/{nome}", tratar)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.UnixSite(runner, caminho).start()
+        try:
+            async with ClienteMCP(f"unix://{caminho}") as cli:
+                return await cli.chamar_ferramenta("buscar_wikipedia", {"busca": "Python"})
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(executar()) == "via socket: Python"
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from coalescencia import ChamadaUnica, ChamadaUnicaAsync
+
+
+def test_chamadas_simultaneas_compartilham_uma_execucao():
+    chamada = ChamadaUnica()
+    execucoes = []
+    liberar = threading.Event()
+
+    def buscar():
+        execucoes.append(1)
+        liberar.wait(1)
+        return "Python é uma linguagem."
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(chamada.executar("python", buscar))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Todas entram antes de a primeira terminar
+    while chamada.compartilhadas < 7:
+        time.sleep(0.001)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(execucoes) == 1
+    assert resultados == ["Python é uma linguagem."] * 8
+    assert chamada.em_andamento() == 0
+    # Terminada a chamada, a próxima executa de novo
+    assert chamada.executar("python", lambda: "de novo") == "de novo"
+
+
+def test_erro_do_lider_chega_a_quem_esperava():
+    chamada = ChamadaUnica()
+    entrou = threading.Event()
+    erros = []
+
+    def falhar():
+        entrou.set()
+        time.sleep(0.05)
+        raise RuntimeError("Wikipedia indisponível")
+
+    def seguidor():
+        entrou.wait(1)
+        try:
+            chamada.executar("python", lambda: "não executa")
+        except RuntimeError as e:
+            erros.append(str(e))
+
+    thread = threading.Thread(target=seguidor)
+    thread.start()
+    with pytest.raises(RuntimeError):
+        chamada.executar("python", falhar)
+    thread.join()
+
+    assert erros == ["Wikipedia indisponível"]
+
+
+def test_versao_async_sobrevive_ao_cancelamento_de_um_chamador():
+    async def cenario():
+        chamada = ChamadaUnicaAsync()
+        execucoes = []
+
+        async def buscar():
+            execucoes.append(1)
+            await asyncio.sleep(0.05)
+            return "Python é uma linguagem."
+
+        primeira = asyncio.ensure_future(chamada.executar("python", buscar))
+        segunda = asyncio.ensure_future(chamada.executar("python", buscar))
+        await asyncio.sleep(0.01)
+        primeira.cancel()
+        return await segunda, len(execucoes), chamada.em_andamento()
+
+    assert asyncio.run(cenario()) == ("Python é uma linguagem.", 1, 0)
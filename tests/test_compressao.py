@@ -0,0 +1,43 @@
+import pytest
+from werkzeug.datastructures import Accept, MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from compressao import CONTENT_TYPE_JSON, CONTENT_TYPE_MSGPACK, LIMIAR, codificar_resposta, decodificar
+
+GRANDE = {"content": "Python é uma linguagem de programação. " * (LIMIAR // 20)}
+
+
+def _codificar(objeto, accept, accept_encoding):
+    return codificar_resposta(
+        objeto, parse_accept_header(accept, MIMEAccept), parse_accept_header(accept_encoding, Accept)
+    )
+
+
+def test_json_com_gzip_acima_do_limiar():
+    corpo, content_type, cabecalhos = _codificar(GRANDE, "application/json", "gzip, deflate")
+
+    assert content_type == CONTENT_TYPE_JSON
+    assert cabecalhos["Content-Encoding"] == "gzip"
+    assert len(corpo) < len(GRANDE["content"])
+    assert decodificar(corpo, content_type, cabecalhos["Content-Encoding"]) == GRANDE
+
+
+def test_resposta_pequena_ou_sem_accept_encoding_vai_sem_compressao():
+    corpo, content_type, cabecalhos = _codificar({"content": "curto"}, "*/*", "gzip")
+    assert "Content-Encoding" not in cabecalhos and decodificar(corpo, content_type) == {"content": "curto"}
+
+    _, _, cabecalhos = _codificar(GRANDE, "*/*", "identity")
+    assert "Content-Encoding" not in cabecalhos
+
+
+def test_msgpack_com_zstd_quando_o_cliente_prefere():
+    pytest.importorskip("msgpack")
+    pytest.importorskip("zstandard")
+
+    corpo, content_type, cabecalhos = _codificar(
+        GRANDE, f"{CONTENT_TYPE_MSGPACK}, {CONTENT_TYPE_JSON};q=0.9", "zstd, gzip"
+    )
+
+    assert content_type == CONTENT_TYPE_MSGPACK
+    assert cabecalhos == {"Vary": "Accept, Accept-Encoding", "Content-Encoding": "zstd"}
+    assert decodificar(corpo, content_type, "zstd") == GRANDE
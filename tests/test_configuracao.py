@@ -0,0 +1,29 @@
+import sys
+import threading
+
+import pytest
+
+import configuracao
+
+
+def test_primeiro_acesso_simultaneo_ve_o_modulo_inteiro(monkeypatch):
+    if "wave" in sys.modules:
+        pytest.skip("wave já importado")
+    monkeypatch.setattr(configuracao, "IMPORTACAO_PREGUICOSA", True)
+    modulo = configuracao.importar_sob_demanda("wave")
+    assert "wave" not in sys.modules
+
+    inicio = threading.Barrier(8)
+    vistos = []
+
+    def acessar():
+        inicio.wait()
+        vistos.append(modulo.Wave_read)
+
+    threads = [threading.Thread(target=acessar) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert vistos == [sys.modules["wave"].Wave_read] * 8
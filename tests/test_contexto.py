@@ -0,0 +1,41 @@
+from contexto import dividir_passagens, empacotar, estimar_tokens, montar_contexto, pontuar_bm25
+
+ARTIGO = "\n".join([
+    "Python é uma linguagem de programação de alto nível.",
+    "== História ==",
+    "Guido van Rossum começou o Python em 1989. A primeira versão saiu em 1991.",
+    "== Bibliotecas ==",
+    "O NumPy oferece arrays e álgebra linear. O pandas trabalha com tabelas de dados.",
+    "== Comunidade ==",
+    "A PyCon reúne a comunidade todos os anos.",
+])
+
+
+def test_texto_que_cabe_no_orcamento_volta_inteiro():
+    assert montar_contexto(ARTIGO, "numpy", orcamento_tokens=10000) == ARTIGO
+
+
+def test_passagem_mais_relevante_entra_com_a_secao():
+    contexto = montar_contexto(ARTIGO, "arrays numpy", orcamento_tokens=25)
+
+    assert contexto == "== Bibliotecas ==\n\nO NumPy oferece arrays e álgebra linear. O pandas trabalha com tabelas de dados."
+
+
+def test_empacotamento_respeita_o_orcamento_e_a_ordem_do_artigo():
+    passagens = dividir_passagens(ARTIGO)
+    assert [secao for secao, _ in passagens] == ["", "História", "Bibliotecas", "Comunidade"]
+
+    pontuacoes = pontuar_bm25(passagens, "comunidade python 1991")
+    orcamento = estimar_tokens(passagens[1][1]) + estimar_tokens(passagens[3][1])
+    escolhidas = empacotar(passagens, pontuacoes, orcamento)
+
+    assert sum(estimar_tokens(texto) for _, texto in escolhidas) <= orcamento
+    assert escolhidas == [passagens[1], passagens[3]]
+
+
+def test_consulta_sem_termos_em_comum_mantem_o_inicio_do_artigo():
+    passagens = dividir_passagens(ARTIGO)
+    pontuacoes = pontuar_bm25(passagens, "xyzzy")
+
+    assert not pontuacoes.any()
+    assert empacotar(passagens, pontuacoes, estimar_tokens(passagens[0][1]))[0] == passagens[0]
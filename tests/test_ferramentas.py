@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import busca_wikipedia
+import ferramentas
+import jsonrpc
+from cache import TIPO_OK, CacheResumos
+
+
+def _chamar(nome, argumentos):
+    return jsonrpc.despachar({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": nome, "arguments": argumentos},
+    })
+
+
+def test_argumento_invalido_e_erro_de_parametros():
+    resposta = _chamar("buscar_wikipedia", {"busca": ""})
+    assert resposta["error"]["code"] == jsonrpc.PARAMETROS_INVALIDOS
+
+    resposta = _chamar("buscar_wikipedia", {"busca": "Python", "lang": "xx"})
+    assert resposta["error"]["code"] == jsonrpc.PARAMETROS_INVALIDOS
+
+
+def test_value_error_da_busca_vira_resultado_com_is_error(monkeypatch):
+    def falhar(*args, **kwargs):
+        # requests.JSONDecodeError, por exemplo, é um ValueError
+        raise json.JSONDecodeError("Expecting value", "", 0)
+
+    monkeypatch.setattr(ferramentas, "buscar_resumo", falhar)
+    resposta = _chamar("buscar_wikipedia", {"busca": "Python"})
+
+    assert "error" not in resposta
+    assert resposta["result"]["isError"] is True
+
+
+def test_lote_invalido_e_erro_de_parametros():
+    with pytest.raises(ValueError):
+        ferramentas.chamar("buscar_wikipedia_lote", {"buscas": []})
+
+
+def test_lote_preserva_a_ordem_e_isola_os_erros(monkeypatch):
+    def backend(busca, idioma, sentencas):
+        if busca == "Falha":
+            raise RuntimeError("Wikipedia indisponível")
+        return {"titulo": busca, "texto": f"Sobre {busca}.", "origem": "direto"}, TIPO_OK
+
+    monkeypatch.setattr(busca_wikipedia, "cache_resumos", CacheResumos())
+    monkeypatch.setattr(busca_wikipedia, "backends", [backend])
+
+    resultados = ferramentas.buscar_wikipedia_lote(["Python", "", "Falha", "Java"], paralelismo=2)
+
+    assert [r["busca"] for r in resultados] == ["Python", "", "Falha", "Java"]
+    assert resultados[0]["content"] == "Sobre Python." and resultados[3]["content"] == "Sobre Java."
+    assert resultados[1]["error"] == "Busca vazia ou inválida"
+    assert resultados[2]["error"] == "Erro ao buscar: Wikipedia indisponível"
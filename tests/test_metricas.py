@@ -0,0 +1,29 @@
+from metricas import Registro
+
+
+def test_contador_lido_de_funcao_e_exportado_como_counter():
+    registro = Registro()
+    total = {"valor": 3}
+    registro.contador("mcp_teste_total", "Teste", lambda: total["valor"])
+
+    total["valor"] = 5
+    texto = registro.renderizar()
+
+    assert "# TYPE mcp_teste_total counter" in texto
+    assert "mcp_teste_total 5" in texto
+
+
+def test_totais_do_servidor_sao_counters():
+    import busca_wikipedia  # noqa: F401 (registra as métricas do cache)
+    from metricas import registro
+
+    texto = registro.renderizar()
+    for nome in ("mcp_cache_acertos_total", "mcp_cache_falhas_total", "mcp_cache_remocoes_total"):
+        assert f"# TYPE {nome} counter" in texto
+
+
+def test_valores_de_rotulos_sao_escapados():
+    registro = Registro()
+    registro.contador("mcp_teste_total", "Teste").incrementar(rota='a\\b"c\nd')
+
+    assert 'mcp_teste_total{rota="a\\\\b\\"c\\nd"} 1' in registro.renderizar().splitlines()
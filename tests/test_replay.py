@@ -0,0 +1,30 @@
+import json
+from argparse import Namespace
+
+from captura import EscritorRotativo
+from replay import arquivos_captura, carregar_registros
+
+
+def _registro(ts, rota="/tools/buscar_wikipedia", busca="Python"):
+    return {"ts": ts, "rota": rota, "ferramenta": rota.rsplit("/", 1)[-1], "argumentos": {"busca": busca}, "status": 200}
+
+
+def test_registros_de_varios_arquivos_voltam_em_ordem_de_chegada(tmp_path):
+    # Dois workers, cada um rotacionando os próprios arquivos
+    pastas = [str(tmp_path / "worker1"), str(tmp_path / "worker2")]
+    for pasta, registros in zip(pastas, ([_registro(1.0), _registro(3.0, busca="Java")], [_registro(2.0, rota="/mcp"), _registro(4.0)])):
+        escritor = EscritorRotativo(pasta, max_bytes=200)
+        for registro in registros:
+            escritor.escrever(registro)
+        escritor.fechar()
+    # Só os arquivos da captura entram; linhas em branco são ignoradas
+    (tmp_path / "worker1" / "outro.jsonl").write_text(json.dumps(_registro(0.5)) + "\n", encoding="utf-8")
+    with open(arquivos_captura(pastas)[0], "a", encoding="utf-8") as arquivo:
+        arquivo.write("\n")
+
+    assert len(arquivos_captura(pastas)) == 4
+    args = Namespace(capturas=pastas, rotas=None, limite=0)
+    assert [r["ts"] for r in carregar_registros(args)] == [1.0, 2.0, 3.0, 4.0]
+
+    args = Namespace(capturas=pastas, rotas=["/tools/buscar_wikipedia"], limite=2)
+    assert [(r["ts"], r["argumentos"]["busca"]) for r in carregar_registros(args)] == [(1.0, "Python"), (3.0, "Java")]
@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from resolucao import ORIGEM_BUSCA, ORIGEM_DIRETO, ORIGEM_SUGESTAO, ResolvedorTitulos
+from sugestao import IndiceTrigramas
+
+
+class RespostaFalsa:
+    def __init__(self, dados):
+        self._dados = dados
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._dados
+
+
+class SessaoFalsa:
+    """Wikipedia de mentira: conta as chamadas e responde pelo título ou pela busca"""
+
+    def __init__(self, paginas, atraso=0.0):
+        self.paginas = paginas
+        self.atraso = atraso
+        self.chamadas = []
+        self.simultaneas = self.pico = 0
+        self._trava = threading.Lock()
+
+    def get(self, url, params, timeout):
+        with self._trava:
+            self.chamadas.append(dict(params))
+            self.simultaneas += 1
+            self.pico = max(self.pico, self.simultaneas)
+        time.sleep(self.atraso)
+        with self._trava:
+            self.simultaneas -= 1
+        if "titles" in params:
+            titulo = params["titles"]
+            if titulo in self.paginas:
+                pagina = {"title": titulo, "extract": self.paginas[titulo]}
+            else:
+                pagina = {"title": titulo, "missing": True}
+            return RespostaFalsa({"query": {"pages": [pagina]}})
+        achados = [t for t in self.paginas if params["gsrsearch"].lower() in t.lower()]
+        paginas = [{"title": t, "extract": self.paginas[t], "index": i} for i, t in enumerate(achados)]
+        return RespostaFalsa({"query": {"pages": paginas}})
+
+
+def test_acerto_direto_faz_uma_chamada():
+    sessao = SessaoFalsa({"Python": "Python é uma linguagem."})
+    resolvedor = ResolvedorTitulos("pt", sessao=sessao)
+
+    resultado = resolvedor.resolver("Python")
+
+    assert resultado == {"titulo": "Python", "texto": "Python é uma linguagem.", "origem": ORIGEM_DIRETO}
+    assert len(sessao.chamadas) == 1
+    assert "titles" in sessao.chamadas[0]
+
+
+def test_titulo_inexistente_recorre_a_busca():
+    sessao = SessaoFalsa({"Linguagem Python": "Python é uma linguagem."})
+    resolvedor = ResolvedorTitulos("pt", sessao=sessao)
+
+    resultado = resolvedor.resolver("python")
+
+    assert resultado["titulo"] == "Linguagem Python"
+    assert resultado["origem"] == ORIGEM_BUSCA
+    assert [("titles" in c, "gsrsearch" in c) for c in sessao.chamadas] == [(True, False), (False, True)]
+
+
+def test_consulta_exata_lenta_adianta_a_busca():
+    sessao = SessaoFalsa({"Linguagem Python": "Python é uma linguagem."}, atraso=0.2)
+    resolvedor = ResolvedorTitulos("pt", sessao=sessao, espera_busca=0.05)
+
+    inicio = time.perf_counter()
+    resultado = resolvedor.resolver("python")
+
+    assert resultado["titulo"] == "Linguagem Python"
+    assert len(sessao.chamadas) == 2
+    # As duas consultas correram juntas, não uma depois da outra
+    assert time.perf_counter() - inicio < 0.35
+
+
+def test_consultas_exatas_nao_passam_por_um_executor_limitado():
+    sessao = SessaoFalsa({f"Artigo {n}": "Texto." for n in range(64)}, atraso=0.2)
+    resolvedor = ResolvedorTitulos("pt", sessao=sessao)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=64) as requisicoes:
+        resultados = list(requisicoes.map(resolvedor.resolver, [f"Artigo {n}" for n in range(64)]))
+
+    assert all(r["origem"] == ORIGEM_DIRETO for r in resultados)
+    assert sessao.pico == 64
+    assert time.perf_counter() - inicio < 0.6
+
+
+def test_termo_parecido_com_titulo_consulta_a_correcao_junto():
+    sessao = SessaoFalsa({"Python": "Python é uma linguagem."}, atraso=0.2)
+    sugestoes = IndiceTrigramas()
+    sugestoes.adicionar("Python")
+    resolvedor = ResolvedorTitulos("pt", sessao=sessao, sugestoes=sugestoes)
+
+    inicio = time.perf_counter()
+    resultado = resolvedor.resolver("Pythom")
+
+    assert resultado["titulo"] == "Python"
+    assert resultado["origem"] == ORIGEM_SUGESTAO
+    assert sorted(c["titles"] for c in sessao.chamadas) == ["Pythom", "Python"]
+    assert sessao.pico == 2
+    assert time.perf_counter() - inicio < 0.35
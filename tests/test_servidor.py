@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+import servidor
+from captura import Captura
+from metricas import duracao_etapa, medir
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    monkeypatch.setattr(servidor, "consultar_cache", lambda *args: {"titulo": "Python", "texto": "A. B.", "origem": "direto"})
+    return servidor.app.test_client()
+
+
+def test_stream_devolve_a_requisicao_em_andamento(cliente):
+    antes = servidor.requisicoes_em_andamento.valor
+    for _ in range(3):
+        resposta = cliente.post("/tools/buscar_wikipedia", json={"busca": "Python", "stream": True})
+        resposta.get_data()
+        resposta.close()
+
+    assert servidor.requisicoes_em_andamento.valor == antes
+
+
+def test_stream_aberto_mantem_a_vaga_da_admissao(cliente):
+    antes = servidor.admissao.em_execucao
+    resposta = cliente.post("/tools/buscar_wikipedia", json={"busca": "Python", "stream": True}, buffered=False)
+    corpo = iter(resposta.response)
+    next(corpo)
+    assert servidor.admissao.em_execucao == antes + 1
+
+    list(corpo)
+    resposta.close()
+    assert servidor.admissao.em_execucao == antes
+
+
+def test_etapas_do_lote_entram_na_captura(monkeypatch):
+    registros = []
+    escritor = type("Escritor", (), {"escrever": lambda self, registro: registros.append(registro)})()
+    monkeypatch.setattr(servidor, "captura", Captura(escritor))
+
+    def buscar_item(busca, idioma):
+        # Roda numa thread do executor do lote
+        with medir(duracao_etapa, etapa="wikipedia"):
+            return {"busca": busca, "resultado": "A."}
+
+    monkeypatch.setattr(servidor, "buscar_item_lote", buscar_item)
+    resposta = servidor.app.test_client().post(
+        "/tools/buscar_wikipedia_lote", json={"buscas": ["Python", "Java"]}, headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert resposta.status_code == 200
+    assert "wikipedia" in registros[0]["etapas_ms"]
+    # Reenviado pelo replay.py
+    assert registros[0]["cabecalhos"] == {"Accept-Encoding": "gzip"}
+
+
+def test_caminho_desconhecido_nao_vira_serie_nova(cliente):
+    cliente.get('/qualquer"coisa\\123')
+    cliente.post("/tools/buscar_wikipedia", json={"busca": "Python"})
+    texto = cliente.get("/metrics").get_data(as_text=True)
+
+    series = [linha for linha in texto.splitlines() if linha.startswith("mcp_requisicoes_total{")]
+    assert any('rota="desconhecida",status="404"' in linha for linha in series)
+    assert any('rota="/tools/buscar_wikipedia",status="200"' in linha for linha in series)
+    assert not any("qualquer" in linha for linha in series)
+
+
+def test_stream_entrega_ndjson_na_ordem(cliente):
+    resposta = cliente.post("/tools/buscar_wikipedia", json={"busca": "Python", "stream": True})
+    eventos = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+
+    assert resposta.mimetype == "application/x-ndjson"
+    assert [evento["tipo"] for evento in eventos] == ["titulo", "conteudo", "conteudo", "fim"]
+    assert eventos[-1]["cache"] is True
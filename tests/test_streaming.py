@@ -0,0 +1,26 @@
+from streaming import eventos_resumo, quer_stream, trechos
+
+DETALHES = {"titulo": "Python", "texto": "Python é uma linguagem. Foi criada em 1991! Fim", "origem": "direto"}
+
+
+def test_eventos_saem_na_ordem_titulo_conteudo_fim():
+    eventos = list(eventos_resumo(DETALHES, "pt", cache=True))
+
+    assert [evento["tipo"] for evento in eventos] == ["titulo", "conteudo", "conteudo", "conteudo", "fim"]
+    assert eventos[0] == {"tipo": "titulo", "titulo": "Python"}
+    assert "".join(evento["texto"] for evento in eventos[1:-1]) == DETALHES["texto"]
+    assert eventos[-1] == {"tipo": "fim", "titulo": "Python", "origem": "direto", "lang": "pt", "cache": True}
+
+
+def test_titulo_ja_enviado_nao_se_repete():
+    eventos = list(eventos_resumo(DETALHES, "pt", cache=False, titulo_enviado=True))
+
+    assert eventos[0]["tipo"] == "conteudo"
+    assert [evento["tipo"] for evento in eventos].count("titulo") == 0
+
+
+def test_trechos_reconstroem_o_texto_e_pedido_de_stream():
+    assert list(trechos("A. B? C")) == ["A. ", "B? ", "C"]
+    assert quer_stream({"stream": True}, "")
+    assert quer_stream({}, "application/x-ndjson")
+    assert not quer_stream({}, "application/json")
@@ -0,0 +1,46 @@
+import sugestao
+from sugestao import IndiceTrigramas
+
+
+def test_corrige_erro_de_digitacao_e_sugere_parecidos():
+    indice = IndiceTrigramas()
+    indice.adicionar_varios(["Python", "Pythonidae", "São Paulo", "Paulo Freire"])
+
+    assert indice.corrigir("Pyhton") == "Python"
+    # Termos que já são títulos (sem acento ou caixa) não são corrigidos
+    assert indice.corrigir("sao paulo") is None
+    assert [titulo for titulo, _ in indice.sugerir("Sao Paolo")][0] == "São Paulo"
+    assert indice.sugerir("xyz") == []
+
+
+def test_titulos_aprendidos_ficam_numa_lru_limitada():
+    indice = IndiceTrigramas(max_aprendidos=2)
+    indice.adicionar_varios(["Python"])
+    indice.adicionar("Maradona")
+    indice.adicionar("Pelé")
+    indice.adicionar("Maradona")  # usado de novo: Pelé passa a ser o mais antigo
+    indice.adicionar("Garrincha")
+
+    assert len(indice) == 3
+    assert indice.contem("Python") and indice.contem("Maradona") and indice.contem("Garrincha")
+    assert not indice.contem("Pelé")
+    assert indice.corrigir("Garincha") == "Garrincha"
+    assert indice.sugerir("Pele", minimo=0.5) == []
+
+
+def test_pontuacao_e_feita_fora_do_lock(monkeypatch):
+    indice = IndiceTrigramas()
+    indice.adicionar_varios(["Python"])
+    indice.adicionar("Pythonidae")
+    durante_pontuacao = []
+    unique = sugestao.np.unique
+
+    def unique_verificando(*args, **kwargs):
+        durante_pontuacao.append(indice._lock.locked())
+        return unique(*args, **kwargs)
+
+    monkeypatch.setattr(sugestao.np, "unique", unique_verificando)
+    monkeypatch.setattr(sugestao, "similaridade", lambda a, b: durante_pontuacao.append(indice._lock.locked()) or 1.0)
+
+    assert {titulo for titulo, _ in indice.sugerir("Pyton")} == {"Python", "Pythonidae"}
+    assert durante_pontuacao and not any(durante_pontuacao)